@@ -1,6 +1,11 @@
 """A Discord bot."""
 
-from dotenv import load_dotenv
+from time import perf_counter
+
+# Reference point of the startup profile, taken before any heavy import.
+STARTED_AT: float = perf_counter()
+
+from dotenv import load_dotenv  # noqa: E402
 
 load_dotenv()
 __version__ = "1.0.0"
@@ -0,0 +1,215 @@
+"""Audit log of the bot's actions and users' commands."""
+
+from asyncio import CancelledError, Task, create_task, sleep
+from collections import deque
+from dataclasses import astuple
+from time import time
+
+from .classes import AuditEvent
+from .health import register_queue
+from .ipc import WorkerError
+from .logger import programLogger
+from .repository import get_repository
+
+# Seconds between two writes of the recorded events.
+FLUSH_INTERVAL: float = 5.0
+# Number of recorded events from which they are written without waiting.
+BATCH_SIZE: int = 100
+# Maximum number of events waiting to be written, the oldest are dropped.
+MAX_BUFFERED: int = 10_000
+# Age in days from which events are deleted.
+RETENTION_DAYS: int = 90
+# Seconds between two deletions of the old events.
+RETENTION_INTERVAL: float = 24 * 3600.0
+# Number of events deleted per transaction, so that writes aren't blocked.
+DELETE_BATCH_SIZE: int = 1000
+
+
+class AuditLog:
+    """Class buffering audit events and writing them by batches.
+
+    Events are recorded in memory and written in a single transaction
+    every FLUSH_INTERVAL seconds, or as soon as BATCH_SIZE events are
+    waiting. They are written through the command handlers so that they
+    reach the workers' database when the bot runs as a gateway.
+
+    Methods
+    -------
+    record(action, detail, user_id)
+        Record an event.
+    start()
+        Start writing the events periodically.
+    stop()
+        Stop the periodic writes and write the waiting events.
+    flush()
+        Write the waiting events.
+
+    """
+
+    def __init__(self) -> None:
+        """Create an empty buffer."""
+        self._buffer: deque[AuditEvent] = deque(maxlen=MAX_BUFFERED)
+        self._task: Task[None] | None = None
+        self._flush_task: Task[int] | None = None
+
+    def record(
+        self, action: str, detail: str, user_id: int | None = None
+    ) -> None:
+        """Record an event.
+
+        Parameters
+        ----------
+        action : str
+            The action name, for example the command name.
+        detail : str
+            What happened.
+        user_id : int or None, default=None
+            ID of the user who acted, None for the bot's own actions.
+
+        """
+        self._buffer.append(AuditEvent(time(), user_id, action, detail))
+
+        if (
+            self._task
+            and len(self._buffer) >= BATCH_SIZE
+            and (self._flush_task is None or self._flush_task.done())
+        ):
+            self._flush_task = create_task(self.flush())
+
+    def start(self) -> None:
+        """Start writing the events periodically."""
+        self._task = create_task(self._run(), name="audit-log")
+        register_queue("audit_log", lambda: len(self._buffer))
+
+    async def stop(self) -> None:
+        """Stop the periodic writes and write the waiting events."""
+        if self._task:
+            self._task.cancel()
+
+        self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        """Write the recorded events periodically."""
+        while True:
+            await sleep(FLUSH_INTERVAL)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write the waiting events.
+
+        Returns
+        -------
+        int
+            The number of events written.
+
+        """
+        # Imported here, the commands depend on the audit log.
+        from .bot_commands.dispatch import run_handler
+
+        events: list[AuditEvent] = list(self._buffer)
+        self._buffer.clear()
+
+        if not events:
+            return 0
+
+        try:
+            await run_handler(
+                "save_audit_events",
+                events=[astuple(event) for event in events],
+            )
+
+        except (ConnectionError, TimeoutError, WorkerError) as err:
+            programLogger.warning(f"Failed writing audit events: {err}")
+            self._buffer.extendleft(reversed(events))
+            return 0
+
+        return len(events)
+
+
+class AuditRetention:
+    """Class deleting the audit events older than the retention period.
+
+    Old events are deleted by small batches, each in its own transaction,
+    yielding to the event loop in between. The freed database pages are
+    reused by the next inserts.
+
+    Methods
+    -------
+    start()
+        Start the periodic deletions.
+    stop()
+        Cancel the periodic deletions.
+    purge()
+        Delete the events older than the retention period.
+
+    """
+
+    def __init__(self, retention_days: int = RETENTION_DAYS) -> None:
+        """Set the retention period.
+
+        Parameters
+        ----------
+        retention_days : int, default=RETENTION_DAYS
+            Age in days from which events are deleted.
+
+        """
+        self.retention_days: int = retention_days
+        self._task: Task[None] | None = None
+
+    def start(self) -> None:
+        """Start the periodic deletions."""
+        self._task = create_task(self._run(), name="audit-retention")
+
+    def stop(self) -> None:
+        """Cancel the periodic deletions."""
+        if self._task:
+            self._task.cancel()
+
+        self._task = None
+
+    async def _run(self) -> None:
+        """Delete the old events periodically."""
+        while True:
+            try:
+                await self.purge()
+
+            except CancelledError:
+                raise
+
+            except Exception as err:
+                programLogger.error(f"Failed deleting audit events: {err}")
+
+            await sleep(RETENTION_INTERVAL)
+
+    async def purge(self) -> int:
+        """Delete the events older than the retention period.
+
+        Returns
+        -------
+        int
+            The number of events deleted.
+
+        """
+        before: float = time() - self.retention_days * 24 * 3600
+        total: int = 0
+
+        while True:
+            deleted: int = get_repository().delete_audit_events(
+                before, DELETE_BATCH_SIZE
+            )
+            total += deleted
+
+            if deleted < DELETE_BATCH_SIZE:
+                break
+
+            await sleep(0)
+
+        if total:
+            programLogger.info(f"Deleted {total} old audit events.")
+
+        return total
+
+
+AUDIT_LOG = AuditLog()
+AUDIT_RETENTION = AuditRetention()
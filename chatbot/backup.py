@@ -0,0 +1,233 @@
+"""Online backups of the resources database."""
+
+from asyncio import CancelledError, Task, create_task, sleep, to_thread
+from datetime import datetime
+from pathlib import Path
+from sqlite3 import Connection
+from sqlite3 import Error as SqliteError
+from sqlite3 import connect
+from time import perf_counter
+
+from .logger import programLogger
+
+# Number of database pages copied per backup step.
+PAGES_PER_STEP: int = 64
+# Seconds to wait between two steps, to let the bot write in between.
+STEP_DELAY: float = 0.01
+# Seconds to wait after startup before the first backup.
+FIRST_BACKUP_DELAY: float = 60.0
+SNAPSHOT_PREFIX: str = "resources-"
+
+
+def copy_database(database_path: str, snapshot_path: str) -> int:
+    """Copy a database with the online backup API.
+
+    Pages are copied by small steps: the database is only locked while
+    a step runs, so that the bot can keep writing in between.
+
+    Parameters
+    ----------
+    database_path : str
+        Path to the database file.
+    snapshot_path : str
+        Path to the snapshot file.
+
+    Returns
+    -------
+    int
+        The number of pages copied.
+
+    Raises
+    ------
+    sqlite3.Error
+
+    """
+    pages: int = 0
+
+    def progress(status: int, remaining: int, total: int) -> None:
+        nonlocal pages
+        pages = total
+
+    source: Connection = connect(database_path)
+    target: Connection = connect(snapshot_path)
+
+    try:
+        source.backup(
+            target, pages=PAGES_PER_STEP, progress=progress, sleep=STEP_DELAY
+        )
+
+    finally:
+        target.close()
+        source.close()
+
+    return pages
+
+
+def check_integrity(snapshot_path: str) -> bool:
+    """Check the integrity of a snapshot.
+
+    Parameters
+    ----------
+    snapshot_path : str
+        Path to the snapshot file.
+
+    Returns
+    -------
+    bool
+        Whether the snapshot is a valid database.
+
+    """
+    try:
+        connection: Connection = connect(snapshot_path)
+
+        try:
+            result: list[tuple[str]] = connection.execute(
+                "PRAGMA integrity_check"
+            ).fetchall()
+
+        finally:
+            connection.close()
+
+    except SqliteError as err:
+        programLogger.error(f"Failed checking snapshot: {err}")
+        return False
+
+    return result == [("ok",)]
+
+
+class BackupScheduler:
+    """Class taking periodic snapshots of the database while it is used.
+
+    Snapshots are copied in a worker thread with the online backup API,
+    so that commands are neither blocked nor paused, then checked for
+    integrity. Only the most recent valid snapshots are kept.
+
+    Attributes
+    ----------
+    database_path : str
+        Path to the database file.
+    directory : pathlib.Path
+        The directory of the snapshots.
+    interval : float
+        Seconds between two snapshots.
+    retention : int
+        Number of snapshots kept.
+
+    Methods
+    -------
+    start()
+        Start taking snapshots.
+    stop()
+        Cancel the snapshots.
+    backup()
+        Take, check and rotate a snapshot.
+
+    """
+
+    def __init__(
+        self,
+        database_path: str,
+        directory: str,
+        interval: float,
+        retention: int,
+    ) -> None:
+        """Set the snapshots parameters.
+
+        Parameters
+        ----------
+        database_path : str
+            Path to the database file.
+        directory : str
+            The directory of the snapshots.
+        interval : float
+            Seconds between two snapshots.
+        retention : int
+            Number of snapshots kept.
+
+        """
+        self.database_path: str = database_path
+        self.directory: Path = Path(directory)
+        self.interval: float = interval
+        self.retention: int = max(1, retention)
+        self._task: Task[None] | None = None
+
+    def start(self) -> None:
+        """Start taking snapshots."""
+        self._task = create_task(self._run(), name="backup")
+
+    def stop(self) -> None:
+        """Cancel the snapshots."""
+        if self._task:
+            self._task.cancel()
+
+        self._task = None
+
+    async def _run(self) -> None:
+        """Take snapshots periodically."""
+        await sleep(FIRST_BACKUP_DELAY)
+
+        while True:
+            try:
+                await self.backup()
+
+            except CancelledError:
+                raise
+
+            except Exception as err:
+                programLogger.error(f"Failed backing up database: {err}")
+
+            await sleep(self.interval)
+
+    def snapshots(self) -> list[Path]:
+        """List the snapshots, the oldest first.
+
+        Returns
+        -------
+        list of pathlib.Path
+            The snapshot files.
+
+        """
+        return sorted(self.directory.glob(f"{SNAPSHOT_PREFIX}*.db"))
+
+    async def backup(self) -> Path | None:
+        """Take, check and rotate a snapshot.
+
+        Returns
+        -------
+        pathlib.Path or None
+            The snapshot file if it is valid. Otherwise, None.
+
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        timestamp: str = datetime.now().strftime("%Y%m%d-%H%M%S")
+        snapshot: Path = self.directory / f"{SNAPSHOT_PREFIX}{timestamp}.db"
+        partial: Path = snapshot.with_suffix(".db.part")
+        start: float = perf_counter()
+
+        try:
+            pages: int = await to_thread(
+                copy_database, self.database_path, str(partial)
+            )
+            valid: bool = await to_thread(check_integrity, str(partial))
+
+        except SqliteError as err:
+            programLogger.error(f"Failed backing up database: {err}")
+            partial.unlink(missing_ok=True)
+            return None
+
+        if not valid:
+            programLogger.error(f"Snapshot '{snapshot}' is corrupted.")
+            partial.unlink(missing_ok=True)
+            return None
+
+        partial.replace(snapshot)
+        programLogger.info(
+            f"Backed up {pages} pages to '{snapshot}' in "
+            f"{perf_counter() - start:.2f} s."
+        )
+
+        for old_snapshot in self.snapshots()[: -self.retention]:
+            old_snapshot.unlink(missing_ok=True)
+            programLogger.debug(f"Removed snapshot '{old_snapshot}'.")
+
+        return snapshot
@@ -1,6 +1,20 @@
 """Bot client commands."""
 
-from .emoji import process_emoji_reaction
-from .formatting import log_bot_action, set_logs_channel
+from .audit import audit
+from .digest import DigestScheduler
+from .duplicates import duplicates
+from .emoji import process_emoji_reaction, set_role_ids
+from .formatting import (
+    fetch_logs_channel,
+    log_bot_action,
+    send_logs_embeds,
+    set_logs_channel,
+    set_logs_webhook,
+)
 from .help import help
+from .pins import PinReconciler, pins
 from .resources import add_resource, get_resources
+from .roles import RoleReconciler, set_role_reconciler, sync_roles
+from .stats import stats
+from .views import PageButton
+from .webhook import LogWebhook
@@ -0,0 +1,127 @@
+"""Command callbacks for the audit log."""
+
+from time import time
+
+from discord import Interaction, Member
+from discord.app_commands import Range, default_permissions, describe
+
+from chatbot.classes import AuditEvent
+from chatbot.repository import get_repository
+
+from .dispatch import CommandResult, handler
+from .formatting import MAX_FIELD_LENGTH, create_response, log_interaction
+from .messages import DEFAULT_LOCALE, format_message, format_response
+from .resources import run_command
+from .tracing import InteractionTrace
+
+# Maximum number of events fetched by a query.
+MAX_AUDIT_EVENTS: int = 50
+# Maximum length of an event's detail in the response.
+MAX_DETAIL_LENGTH: int = 100
+
+
+@handler("save_audit_events")
+async def save_audit_events(
+    events: list[tuple[float, int | None, str, str]],
+) -> None:
+    """Append events to the audit log.
+
+    Parameters
+    ----------
+    events : list of tuple
+        The date, user ID, action and detail of each event.
+
+    """
+    get_repository().save_audit_events(
+        [AuditEvent(*event) for event in events]
+    )
+
+
+@handler("query_audit")
+async def query_audit(
+    hours: int,
+    user_id: int | None = None,
+    event_action: str | None = None,
+    locale: str = DEFAULT_LOCALE,
+) -> CommandResult:
+    """List the recent audit events.
+
+    Parameters
+    ----------
+    hours : int
+        Number of hours to look back.
+    user_id : int or None, default=None
+        If not None, the ID of the user who acted.
+    event_action : str or None, default=None
+        If not None, the action name of the events.
+    locale : str, default=DEFAULT_LOCALE
+        The catalog locale of the response.
+
+    Returns
+    -------
+    CommandResult
+        The response.
+
+    """
+    events: list[AuditEvent] = get_repository().fetch_audit_events(
+        time() - hours * 3600, user_id, event_action, MAX_AUDIT_EVENTS
+    )
+
+    if not events:
+        return CommandResult(
+            format_response("no_audit_events", locale, hours=hours), 20.0
+        )
+
+    content: str = format_message("audit_title", locale, hours=hours)
+
+    for idx, event in enumerate(events):
+        user: str = f"<@{event.user_id}>" if event.user_id else "bot"
+        line: str = (
+            f"\n<t:{int(event.created_at)}:f> {user} `{event.action}` "
+            f"{event.detail[:MAX_DETAIL_LENGTH]}"
+        )
+        more: str = f"\n… +{len(events) - idx}"
+
+        if len(content) + len(line) + len(more) > MAX_FIELD_LENGTH:
+            content += more
+            break
+
+        content += line
+
+    return CommandResult(create_response(content, type="success"), 60.0)
+
+
+@default_permissions(manage_guild=True)
+@describe(user="The user who acted")
+@describe(action="The action, for example 'add_resource' or 'pin'")
+@describe(hours="Number of hours to look back, 24 by default")
+async def audit(
+    interaction: Interaction,
+    user: Member | None = None,
+    action: str | None = None,
+    hours: Range[int, 1, 24 * 90] = 24,
+) -> None:
+    """Display the recent actions of the bot and its users.
+
+    Parameters
+    ----------
+    interaction : discord.Interaction
+        A user interaction with the bot (slash command).
+    user : discord.Member or None, default=None
+        If not None, the user who acted.
+    action : str or None, default=None
+        If not None, the action name.
+    hours : int, default=24
+        Number of hours to look back.
+
+    """
+    trace_action: str = log_interaction(interaction)
+    trace = InteractionTrace(interaction)
+    await run_command(
+        trace,
+        trace_action,
+        "query_audit",
+        hours=hours,
+        user_id=user.id if user else None,
+        event_action=action,
+    )
@@ -0,0 +1,309 @@
+"""Digest of the resources added since the last one."""
+
+from asyncio import CancelledError, Task, create_task, sleep
+from json import dumps, loads
+from os import replace
+from pathlib import Path
+from time import time
+
+from discord.ext.commands import Bot
+
+from chatbot.classes import CATEGORY_NAMES, ExportRow, ResourceLink
+from chatbot.client import send_message_to_channel
+from chatbot.logger import programLogger
+from chatbot.repository import get_repository
+
+from .dispatch import handler, run_handler
+from .formatting import format_link
+from .messages import DEFAULT_LOCALE, format_message
+
+# File keeping the creation timestamp up to which resources were posted.
+DIGEST_FILE: str = "logs/digest.json"
+# Default seconds between two digests.
+DIGEST_INTERVAL: float = 24 * 3600.0
+# Seconds to wait before retrying a digest that failed.
+RETRY_DELAY: float = 600.0
+# Maximum number of resources listed in a digest.
+MAX_DIGEST_RESOURCES: int = 100
+# Maximum length of a Discord message.
+MAX_MESSAGE_LENGTH: int = 2000
+
+
+def load_mark(path: str = DIGEST_FILE) -> float | None:
+    """Load the creation timestamp up to which resources were posted.
+
+    Parameters
+    ----------
+    path : str, default=DIGEST_FILE
+        Path to the digest file.
+
+    Returns
+    -------
+    float or None
+        The timestamp, or None if no digest was started.
+
+    """
+    try:
+        return float(loads(Path(path).read_text())["posted_until"])
+
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_mark(posted_until: float, path: str = DIGEST_FILE) -> None:
+    """Save the creation timestamp up to which resources were posted.
+
+    Parameters
+    ----------
+    posted_until : float
+        The timestamp.
+    path : str, default=DIGEST_FILE
+        Path to the digest file.
+
+    """
+    try:
+        mark_path = Path(path)
+        mark_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path: Path = mark_path.with_suffix(".tmp")
+        tmp_path.write_text(dumps({"posted_until": posted_until}))
+        replace(tmp_path, mark_path)
+
+    except OSError as err:
+        programLogger.error(f"Failed saving digest mark: {err}")
+
+
+@handler("build_digest")
+async def build_digest(
+    since: float, until: float, locale: str = DEFAULT_LOCALE
+) -> tuple[str, float]:
+    """Build the digest of the resources created during a period.
+
+    The digest is a single message, so that it is either posted or not,
+    and never repeated in part when a post is retried. It lists the
+    oldest resources of the period that fit, the others are left to the
+    next digest.
+
+    Parameters
+    ----------
+    since : float
+        Timestamp after which the resources were created.
+    until : float
+        Timestamp until which the resources were created, included.
+    locale : str, default=DEFAULT_LOCALE
+        The catalog locale of the digest.
+
+    Returns
+    -------
+    tuple
+        The message to post, empty if no resources were created, and the
+        creation timestamp up to which it lists the resources.
+
+    """
+    rows: list[ExportRow] = get_repository().fetch_new_resources(
+        since, until, MAX_DIGEST_RESOURCES + 1
+    )
+
+    if not rows:
+        return "", until
+
+    # The title is counted with the longest count it can show.
+    length: int = len(
+        format_message("digest_title", locale, count=MAX_DIGEST_RESOURCES)
+    )
+    names: list[str] = []
+    lines: list[str] = []
+
+    for row in rows[:MAX_DIGEST_RESOURCES]:
+        category: str = row.categories[0] if row.categories else ""
+        name: str = CATEGORY_NAMES.get(category, category)
+        line: str = "\n- " + format_link(
+            ResourceLink(row.url, row.title, row.dead)
+        )
+        header: str = "" if name in names else f"\n\n__{name}__"
+
+        if length + len(header) + len(line) > MAX_MESSAGE_LENGTH:
+            if lines:
+                break
+
+            # A single link too long for a message is cut.
+            line = line[: MAX_MESSAGE_LENGTH - length - len(header)]
+
+        length += len(header) + len(line)
+        names.append(name)
+        lines.append(line)
+
+    count: int = len(lines)
+
+    if count < len(rows):
+        # Resources created at the same time as the first one left are
+        # left with it, so that the next digest, starting after the mark,
+        # lists them.
+        last: int = count
+
+        while last and rows[last - 1].created_at == rows[count].created_at:
+            last -= 1
+
+        if last:
+            count = last
+        else:
+            programLogger.warning(
+                "Digest skips resources created at the same time as the "
+                f"{count} listed."
+            )
+
+    groups: dict[str, list[str]] = {}
+
+    for name, line in zip(names[:count], lines[:count]):
+        groups.setdefault(name, []).append(line)
+
+    content: str = format_message("digest_title", locale, count=count)
+
+    for name, links in sorted(groups.items()):
+        content += f"\n\n__{name}__" + "".join(links)
+
+    return content, (
+        until if count == len(rows) else rows[count - 1].created_at or until
+    )
+
+
+class DigestScheduler:
+    """Class posting the resources added since the last digest.
+
+    The creation timestamp up to which resources were posted is saved
+    after each digest, so that only the newer resources are read, with
+    the index on their creation time, and none is missed or repeated
+    across restarts.
+
+    Attributes
+    ----------
+    client : discord.ext.commands.Bot
+        The bot client.
+    channel_id : int
+        ID of the channel the digests are posted to.
+    interval : float
+        Seconds between two digests.
+    path : str
+        Path to the digest file.
+
+    Methods
+    -------
+    start()
+        Start posting digests.
+    stop()
+        Cancel the digests.
+    post_digest(since, until)
+        Post the resources created during a period.
+
+    """
+
+    def __init__(
+        self,
+        client: Bot,
+        channel_id: int,
+        interval: float = DIGEST_INTERVAL,
+        path: str = DIGEST_FILE,
+    ) -> None:
+        """Set the digests parameters.
+
+        Parameters
+        ----------
+        client : discord.ext.commands.Bot
+            The bot client.
+        channel_id : int
+            ID of the channel the digests are posted to.
+        interval : float, default=DIGEST_INTERVAL
+            Seconds between two digests.
+        path : str, default=DIGEST_FILE
+            Path to the digest file.
+
+        """
+        self.client: Bot = client
+        self.channel_id: int = channel_id
+        self.interval: float = interval
+        self.path: str = path
+        self._task: Task[None] | None = None
+
+    def start(self) -> None:
+        """Start posting digests."""
+        self._task = create_task(self._run(), name="digest")
+
+    def stop(self) -> None:
+        """Cancel the digests."""
+        if self._task:
+            self._task.cancel()
+
+        self._task = None
+
+    async def _run(self) -> None:
+        """Post a digest every interval once the bot is connected."""
+        await self.client.wait_until_ready()
+        # End of the period being posted, if a digest didn't list it all.
+        until: float | None = None
+
+        while True:
+            since: float | None = load_mark(self.path)
+            now: float = time()
+
+            if since is None:
+                # The first digest only lists the resources added from now.
+                since = now
+                save_mark(since, self.path)
+
+            if until is None and since + self.interval > now:
+                await sleep(since + self.interval - now)
+                continue
+
+            period_end: float = now if until is None else until
+
+            try:
+                posted_until: float = await self.post_digest(since, period_end)
+                # The resources that didn't fit are posted right away.
+                until = period_end if posted_until < period_end else None
+
+            except CancelledError:
+                raise
+
+            except Exception as err:
+                programLogger.error(f"Failed posting digest: {err}")
+                await sleep(RETRY_DELAY)
+
+    async def post_digest(self, since: float, until: float) -> float:
+        """Post the resources created during a period.
+
+        The resources listed are marked as posted once the digest is
+        sent.
+
+        Parameters
+        ----------
+        since : float
+            Timestamp after which the resources were created.
+        until : float
+            Timestamp until which the resources were created, included.
+
+        Returns
+        -------
+        float
+            The creation timestamp up to which the resources were posted,
+            until if they all fit in the digest.
+
+        Raises
+        ------
+        RuntimeError
+            If the digest can't be sent.
+
+        """
+        # A list when built in a worker.
+        digest: tuple[str, float] = await run_handler(
+            "build_digest", since=since, until=until
+        )
+        message, posted_until = digest
+
+        if message:
+            await send_message_to_channel(
+                self.client, self.channel_id, message
+            )
+            programLogger.info("Posted digest.")
+
+        save_mark(posted_until, self.path)
+
+        return posted_until
@@ -0,0 +1,203 @@
+"""Dispatch of command handlers to this process or to workers."""
+
+from base64 import b64decode, b64encode
+from dataclasses import astuple, dataclass
+from io import BytesIO
+from typing import Any, Awaitable, Callable
+
+from discord import Embed, File
+
+from chatbot.classes import ResourcePage
+from chatbot.ipc import WorkerPool
+
+Handler = Callable[..., Awaitable[Any]]
+
+# Handler names to the functions running the command work.
+HANDLERS: dict[str, Handler] = {}
+# Worker processes running the handlers, or None to run them here.
+WORKER_POOL: WorkerPool | None = None
+
+
+@dataclass
+class CommandResult:
+    """Class defining the outcome of a command handler.
+
+    Attributes
+    ----------
+    embed : discord.Embed
+        The response.
+    delete_after : float
+        Seconds after which the response is deleted.
+    log : str or None
+        If not None, the message to record in the audit log.
+    notify : bool
+        Whether the logged message is also sent to the bot logs channel.
+    file : discord.File or None
+        If not None, the file attached to the response.
+    page : ResourcePage or None
+        If not None, the listing page the response shows, with buttons to
+        browse the listing.
+
+    """
+
+    embed: Embed
+    delete_after: float
+    log: str | None = None
+    notify: bool = True
+    file: File | None = None
+    page: ResourcePage | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the result to send it between processes.
+
+        The attached file is read and encoded in base64.
+
+        Returns
+        -------
+        dict
+            The result.
+
+        """
+        data: dict[str, Any] = {
+            "embed": self.embed.to_dict(),
+            "delete_after": self.delete_after,
+            "log": self.log,
+            "notify": self.notify,
+            "page": astuple(self.page) if self.page else None,
+        }
+
+        if self.file:
+            data["file"] = {
+                "filename": self.file.filename,
+                "content": b64encode(self.file.fp.read()).decode(),
+            }
+            self.file.close()
+
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "CommandResult":
+        """Deserialize a result received from another process.
+
+        Parameters
+        ----------
+        data : dict
+            The result.
+
+        Returns
+        -------
+        CommandResult
+
+        """
+        file: dict[str, str] | None = data.get("file")
+        page: list[Any] | None = data.get("page")
+
+        return cls(
+            Embed.from_dict(data["embed"]),
+            data["delete_after"],
+            data["log"],
+            data.get("notify", True),
+            (
+                File(
+                    BytesIO(b64decode(file["content"])),
+                    filename=file["filename"],
+                )
+                if file
+                else None
+            ),
+            ResourcePage(*page) if page else None,
+        )
+
+
+def handler(name: str) -> Callable[[Handler], Handler]:
+    """Register a function running the work of a command.
+
+    Handlers only take and return values that can be serialized to JSON,
+    or CommandResult, so that they can run in a worker process.
+
+    Parameters
+    ----------
+    name : str
+        The handler name.
+
+    Returns
+    -------
+    callable
+        The decorator of the handler.
+
+    """
+
+    def decorator(function: Handler) -> Handler:
+        HANDLERS[name] = function
+        return function
+
+    return decorator
+
+
+def set_worker_pool(pool: WorkerPool | None) -> None:
+    """Set the worker processes running the handlers.
+
+    Parameters
+    ----------
+    pool : WorkerPool or None
+        The workers, or None to run the handlers in this process.
+
+    """
+    global WORKER_POOL
+    WORKER_POOL = pool
+
+
+async def run_handler(name: str, **kwargs: Any) -> Any:
+    """Run a handler in this process or in a worker.
+
+    Parameters
+    ----------
+    name : str
+        The handler name.
+    **kwargs
+        The handler arguments.
+
+    Returns
+    -------
+    Any
+        The handler result.
+
+    Raises
+    ------
+    ConnectionError
+        If no worker answered.
+
+    """
+    if WORKER_POOL is None:
+        return await HANDLERS[name](**kwargs)
+
+    result: Any = await WORKER_POOL.call(name, **kwargs)
+
+    if isinstance(result, dict) and "embed" in result:
+        return CommandResult.from_dict(result)
+
+    return result
+
+
+async def serve_handler(name: str, **kwargs: Any) -> Any:
+    """Run a handler for the gateway and serialize its result.
+
+    Parameters
+    ----------
+    name : str
+        The handler name.
+    **kwargs
+        The handler arguments.
+
+    Returns
+    -------
+    Any
+        The handler result, serialized to JSON types.
+
+    """
+    result: Any = await HANDLERS[name](**kwargs)
+
+    if isinstance(result, CommandResult):
+        return result.to_dict()
+
+    return result
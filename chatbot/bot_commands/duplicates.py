@@ -0,0 +1,99 @@
+"""Command callbacks for the near-duplicate links."""
+
+from discord import Interaction
+from discord.app_commands import Range, default_permissions, describe
+
+from chatbot.similarity import DUPLICATE_INDEX
+
+from .dispatch import CommandResult, handler
+from .formatting import MAX_FIELD_LENGTH, create_response, log_interaction
+from .messages import DEFAULT_LOCALE, format_message, static_response
+from .resources import run_command
+from .tracing import InteractionTrace
+
+# Maximum length of a link in the response.
+MAX_LINK_LENGTH: int = 200
+
+
+@handler("find_duplicates")
+async def find_duplicates(
+    similarity: int, locale: str = DEFAULT_LOCALE
+) -> CommandResult:
+    """List the groups of similar indexed links.
+
+    Parameters
+    ----------
+    similarity : int
+        The minimum similarity in percent.
+    locale : str, default=DEFAULT_LOCALE
+        The catalog locale of the response.
+
+    Returns
+    -------
+    CommandResult
+        The response.
+
+    """
+    clusters: list[list[str]] = DUPLICATE_INDEX.clusters(similarity / 100)
+
+    if not clusters:
+        return CommandResult(static_response("no_duplicates", locale), 20.0)
+
+    content: str = format_message(
+        "duplicates_title", locale, count=len(clusters)
+    )
+
+    for idx, cluster in enumerate(clusters):
+        group: str = "\n\n" + "\n".join(
+            link[:MAX_LINK_LENGTH] for link in cluster
+        )
+        more: str = f"\n\n… +{len(clusters) - idx}"
+
+        if len(content) + len(group) + len(more) <= MAX_FIELD_LENGTH:
+            content += group
+            continue
+
+        if not idx:
+            # List the links of the first group that fit, so that a large
+            # group doesn't hide every link.
+            more = f"\n\n… +{len(clusters) - 1}" if len(clusters) > 1 else ""
+            content += "\n"
+
+            for pos, link in enumerate(cluster):
+                line: str = "\n" + link[:MAX_LINK_LENGTH]
+                hidden: str = f"\n… +{len(cluster) - pos}"
+
+                if (
+                    len(content) + len(line) + len(hidden) + len(more)
+                    > MAX_FIELD_LENGTH
+                ):
+                    content += hidden
+                    break
+
+                content += line
+
+        content += more
+        break
+
+    return CommandResult(create_response(content, type="warning"), 120.0)
+
+
+@default_permissions(manage_guild=True)
+@describe(similarity="Minimum similarity in percent, 50 by default")
+async def duplicates(
+    interaction: Interaction, similarity: Range[int, 50, 100] = 50
+) -> None:
+    """Display the groups of similar links to clean up.
+
+    Parameters
+    ----------
+    interaction : discord.Interaction
+        A user interaction with the bot (slash command).
+    similarity : int, default=50
+        The minimum similarity in percent. Lower similarities aren't
+        reliably found by the index.
+
+    """
+    action: str = log_interaction(interaction)
+    trace = InteractionTrace(interaction)
+    await run_command(trace, action, "find_duplicates", similarity=similarity)
@@ -1,19 +1,44 @@
 """Command callbacks for emoji reactions."""
 
-from discord import Forbidden, Guild, Member, RawReactionActionEvent, Role
+from discord import (
+    Forbidden,
+    Guild,
+    HTTPException,
+    Member,
+    RawReactionActionEvent,
+    Role,
+)
 from discord.ext.commands import Bot
 
+from chatbot.audit import AUDIT_LOG
 from chatbot.logger import programLogger
 
 from .formatting import log_bot_action
+from .pins import MAX_PINS, PINS_WARNING, count_channel_pins, index_pin
 
-# Emojis reactions the bot must process
-EMOJI_REACTIONS: list[str] = ["📌", "🟨", "🟦"]
+# Emoji reaction pinning messages
+PIN_EMOJI: str = "📌"
 # Emojis to role IDs
 ROLE_IDS: dict[str, int] = {
     "🟨": 1294578631879692350,
     "🟦": 1294579583873449994,
 }
+# Emojis reactions the bot must process
+EMOJI_REACTIONS: list[str] = [PIN_EMOJI, *ROLE_IDS]
+
+
+def set_role_ids(role_ids: dict[str, int]) -> None:
+    """Replace the roles given by reacting to the roles message.
+
+    Parameters
+    ----------
+    role_ids : dict
+        The emojis to role IDs.
+
+    """
+    ROLE_IDS.clear()
+    ROLE_IDS.update(role_ids)
+    EMOJI_REACTIONS[:] = [PIN_EMOJI, *role_ids]
 
 
 async def add_role(client: Bot, payload: RawReactionActionEvent) -> None:
@@ -46,6 +71,7 @@ async def add_role(client: Bot, payload: RawReactionActionEvent) -> None:
 
     await payload.member.add_roles(role)
     programLogger.notice(f"{action}: Role given.")
+    AUDIT_LOG.record("role", f"Gave role '{role.name}'.", payload.user_id)
 
 
 async def remove_role(client: Bot, payload: RawReactionActionEvent) -> None:
@@ -83,6 +109,7 @@ async def remove_role(client: Bot, payload: RawReactionActionEvent) -> None:
     action = f"User {member.name} removed emoji {payload.emoji.name}"
     await member.remove_roles(role)
     programLogger.notice(f"{action}: Role removed.")
+    AUDIT_LOG.record("role", f"Removed role '{role.name}'.", member.id)
 
 
 async def handle_pin_request(
@@ -110,6 +137,12 @@ async def handle_pin_request(
         else f"User {str(payload.user_id)} wants to unpin message"
     )
 
+    if pin and await count_channel_pins(payload.channel_id) >= MAX_PINS:
+        raise RuntimeError(
+            f"{action}: Channel <#{payload.channel_id}> already has "
+            f"{MAX_PINS} pinned messages."
+        )
+
     try:
         channel = client.get_channel(payload.channel_id)
         message = await channel.fetch_message(payload.message_id)
@@ -124,6 +157,21 @@ async def handle_pin_request(
             f"{action}: Missing permissions for channel {payload.channel_id}."
         ) from err
 
+    except HTTPException as err:
+        raise RuntimeError(f"{action}: {err}") from err
+
+    AUDIT_LOG.record(
+        "pin" if pin else "unpin", message.jump_url, payload.user_id
+    )
+    count: int | None = await index_pin(message, payload.user_id, pin)
+
+    if count is not None and count >= PINS_WARNING:
+        await log_bot_action(
+            f"Channel <#{payload.channel_id}> has {count}/{MAX_PINS} "
+            "pinned messages.",
+            action="pins",
+        )
+
 
 async def process_emoji_reaction(
     client: Bot,
@@ -162,4 +210,4 @@ async def process_emoji_reaction(
             await handle_pin_request(client, payload, is_added)
 
     except RuntimeError as err:
-        await log_bot_action(str(err))
+        await log_bot_action(str(err), payload.user_id, "reaction")
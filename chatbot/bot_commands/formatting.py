@@ -1,6 +1,6 @@
 """Discord bot client messages formatting."""
 
-from typing import Any, Literal, TypeAlias
+from typing import TYPE_CHECKING, Any, Literal, TypeAlias
 
 from discord import (
     Colour,
@@ -11,10 +11,20 @@ from discord import (
     InvalidData,
     NotFound,
 )
+from discord.ext.commands import Bot
 
+from chatbot.audit import AUDIT_LOG
+from chatbot.classes import ResourceLink, find_categories
 from chatbot.logger import programLogger
+from chatbot.usage import USAGE
 
+if TYPE_CHECKING:
+    from .webhook import LogWebhook
+
+# Maximum length of an embed field's value.
+MAX_FIELD_LENGTH: int = 1024
 LOGS_CHANNEL = None
+LOGS_WEBHOOK: "LogWebhook | None" = None
 ResponseType: TypeAlias = Literal["success", "warning", "error"]
 TypeToTitle: dict[ResponseType, str] = {
     "success": "✅ SUCCESS",
@@ -26,6 +36,9 @@ TypeToColor: dict[ResponseType, int] = {
     "warning": 0xF1C40F,
     "error": 0xE74C3C,
 }
+TypeToColour: dict[ResponseType, Colour] = {
+    type: Colour(value=color) for type, color in TypeToColor.items()
+}
 
 
 def set_logs_channel(channel: Any | None) -> None:
@@ -39,6 +52,70 @@ def set_logs_channel(channel: Any | None) -> None:
     """
     if channel:
         globals()["LOGS_CHANNEL"] = channel
+    else:
+        programLogger.error("Bot logs channel not found.")
+
+
+async def fetch_logs_channel(client: Bot, channel_id: int) -> None:
+    """Set bot logs channel from its ID.
+
+    The channel is fetched from Discord when it isn't in the client's
+    cache, so that the logs channel isn't left unset.
+
+    Parameters
+    ----------
+    client : discord.ext.commands.Bot
+        The bot client.
+    channel_id : int
+        ID of the bot logs channel.
+
+    """
+    channel: Any | None = client.get_channel(channel_id)
+
+    if channel is None:
+        try:
+            channel = await client.fetch_channel(channel_id)
+
+        except (InvalidData, HTTPException, NotFound, Forbidden) as err:
+            programLogger.error(f"Failed fetching bot logs channel: {err}")
+
+    set_logs_channel(channel)
+
+
+def set_logs_webhook(webhook: "LogWebhook | None") -> None:
+    """Set the webhook the bot logs are sent through.
+
+    Parameters
+    ----------
+    webhook : LogWebhook or None
+        The started webhook, or None to send the logs to the channel.
+
+    """
+    globals()["LOGS_WEBHOOK"] = webhook
+
+
+async def send_logs_embeds(embeds: list[Embed]) -> None:
+    """Send embeds to bot logs channel.
+
+    Parameters
+    ----------
+    embeds : list of discord.Embed
+        At most 10 embeds.
+
+    Raises
+    ------
+    RuntimeError
+        If the channel isn't set or the message can't be sent.
+
+    """
+    if not LOGS_CHANNEL:
+        raise RuntimeError("Bot logs channel not found.")
+
+    try:
+        await LOGS_CHANNEL.send(embeds=embeds)
+
+    except (InvalidData, HTTPException, NotFound, Forbidden) as err:
+        raise RuntimeError(err)
 
 
 def create_response(message: str, type: ResponseType) -> Embed:
@@ -56,7 +133,7 @@ def create_response(message: str, type: ResponseType) -> Embed:
     discord.Embed
 
     """
-    embed = Embed(colour=Colour(value=TypeToColor[type]))
+    embed = Embed(colour=TypeToColour[type])
     embed.add_field(
         name=TypeToTitle[type],
         value=message,
@@ -65,8 +142,32 @@ def create_response(message: str, type: ResponseType) -> Embed:
     return embed
 
 
+def format_link(link: ResourceLink) -> str:
+    """Format a resource's link with its title if known.
+
+    Parameters
+    ----------
+    link : ResourceLink
+        The link.
+
+    Returns
+    -------
+    str
+        A Markdown link if the title is known. Otherwise, the URL. Dead
+        links are flagged.
+
+    """
+    text: str = link.url
+
+    if link.title:
+        title: str = link.title.replace("[", "(").replace("]", ")")
+        text = f"[{title}]({link.url})"
+
+    return f"⚠️ {text} (dead link)" if link.dead else text
+
+
 def log_interaction(interaction: Interaction) -> str:
-    """Log command and username for given interaction.
+    """Log command and username for given interaction and count its use.
 
     Parameters
     ----------
@@ -84,26 +185,48 @@ def log_interaction(interaction: Interaction) -> str:
         f"'{interaction.command.name}'."
     )
     programLogger.debug(message)
+    categories, _ = find_categories(interaction.namespace.category)
+    USAGE.count(
+        interaction.command.name, [category.value for category in categories]
+    )
 
     # NOTE: Return the logged message in case it needs to be used again.
     return message
 
 
-async def log_bot_action(message: str) -> None:
-    """Send message to bot logs channel.
+async def log_bot_action(
+    message: str,
+    user_id: int | None = None,
+    action: str = "bot",
+    notify: bool = True,
+) -> None:
+    """Record message in the audit log and send it to bot logs channel.
+
+    With a logs webhook, the message is only buffered and sent later.
+    Failures to send it are logged, so that they never prevent a command
+    from answering.
 
     Parameters
     ----------
     message : str
         The message content as a string.
-
-    Raises
-    ------
-    RuntimeError
-        If the channel can't be fetched or the message can't be sent.
+    user_id : int or None, default=None
+        ID of the user who acted, None for the bot's own actions.
+    action : str, default='bot'
+        The action name in the audit log.
+    notify : bool, default=True
+        Whether the message is sent to the bot logs channel.
 
     """
     programLogger.debug(message)
+    AUDIT_LOG.record(action, message, user_id)
+
+    if not notify:
+        return
+
+    if LOGS_WEBHOOK:
+        LOGS_WEBHOOK.post(message)
+        return
 
     if not LOGS_CHANNEL:
         programLogger.error("Failed fetching bot logs channel.")
@@ -113,4 +236,4 @@ async def log_bot_action(message: str) -> None:
         await LOGS_CHANNEL.send(message, suppress_embeds=True)
 
     except (InvalidData, HTTPException, NotFound, Forbidden) as err:
-        raise RuntimeError(err)
+        programLogger.error(f"Failed sending bot logs: {err}")
@@ -3,58 +3,61 @@
 from discord import Colour, Embed, Interaction
 
 from .formatting import log_interaction
+from .messages import MESSAGES, format_message
+from .tracing import InteractionTrace
 
+# Commands listed by the help message, each with a 'help_<command>' message.
+HELP_COMMANDS: list[str] = ["add_resource", "get_resources", "pins"]
 
-async def help(interaction: Interaction) -> None:
-    """Display all available commands.
+
+def build_help_message(locale: str) -> Embed:
+    """Build the help message.
 
     Parameters
     ----------
-    interaction : discord.Interaction
-        A user interaction with the bot (slash command).
+    locale : str
+        The catalog locale.
+
+    Returns
+    -------
+    discord.Embed
+        The available commands.
 
     """
-    log_interaction(interaction)
     usage_message = Embed(title="HELP 🤖", colour=Colour.purple())
 
     usage_message.add_field(
-        name="**🇬🇧 AVAILABLE COMMANDS**",
-        value=(
-            "Chatbot's messages will disappear after a few seconds "
-            "(it can take 20 to 60 sec depending on the command used)."
-        ),
-        inline=False,
-    )
-    usage_message.add_field(
-        name="**/add_resource**",
-        value="*Index a resource's link.*",
-        inline=False,
-    )
-    usage_message.add_field(
-        name="**/get_resources**",
-        value="*Display all resources or only those matching category.*",
+        name=format_message("help_title", locale),
+        value=format_message("help_intro", locale),
         inline=False,
     )
 
-    usage_message.add_field(
-        name="**🇫🇷 COMMANDES DISPONIBLES**",
-        value=(
-            "*Les messages de Chatbot disparaissent après quelques secondes "
-            "(après 20 à 60 sec selon les commandes).*"
-        ),
-        inline=False,
-    )
-    usage_message.add_field(
-        name="**/add_resource**",
-        value="*Enregistre le lien d'une ressource.*",
-        inline=False,
-    )
-    usage_message.add_field(
-        name="**/get_resources**",
-        value="*Affiche toutes les ressources ou la catégorie sélectionnée.*",
-        inline=False,
-    )
+    for command in HELP_COMMANDS:
+        usage_message.add_field(
+            name=f"**/{command}**",
+            value=format_message(f"help_{command}", locale),
+            inline=False,
+        )
 
-    await interaction.response.send_message(
-        embed=usage_message, ephemeral=True, delete_after=60.0
-    )
+    return usage_message
+
+
+# Built once at startup for every locale, shared by all help commands. They
+# must not be modified.
+HELP_MESSAGES: dict[str, Embed] = {
+    locale: build_help_message(locale) for locale in MESSAGES
+}
+
+
+async def help(interaction: Interaction) -> None:
+    """Display all available commands in the user's language.
+
+    Parameters
+    ----------
+    interaction : discord.Interaction
+        A user interaction with the bot (slash command).
+
+    """
+    log_interaction(interaction)
+    trace = InteractionTrace(interaction)
+    await trace.send(HELP_MESSAGES[trace.locale], delete_after=60.0)
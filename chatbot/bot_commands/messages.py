@@ -0,0 +1,287 @@
+"""Catalog of the bot's messages in the users' languages."""
+
+from string import Formatter
+from typing import Any
+
+from discord import Embed
+
+from .formatting import ResponseType, create_response
+
+# Locale used when the user's locale has no translation.
+DEFAULT_LOCALE: str = "en"
+# Locales to the message keys and their templates. A locale may omit keys,
+# they fall back to DEFAULT_LOCALE.
+MESSAGES: dict[str, dict[str, str]] = {
+    "en": {
+        "wrong_command": "Wrong command.",
+        "wrong_url": "Please provide a link starting with 'http(s)://'.",
+        "database_error": "Error. Please contact administrator.",
+        "no_resources": "No resources found.",
+        "shutting_down": "The bot is restarting, please retry in a moment.",
+        "rate_limited": "Too many commands, please retry in a moment.",
+        "unknown_category": "Unknown category '{categories}'.",
+        "link_added": "Link added to {filters}.",
+        "link_added_similar": (
+            "Link added to {filters}. Similar links already indexed:\n{links}"
+        ),
+        "no_filtered_resources": "No resources found in {filters}.",
+        "no_matching_resources": "No resources found matching '{search}'.",
+        "export_too_large": "Too many resources to export, add filters.",
+        "resources_exported": "**{filters}**\n{count} resources exported.",
+        "no_pins": "No pinned messages in <#{channel_id}>.",
+        "no_audit_events": "No actions in the last {hours} hours.",
+        "no_usage": "No commands used in the last {days} days.",
+        "no_duplicates": "No similar links found.",
+        "digest_title": "**{count} new resources**",
+        "roles_reconciled": (
+            "Roles reconciled in {duration} s: {added} given, {removed} "
+            "removed, {failed} failed, {pending} left to remove."
+        ),
+        "roles_not_reconciled": (
+            "Roles couldn't be reconciled with the roles message."
+        ),
+        "stats_title": "**Last {days} days: {count} commands**",
+        "stats_categories": "**Categories**",
+        "stats_per_day": "**Per day (UTC)**",
+        "duplicates_title": "**{count} groups of similar links**",
+        "audit_title": "**Last {hours} hours**",
+        "all_resources": "All",
+        "matching_title": "**Matching '{search}'**",
+        "pins_title": "**<#{channel_id}>: {count}/{max_pins} pins**",
+        "resource_exists": (
+            "This resource is already indexed with these categories and tags."
+        ),
+        "help_title": "**AVAILABLE COMMANDS**",
+        "help_intro": (
+            "Chatbot's messages will disappear after a few seconds "
+            "(it can take 20 to 60 sec depending on the command used)."
+        ),
+        "help_add_resource": (
+            "*Index a resource's link with its categories and tags.*"
+        ),
+        "help_get_resources": (
+            "*Display all resources or those matching categories or tags.*"
+        ),
+        "help_pins": "*List the messages pinned in a channel.*",
+    },
+    "fr": {
+        "wrong_command": "Commande invalide.",
+        "wrong_url": "Merci de fournir un lien commençant par 'http(s)://'.",
+        "database_error": "Erreur. Merci de contacter un administrateur.",
+        "no_resources": "Aucune ressource trouvée.",
+        "shutting_down": "Le bot redémarre, réessaie dans un instant.",
+        "rate_limited": "Trop de commandes, réessaie dans un instant.",
+        "unknown_category": "Catégorie inconnue '{categories}'.",
+        "link_added": "Lien ajouté à {filters}.",
+        "link_added_similar": (
+            "Lien ajouté à {filters}. Liens similaires déjà enregistrés :\n"
+            "{links}"
+        ),
+        "no_filtered_resources": "Aucune ressource trouvée dans {filters}.",
+        "no_matching_resources": "Aucune ressource trouvée pour '{search}'.",
+        "export_too_large": (
+            "Trop de ressources à exporter, ajoute des filtres."
+        ),
+        "resources_exported": "**{filters}**\n{count} ressources exportées.",
+        "no_pins": "Aucun message épinglé dans <#{channel_id}>.",
+        "no_audit_events": "Aucune action ces {hours} dernières heures.",
+        "no_usage": "Aucune commande utilisée ces {days} derniers jours.",
+        "no_duplicates": "Aucun lien similaire trouvé.",
+        "digest_title": "**{count} nouvelles ressources**",
+        "roles_reconciled": (
+            "Rôles synchronisés en {duration} s : {added} donnés, "
+            "{removed} retirés, {failed} en échec, {pending} à retirer."
+        ),
+        "roles_not_reconciled": (
+            "Impossible de synchroniser les rôles avec le message des rôles."
+        ),
+        "stats_title": "**{days} derniers jours : {count} commandes**",
+        "stats_categories": "**Catégories**",
+        "stats_per_day": "**Par jour (UTC)**",
+        "duplicates_title": "**{count} groupes de liens similaires**",
+        "audit_title": "**{hours} dernières heures**",
+        "all_resources": "Toutes",
+        "matching_title": "**Correspondant à '{search}'**",
+        "pins_title": "**<#{channel_id}> : {count}/{max_pins} épinglés**",
+        "resource_exists": (
+            "Cette ressource est déjà enregistrée avec ces catégories et "
+            "tags."
+        ),
+        "help_title": "**COMMANDES DISPONIBLES**",
+        "help_intro": (
+            "*Les messages de Chatbot disparaissent après quelques secondes "
+            "(après 20 à 60 sec selon les commandes).*"
+        ),
+        "help_add_resource": (
+            "*Enregistre le lien d'une ressource, ses catégories et tags.*"
+        ),
+        "help_get_resources": (
+            "*Affiche les ressources, ou celles des catégories et tags.*"
+        ),
+        "help_pins": "*Liste les messages épinglés d'un salon.*",
+    },
+}
+# Keys of the messages sent as command responses to their type.
+RESPONSE_TYPES: dict[str, ResponseType] = {
+    "wrong_command": "error",
+    "wrong_url": "error",
+    "database_error": "error",
+    "no_resources": "warning",
+    "shutting_down": "warning",
+    "rate_limited": "warning",
+    "unknown_category": "error",
+    "link_added": "success",
+    "link_added_similar": "warning",
+    "no_filtered_resources": "warning",
+    "no_matching_resources": "warning",
+    "export_too_large": "error",
+    "resources_exported": "success",
+    "no_pins": "warning",
+    "no_audit_events": "warning",
+    "no_usage": "warning",
+    "no_duplicates": "success",
+    "roles_reconciled": "success",
+    "roles_not_reconciled": "error",
+    "resource_exists": "error",
+}
+# Locales to the templates of every key, with the fallbacks resolved.
+TEMPLATES: dict[str, dict[str, str]] = {}
+# Locales to the prebuilt responses without fields. They are shared and
+# must not be modified.
+STATIC_RESPONSES: dict[str, dict[str, Embed]] = {}
+
+
+def has_fields(template: str) -> bool:
+    """Check whether a template has replacement fields.
+
+    Parameters
+    ----------
+    template : str
+        The message template.
+
+    Returns
+    -------
+    bool
+        True if the template must be formatted.
+
+    """
+    return any(field for _, field, _, _ in Formatter().parse(template))
+
+
+def build_catalog() -> None:
+    """Compile the catalog once at startup.
+
+    The templates of each locale are merged with the default ones, and the
+    responses without fields are built, so that no message is looked up
+    twice or rebuilt when a command is used.
+
+    """
+    default: dict[str, str] = MESSAGES[DEFAULT_LOCALE]
+
+    for locale, messages in MESSAGES.items():
+        templates: dict[str, str] = {**default, **messages}
+        TEMPLATES[locale] = templates
+        STATIC_RESPONSES[locale] = {
+            key: create_response(templates[key], type)
+            for key, type in RESPONSE_TYPES.items()
+            if not has_fields(templates[key])
+        }
+
+
+def get_locale(locale: Any) -> str:
+    """Return the catalog locale matching a Discord locale.
+
+    Parameters
+    ----------
+    locale : discord.Locale or str or None
+        The user's locale, for example 'fr' or 'en-US'.
+
+    Returns
+    -------
+    str
+        The locale, or its language, if it is in the catalog. Otherwise,
+        DEFAULT_LOCALE.
+
+    """
+    if locale is None:
+        return DEFAULT_LOCALE
+
+    name: str = str(locale)
+
+    if name in TEMPLATES:
+        return name
+
+    language: str = name.split("-")[0]
+
+    return language if language in TEMPLATES else DEFAULT_LOCALE
+
+
+def format_message(
+    key: str, locale: str = DEFAULT_LOCALE, **fields: Any
+) -> str:
+    """Format a message in a locale.
+
+    Parameters
+    ----------
+    key : str
+        The message key in MESSAGES.
+    locale : str, default=DEFAULT_LOCALE
+        The catalog locale.
+    **fields
+        The values of the template's fields.
+
+    Returns
+    -------
+    str
+        The message.
+
+    """
+    template: str = TEMPLATES.get(locale, TEMPLATES[DEFAULT_LOCALE])[key]
+
+    return template.format(**fields) if fields else template
+
+
+def static_response(key: str, locale: str = DEFAULT_LOCALE) -> Embed:
+    """Return a prebuilt command response.
+
+    Parameters
+    ----------
+    key : str
+        The response key in RESPONSE_TYPES, without fields.
+    locale : str, default=DEFAULT_LOCALE
+        The catalog locale.
+
+    Returns
+    -------
+    discord.Embed
+        The shared response. It must not be modified.
+
+    """
+    return STATIC_RESPONSES.get(locale, STATIC_RESPONSES[DEFAULT_LOCALE])[key]
+
+
+def format_response(
+    key: str, locale: str = DEFAULT_LOCALE, **fields: Any
+) -> Embed:
+    """Create a command response in a locale.
+
+    Parameters
+    ----------
+    key : str
+        The response key in RESPONSE_TYPES.
+    locale : str, default=DEFAULT_LOCALE
+        The catalog locale.
+    **fields
+        The values of the template's fields.
+
+    Returns
+    -------
+    discord.Embed
+
+    """
+    return create_response(
+        format_message(key, locale, **fields), RESPONSE_TYPES[key]
+    )
+
+
+build_catalog()
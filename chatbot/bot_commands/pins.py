@@ -0,0 +1,418 @@
+"""Command callbacks and index of the pinned messages."""
+
+from asyncio import CancelledError, Task, create_task, sleep
+from time import time
+
+from discord import Forbidden, HTTPException, Interaction, Message, TextChannel
+from discord.app_commands import describe
+from discord.ext.commands import Bot
+
+from chatbot.classes import Pin
+from chatbot.ipc import WorkerError
+from chatbot.logger import programLogger
+from chatbot.repository import get_repository
+
+from .dispatch import CommandResult, handler, run_handler
+from .formatting import (
+    MAX_FIELD_LENGTH,
+    create_response,
+    log_bot_action,
+    log_interaction,
+)
+from .messages import DEFAULT_LOCALE, format_message, format_response
+from .rate_limit import rate_limited
+from .resources import run_command
+from .tracing import InteractionTrace
+
+# Maximum number of pinned messages in a Discord channel.
+MAX_PINS: int = 50
+# Number of pins from which the bot logs channel is warned.
+PINS_WARNING: int = 45
+# Seconds between two reconciliations of the index with Discord.
+RECONCILE_INTERVAL: float = 6 * 3600.0
+# Seconds between the reconciliations of two channels.
+CHANNEL_DELAY: float = 1.0
+
+
+@handler("count_pins")
+async def count_pins(channel_id: int) -> int:
+    """Count the indexed pins of a channel.
+
+    Parameters
+    ----------
+    channel_id : int
+        The channel ID.
+
+    Returns
+    -------
+    int
+        The number of pinned messages.
+
+    """
+    return len(get_repository().fetch_pins(channel_id))
+
+
+@handler("save_pin")
+async def save_pin(
+    channel_id: int, message_id: int, pinned_by: int | None, pinned_at: float
+) -> int:
+    """Index a pinned message.
+
+    Parameters
+    ----------
+    channel_id : int
+        The channel ID.
+    message_id : int
+        The message ID.
+    pinned_by : int or None
+        ID of the user who pinned the message.
+    pinned_at : float
+        Timestamp of the pin.
+
+    Returns
+    -------
+    int
+        The number of pinned messages in the channel.
+
+    """
+    get_repository().save_pin(
+        Pin(channel_id, message_id, pinned_by, pinned_at)
+    )
+
+    return len(get_repository().fetch_pins(channel_id))
+
+
+@handler("delete_pin")
+async def delete_pin(channel_id: int, message_id: int) -> None:
+    """Remove an unpinned message from the index.
+
+    Parameters
+    ----------
+    channel_id : int
+        The channel ID.
+    message_id : int
+        The message ID.
+
+    """
+    get_repository().delete_pin(channel_id, message_id)
+
+
+@handler("reconcile_pins")
+async def reconcile_pins(
+    channel_id: int, pinned: list[tuple[int, float]]
+) -> tuple[int, int]:
+    """Replace the indexed pins of a channel with those on Discord.
+
+    Who pinned a message and when is kept for the messages already
+    indexed, Discord doesn't tell who pinned a message.
+
+    Parameters
+    ----------
+    channel_id : int
+        The channel ID.
+    pinned : list of tuple
+        The IDs and pin timestamps of the messages pinned on Discord.
+
+    Returns
+    -------
+    tuple of int
+        The number of pins added to and removed from the index.
+
+    """
+    indexed: dict[int, Pin] = {
+        pin.message_id: pin for pin in get_repository().fetch_pins(channel_id)
+    }
+    pins: list[Pin] = [
+        indexed.get(message_id) or Pin(channel_id, message_id, None, pinned_at)
+        for message_id, pinned_at in pinned
+    ]
+    added: int = len({pin.message_id for pin in pins} - indexed.keys())
+    removed: int = len(indexed.keys() - {pin.message_id for pin in pins})
+
+    if added or removed:
+        get_repository().replace_pins(channel_id, pins)
+
+    return added, removed
+
+
+@handler("list_pins")
+async def list_pins(
+    guild_id: int, channel_id: int, locale: str = DEFAULT_LOCALE
+) -> CommandResult:
+    """List the indexed pins of a channel.
+
+    Parameters
+    ----------
+    guild_id : int
+        The server ID.
+    channel_id : int
+        The channel ID.
+    locale : str, default=DEFAULT_LOCALE
+        The catalog locale of the response.
+
+    Returns
+    -------
+    CommandResult
+        The response.
+
+    """
+    pins: list[Pin] = get_repository().fetch_pins(channel_id)
+
+    if not pins:
+        return CommandResult(
+            format_response("no_pins", locale, channel_id=channel_id), 20.0
+        )
+
+    content: str = format_message(
+        "pins_title",
+        locale,
+        channel_id=channel_id,
+        count=len(pins),
+        max_pins=MAX_PINS,
+    )
+
+    for idx, pin in enumerate(pins):
+        line: str = (
+            f"\n<t:{int(pin.pinned_at)}:d> [message](https://discord.com/"
+            f"channels/{guild_id}/{channel_id}/{pin.message_id})"
+        )
+
+        if pin.pinned_by:
+            line += f" <@{pin.pinned_by}>"
+
+        more: str = f"\n… +{len(pins) - idx}"
+
+        if len(content) + len(line) + len(more) > MAX_FIELD_LENGTH:
+            content += more
+            break
+
+        content += line
+
+    return CommandResult(create_response(content, type="success"), 60.0)
+
+
+@rate_limited("pins")
+@describe(channel="The channel, this one by default")
+async def pins(
+    interaction: Interaction, channel: TextChannel | None = None
+) -> None:
+    """List the messages pinned in a channel.
+
+    Parameters
+    ----------
+    interaction : discord.Interaction
+        A user interaction with the bot (slash command).
+    channel : discord.TextChannel or None, default=None
+        The channel. If None, the channel the command was used in.
+
+    """
+    action: str = log_interaction(interaction)
+    trace = InteractionTrace(interaction)
+    await run_command(
+        trace,
+        action,
+        "list_pins",
+        guild_id=interaction.guild_id,
+        channel_id=channel.id if channel else interaction.channel_id,
+    )
+
+
+async def index_pin(message: Message, user_id: int, pin: bool) -> int | None:
+    """Record a message pinned or unpinned by a user in the index.
+
+    Parameters
+    ----------
+    message : discord.Message
+        The message.
+    user_id : int
+        ID of the user who reacted.
+    pin : bool
+        Whether the message was pinned.
+
+    Returns
+    -------
+    int or None
+        The number of pinned messages in the channel if the message was
+        pinned and indexed. Otherwise, None.
+
+    """
+    try:
+        if pin:
+            count: int = await run_handler(
+                "save_pin",
+                channel_id=message.channel.id,
+                message_id=message.id,
+                pinned_by=user_id,
+                pinned_at=time(),
+            )
+
+            return count
+
+        await run_handler(
+            "delete_pin", channel_id=message.channel.id, message_id=message.id
+        )
+
+    except (ConnectionError, TimeoutError, WorkerError) as err:
+        # The next reconciliation fixes the index.
+        programLogger.warning(f"Failed indexing pin: {err}")
+
+    return None
+
+
+async def count_channel_pins(channel_id: int) -> int:
+    """Count the indexed pins of a channel.
+
+    Parameters
+    ----------
+    channel_id : int
+        The channel ID.
+
+    Returns
+    -------
+    int
+        The number of pinned messages, 0 if the index can't be read.
+
+    """
+    try:
+        count: int = await run_handler("count_pins", channel_id=channel_id)
+
+        return count
+
+    except (ConnectionError, TimeoutError, WorkerError) as err:
+        programLogger.warning(f"Failed counting pins: {err}")
+
+    return 0
+
+
+class PinReconciler:
+    """Class reconciling the pins index with Discord in the background.
+
+    Messages pinned or unpinned without reactions, or while the bot was
+    offline, are found by fetching the pins of every text channel the
+    bot can read, one channel at a time.
+
+    Methods
+    -------
+    start()
+        Start the reconciliations.
+    stop()
+        Cancel the reconciliations.
+    reconcile()
+        Reconcile the index with the pins of every channel.
+
+    """
+
+    def __init__(self, client: Bot) -> None:
+        """Set the bot client.
+
+        Parameters
+        ----------
+        client : discord.ext.commands.Bot
+            The bot client.
+
+        """
+        self.client: Bot = client
+        self._task: Task[None] | None = None
+
+    def start(self) -> None:
+        """Start the reconciliations."""
+        self._task = create_task(self._run(), name="pin-reconciler")
+
+    def stop(self) -> None:
+        """Cancel the reconciliations."""
+        if self._task:
+            self._task.cancel()
+
+        self._task = None
+
+    async def _run(self) -> None:
+        """Reconcile the index periodically once the bot is connected."""
+        await self.client.wait_until_ready()
+
+        while True:
+            try:
+                await self.reconcile()
+
+            except CancelledError:
+                raise
+
+            except Exception as err:
+                programLogger.error(f"Failed reconciling pins: {err}")
+
+            await sleep(RECONCILE_INTERVAL)
+
+    async def reconcile_channel(self, channel: TextChannel) -> tuple[int, int]:
+        """Reconcile the index with the pins of a channel.
+
+        Parameters
+        ----------
+        channel : discord.TextChannel
+            The channel.
+
+        Returns
+        -------
+        tuple of int
+            The number of pins added to and removed from the index.
+
+        """
+        messages: list[Message] = await channel.pins()
+        added, removed = await run_handler(
+            "reconcile_pins",
+            channel_id=channel.id,
+            pinned=[
+                (
+                    message.id,
+                    (
+                        getattr(message, "pinned_at", None)
+                        or message.created_at
+                    ).timestamp(),
+                )
+                for message in messages
+            ],
+        )
+
+        # Channels filled while the bot was offline are reported too.
+        if len(messages) >= PINS_WARNING:
+            await log_bot_action(
+                f"Channel <#{channel.id}> has {len(messages)}/{MAX_PINS} "
+                "pinned messages.",
+                action="pins",
+            )
+
+        return added, removed
+
+    async def reconcile(self) -> int:
+        """Reconcile the index with the pins of every channel.
+
+        Returns
+        -------
+        int
+            The number of pins added to or removed from the index.
+
+        """
+        changes: int = 0
+
+        for guild in self.client.guilds:
+            for channel in guild.text_channels:
+                permissions = channel.permissions_for(guild.me)
+
+                if not (
+                    permissions.view_channel
+                    and permissions.read_message_history
+                ):
+                    continue
+
+                try:
+                    added, removed = await self.reconcile_channel(channel)
+                    changes += added + removed
+
+                except (Forbidden, HTTPException) as err:
+                    programLogger.warning(
+                        f"Failed fetching pins of '{channel.name}': {err}"
+                    )
+
+                await sleep(CHANNEL_DELAY)
+
+        programLogger.info(f"Reconciled pins: {changes} changes.")
+
+        return changes
@@ -0,0 +1,239 @@
+"""Token-bucket rate limiting of commands."""
+
+from functools import wraps
+from time import monotonic
+from typing import Any, Callable, Coroutine, Hashable
+
+from discord import HTTPException, Interaction
+
+from chatbot.logger import programLogger
+from chatbot.metrics import increment_metric
+
+from .messages import get_locale, static_response
+
+# Command names to their burst size and seconds to earn one more use, for
+# a single user.
+RATE_LIMITS: dict[str, tuple[int, float]] = {
+    "add_resource": (3, 20.0),
+    "get_resources": (5, 6.0),
+    "pins": (5, 6.0),
+}
+# Number of users whose usage a server can sustain before being limited.
+GUILD_RATE_FACTOR: int = 10
+# Seconds between two evictions of the idle buckets.
+EVICT_INTERVAL: float = 60.0
+
+CommandCallback = Callable[..., Coroutine[Any, Any, None]]
+
+
+class RateLimiter:
+    """Class limiting how often keys can act with token buckets.
+
+    Each key earns a token every `period` seconds, up to `capacity`
+    tokens, and spends one per action. A bucket refilled to capacity is
+    the same as no bucket, so idle buckets are evicted: memory is bounded
+    by the number of keys active within a refill period.
+
+    Methods
+    -------
+    acquire(key)
+        Spend a token if the key has one.
+    refund(key)
+        Give back a token spent by the key.
+    evict(now)
+        Drop the buckets refilled to capacity.
+
+    """
+
+    def __init__(self, capacity: int, period: float) -> None:
+        """Set the buckets parameters.
+
+        Parameters
+        ----------
+        capacity : int
+            The maximum number of tokens, i.e. the burst size.
+        period : float
+            Seconds to earn a token.
+
+        """
+        self.capacity: float = float(capacity)
+        self.rate: float = 1.0 / period
+        # Keys to their tokens and the time they were counted.
+        self._buckets: dict[Hashable, tuple[float, float]] = {}
+        self._last_eviction: float = monotonic()
+
+    def __len__(self) -> int:
+        """Return the number of buckets."""
+        return len(self._buckets)
+
+    def _tokens(self, key: Hashable, now: float) -> float:
+        """Count the tokens of a key.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key.
+        now : float
+            The current monotonic time.
+
+        Returns
+        -------
+        float
+            The tokens.
+
+        """
+        bucket: tuple[float, float] | None = self._buckets.get(key)
+
+        if bucket is None:
+            return self.capacity
+
+        return min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+
+    def acquire(self, key: Hashable) -> bool:
+        """Spend a token if the key has one.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key.
+
+        Returns
+        -------
+        bool
+            Whether the key may act.
+
+        """
+        now: float = monotonic()
+
+        if now - self._last_eviction >= EVICT_INTERVAL:
+            self.evict(now)
+
+        tokens: float = self._tokens(key, now)
+
+        if tokens < 1.0:
+            return False
+
+        self._buckets[key] = (tokens - 1.0, now)
+        return True
+
+    def refund(self, key: Hashable) -> None:
+        """Give back a token spent by the key.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key.
+
+        """
+        now: float = monotonic()
+        self._buckets[key] = (
+            min(self.capacity, self._tokens(key, now) + 1.0),
+            now,
+        )
+
+    def evict(self, now: float) -> None:
+        """Drop the buckets refilled to capacity.
+
+        Parameters
+        ----------
+        now : float
+            The current monotonic time.
+
+        """
+        self._last_eviction = now
+        idle: list[Hashable] = [
+            key
+            for key in self._buckets
+            if self._tokens(key, now) >= self.capacity
+        ]
+
+        for key in idle:
+            del self._buckets[key]
+
+
+# Command names to their per-user and per-server limiters.
+LIMITERS: dict[str, tuple[RateLimiter, RateLimiter]] = {
+    command: (
+        RateLimiter(capacity, period),
+        RateLimiter(capacity * GUILD_RATE_FACTOR, period / GUILD_RATE_FACTOR),
+    )
+    for command, (capacity, period) in RATE_LIMITS.items()
+}
+
+
+def allow(command: str, interaction: Interaction) -> bool:
+    """Spend the user and server tokens of a command.
+
+    Parameters
+    ----------
+    command : str
+        The command name.
+    interaction : discord.Interaction
+        A user interaction with the bot (slash command).
+
+    Returns
+    -------
+    bool
+        Whether the command may run.
+
+    """
+    users, guilds = LIMITERS[command]
+
+    if not users.acquire(interaction.user.id):
+        return False
+
+    if interaction.guild_id is not None and not guilds.acquire(
+        interaction.guild_id
+    ):
+        users.refund(interaction.user.id)
+        return False
+
+    return True
+
+
+def rate_limited(command: str) -> Callable[[CommandCallback], CommandCallback]:
+    """Reject the calls of a command beyond its rate limits.
+
+    Rejected calls get a prebuilt ephemeral response and never reach the
+    command callback, the database or the bot logs channel.
+
+    Parameters
+    ----------
+    command : str
+        The command name in RATE_LIMITS.
+
+    Returns
+    -------
+    callable
+        The decorator of the command callback.
+
+    """
+
+    def decorator(callback: CommandCallback) -> CommandCallback:
+        @wraps(callback)
+        async def wrapper(
+            interaction: Interaction, *args: Any, **kwargs: Any
+        ) -> None:
+            if allow(command, interaction):
+                await callback(interaction, *args, **kwargs)
+                return
+
+            increment_metric("interactions.rate_limited")
+            programLogger.debug(
+                f"User '{interaction.user.name}' rate limited on '{command}'."
+            )
+
+            try:
+                await interaction.response.send_message(
+                    embed=static_response(
+                        "rate_limited", get_locale(interaction.locale)
+                    ),
+                    ephemeral=True,
+                )
+
+            except HTTPException as err:
+                programLogger.debug(f"Failed rejecting command: {err}")
+
+        return wrapper
+
+    return decorator
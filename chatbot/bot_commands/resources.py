@@ -1,26 +1,406 @@
 """Command callbacks for resources."""
 
-from discord import Embed, Interaction
-from discord.app_commands import Choice, choices, describe
+from typing import Any
+
+from discord import File, Interaction
+from discord.app_commands import Choice, autocomplete, choices, describe
 from discord.app_commands.errors import CommandInvokeError
 
-from chatbot.classes import CATEGORIES
-from chatbot.database import (
-    create_resource,
-    fetch_all_resources,
-    fetch_category,
-    fetch_resources,
+from chatbot.classes import (
+    CATEGORY_NAMES,
+    ResourceLink,
+    ResourcePage,
+    find_categories,
+    normalize_tags,
 )
+from chatbot.coalescer import RESOURCE_WRITER
+from chatbot.enrichment import ENRICHER
+from chatbot.export import EXPORT_FORMATS, export_resources
+from chatbot.ipc import WorkerError
 from chatbot.logger import programLogger
+from chatbot.repository import get_repository
+from chatbot.search import (
+    CATEGORY_INDEX,
+    RESOURCE_INDEX,
+    TAG_INDEX,
+    PrefixIndex,
+)
+from chatbot.shutdown import WORK
+from chatbot.similarity import DUPLICATE_INDEX
+
+from .dispatch import CommandResult, handler, run_handler
+from .formatting import (
+    MAX_FIELD_LENGTH,
+    create_response,
+    format_link,
+    log_bot_action,
+    log_interaction,
+)
+from .messages import (
+    DEFAULT_LOCALE,
+    format_message,
+    format_response,
+    static_response,
+)
+from .rate_limit import rate_limited
+from .tracing import InteractionTrace
+from .views import build_page_view
+
+# Maximum length of an autocompletion choice's name and value.
+MAX_CHOICE_LENGTH: int = 100
+MATCH_CHOICES: list[Choice[str]] = [
+    Choice(name="Any category or tag", value="any"),
+    Choice(name="All categories and tags", value="all"),
+]
+EXPORT_CHOICES: list[Choice[str]] = [
+    Choice(name="Markdown file", value="markdown"),
+    Choice(name="CSV file", value="csv"),
+]
+# Seconds after which an exported listing is deleted.
+EXPORT_DELETE_AFTER: float = 300.0
+# Number of resources per page of a listing.
+PAGE_SIZE: int = 10
+# Maximum number of resources per page of a listing.
+MAX_PAGE_SIZE: int = 25
+# Seconds after which a paginated listing is deleted.
+PAGE_DELETE_AFTER: float = 300.0
+
+
+def complete_values(
+    current: str, index: PrefixIndex, names: dict[str, str] | None = None
+) -> list[Choice[str]]:
+    """Suggest completions for the last of comma-separated values.
+
+    Parameters
+    ----------
+    current : str
+        The comma-separated values typed by the user.
+    index : PrefixIndex
+        The index to search the last value in.
+    names : dict or None, default=None
+        The values to their displayed names.
+
+    Returns
+    -------
+    list of discord.app_commands.Choice
+        The previous values followed by each match.
+
+    """
+    *previous, last = current.split(",")
+    values: list[str] = [value.strip() for value in previous if value.strip()]
+    names = names or {}
+    completions: list[Choice[str]] = []
+
+    for match in index.search(last):
+        if match not in values:
+            selected: list[str] = [*values, match]
+            label: str = ", ".join(
+                names.get(value, value) for value in selected
+            )
+            completions.append(
+                Choice(
+                    name=label[:MAX_CHOICE_LENGTH],
+                    value=",".join(selected)[:MAX_CHOICE_LENGTH],
+                )
+            )
+
+    return completions
+
+
+async def category_autocomplete(
+    interaction: Interaction, current: str
+) -> list[Choice[str]]:
+    """Suggest the categories matching the text typed by the user.
+
+    Parameters
+    ----------
+    interaction : discord.Interaction
+        A user interaction with the bot (autocompletion).
+    current : str
+        The comma-separated categories typed by the user.
+
+    Returns
+    -------
+    list of discord.app_commands.Choice
+        The matching categories.
+
+    """
+    return complete_values(current, CATEGORY_INDEX, CATEGORY_NAMES)
+
+
+@handler("complete_tags")
+async def complete_tags(current: str) -> list[tuple[str, str]]:
+    """Suggest the existing tags matching comma-separated tags.
+
+    Parameters
+    ----------
+    current : str
+        The comma-separated tags typed by the user.
+
+    Returns
+    -------
+    list of tuple
+        The names and values of the matching tags.
+
+    """
+    return [
+        (choice.name, choice.value)
+        for choice in complete_values(current, TAG_INDEX)
+    ]
+
+
+@handler("complete_resources")
+async def complete_resources(current: str) -> list[tuple[str, str]]:
+    """Suggest the indexed links matching a text.
+
+    Parameters
+    ----------
+    current : str
+        The text typed by the user.
+
+    Returns
+    -------
+    list of tuple
+        The names and values of the matching links.
+
+    """
+    return [
+        (url[:MAX_CHOICE_LENGTH], url[:MAX_CHOICE_LENGTH])
+        for url in RESOURCE_INDEX.search(current)
+    ]
+
+
+async def remote_autocomplete(name: str, current: str) -> list[Choice[str]]:
+    """Run an autocompletion handler.
+
+    Parameters
+    ----------
+    name : str
+        The handler name.
+    current : str
+        The text typed by the user.
+
+    Returns
+    -------
+    list of discord.app_commands.Choice
+        The suggestions, none if the handler failed.
+
+    """
+    try:
+        suggestions: list[tuple[str, str]] = await run_handler(
+            name, current=current
+        )
+
+    except (ConnectionError, TimeoutError, WorkerError) as err:
+        programLogger.warning(f"Failed autocompleting: {err}")
+        return []
+
+    return [Choice(name=label, value=value) for label, value in suggestions]
+
+
+async def tag_autocomplete(
+    interaction: Interaction, current: str
+) -> list[Choice[str]]:
+    """Suggest the existing tags matching the text typed by the user.
 
-from .formatting import create_response, log_bot_action, log_interaction
+    Parameters
+    ----------
+    interaction : discord.Interaction
+        A user interaction with the bot (autocompletion).
+    current : str
+        The comma-separated tags typed by the user.
+
+    Returns
+    -------
+    list of discord.app_commands.Choice
+        The matching tags.
+
+    """
+    return await remote_autocomplete("complete_tags", current)
+
+
+async def resource_autocomplete(
+    interaction: Interaction, current: str
+) -> list[Choice[str]]:
+    """Suggest the indexed links matching the text typed by the user.
+
+    Parameters
+    ----------
+    interaction : discord.Interaction
+        A user interaction with the bot (autocompletion).
+    current : str
+        The text typed by the user.
+
+    Returns
+    -------
+    list of discord.app_commands.Choice
+        The matching links.
+
+    """
+    return await remote_autocomplete("complete_resources", current)
+
+
+async def run_command(
+    trace: InteractionTrace, action: str, name: str, **kwargs: Any
+) -> None:
+    """Run a command handler and send its response.
+
+    Parameters
+    ----------
+    trace : InteractionTrace
+        The traced user interaction with the bot (slash command).
+    action : str
+        The logged interaction, prefixing the bot logs.
+    name : str
+        The handler name.
+    **kwargs
+        The handler arguments. The user's locale is passed as well, so
+        that the handler answers in their language.
+
+    """
+    result: CommandResult
+
+    if not WORK.accepting:
+        await trace.send(
+            static_response("shutting_down", trace.locale), delete_after=20.0
+        )
+        return
+
+    # Tracked until the response is sent and logged, so that shutdown
+    # waits for them.
+    async with WORK.track():
+        try:
+            await trace.defer_if_late()
+            result = await run_handler(name, locale=trace.locale, **kwargs)
+            await trace.checkpoint("handled")
+
+        except CommandInvokeError as err:
+            programLogger.error(err)
+            result = CommandResult(
+                static_response("wrong_command", trace.locale),
+                20.0,
+                "Wrong command.",
+            )
 
+        except (ConnectionError, TimeoutError, WorkerError) as err:
+            programLogger.error(f"Failed running command: {err}")
+            result = CommandResult(
+                static_response("database_error", trace.locale),
+                20.0,
+                "Worker error.",
+            )
+
+        await trace.send(
+            result.embed,
+            delete_after=result.delete_after,
+            file=result.file,
+            view=build_page_view(result.page) if result.page else None,
+        )
+
+        # Logged once the user has the response, sending the bot logs
+        # can wait for Discord's rate limits.
+        if result.log:
+            await log_bot_action(
+                f"{action} {result.log}",
+                trace.interaction.user.id,
+                name,
+                result.notify,
+            )
+
+
+@handler("add_resource")
+async def handle_add_resource(
+    url: str,
+    category: str,
+    tags: str | None = None,
+    locale: str = DEFAULT_LOCALE,
+) -> CommandResult:
+    """Index a resource's link.
+
+    Parameters
+    ----------
+    url : str
+        The URL to add.
+    category : str
+        The URL's comma-separated category names or values.
+    tags : str or None, default=None
+        The URL's comma-separated tags.
+    locale : str, default=DEFAULT_LOCALE
+        The catalog locale of the response.
+
+    Returns
+    -------
+    CommandResult
+        The response.
+
+    """
+    categories, unknown = find_categories(category)
+
+    if unknown or not categories:
+        return CommandResult(
+            format_response(
+                "unknown_category",
+                locale,
+                categories=", ".join(unknown) or category,
+            ),
+            20.0,
+        )
+
+    if not url or not (
+        url.startswith("http://") or url.startswith("https://")
+    ):
+        return CommandResult(
+            static_response("wrong_url", locale),
+            20.0,
+            f"Wrong URL: '{url}'",
+            notify=False,
+        )
+
+    # Looked up before the link is indexed, so that it isn't found itself.
+    similar: list[tuple[str, float]] = DUPLICATE_INDEX.similar(url)
+
+    try:
+        resource_id: int | None = await RESOURCE_WRITER.create_resource(
+            url,
+            [choice.value for choice in categories],
+            normalize_tags(tags),
+        )
+
+    except ValueError:
+        return CommandResult(static_response("resource_exists", locale), 20.0)
+
+    if not resource_id:
+        return CommandResult(
+            static_response("database_error", locale), 20.0, "Database error."
+        )
 
+    ENRICHER.enqueue(url)
+    filters: str = format_filters(categories, [])
+
+    return CommandResult(
+        (
+            format_response(
+                "link_added_similar",
+                locale,
+                filters=filters,
+                links="\n".join(similar_url for similar_url, _ in similar),
+            )
+            if similar
+            else format_response("link_added", locale, filters=filters)
+        ),
+        20.0,
+        f"Added '{url}' to {filters}.",
+        notify=False,
+    )
+
+
+@rate_limited("add_resource")
 @describe(url="The link starting with 'http(s)://'")
-@describe(category="The category")
-@choices(category=CATEGORIES)
+@describe(category="The categories, separated by commas")
+@describe(tags="Free-form tags, separated by commas")
+@autocomplete(category=category_autocomplete, tags=tag_autocomplete)
 async def add_resource(
-    interaction: Interaction, url: str, category: Choice[str]
+    interaction: Interaction, url: str, category: str, tags: str | None = None
 ) -> None:
     """Index a resource's link.
 
@@ -30,154 +410,482 @@ async def add_resource(
         A user interaction with the bot (slash command).
     url : str
         The URL to add.
-    category : discord.app_commands.Choice
-        The URL's category.
+    category : str
+        The URL's comma-separated category names or values.
+    tags : str or None, default=None
+        The URL's comma-separated tags.
 
     """
     action: str = log_interaction(interaction)
+    trace = InteractionTrace(interaction)
+    await run_command(
+        trace, action, "add_resource", url=url, category=category, tags=tags
+    )
 
-    try:
-        response: Embed | None = None
-
-        if not url or not (
-            url.startswith("http://") or url.startswith("https://")
-        ):
-            response = create_response(
-                "Please provide a link starting with 'http(s)://'.",
-                type="error",
-            )
-            await log_bot_action(f"{action} Wrong URL: '{url}'")
 
-        else:
-            if create_resource(url, category.value):
-                response = create_response(
-                    f"Link added to {category.name} category.",
-                    type="success",
-                )
+def get_all_resources(locale: str = DEFAULT_LOCALE) -> CommandResult:
+    """List all resources.
 
-            else:
-                response = create_response(
-                    "Error. Please contact administrator.", type="error"
-                )
-                await log_bot_action(f"{action} Database error.")
+    Parameters
+    ----------
+    locale : str, default=DEFAULT_LOCALE
+        The catalog locale of the response.
 
-    except ValueError as err:
-        response = create_response(str(err), type="error")
+    Returns
+    -------
+    CommandResult
+        The response.
+
+    """
+    resources: dict[str, list[ResourceLink]] = (
+        get_repository().fetch_all_resources()
+    )
+
+    if not resources:
+        return CommandResult(static_response("no_resources", locale), 20.0)
+
+    link_list: str = ""
+
+    for category_name, links in resources.items():
+        category_list: str = "\n".join(format_link(link) for link in links)
+        link_list += f"**{category_name}**\n{category_list}\n"
+
+    if len(link_list) > MAX_FIELD_LENGTH:
+        return get_resources_page("", "", False, locale=locale)
+
+    return CommandResult(create_response(link_list, type="success"), 60.0)
+
+
+def format_filters(
+    categories: list[Choice[str]], tags: list[str], match_all: bool = False
+) -> str:
+    """Format the categories and tags resources are filtered by.
+
+    Parameters
+    ----------
+    categories : list of discord.app_commands.Choice
+        The categories.
+    tags : list of str
+        The tags.
+    match_all : bool, default=False
+        Whether the resources must match every filter.
+
+    Returns
+    -------
+    str
+        The filters, for example 'Web, Pwn, #heap'.
 
-    except CommandInvokeError as err:
-        programLogger.error(err)
-        response = create_response("Wrong command.", type="error")
-        await log_bot_action(f"{action} Wrong command.")
+    """
+    separator: str = " & " if match_all else ", "
 
-    await interaction.response.send_message(
-        embed=response, ephemeral=True, delete_after=20.0
+    return separator.join(
+        [choice.name for choice in categories] + [f"#{tag}" for tag in tags]
     )
 
 
-async def get_all_resources(interaction: Interaction) -> None:
-    """Display all resources.
+def get_filtered_resources(
+    categories: list[Choice[str]],
+    tags: list[str],
+    match_all: bool,
+    locale: str = DEFAULT_LOCALE,
+) -> CommandResult:
+    """List all resources matching categories and tags.
 
     Parameters
     ----------
-    interaction : discord.Interaction
-        A user interaction with the bot (slash command).
+    categories : list of discord.app_commands.Choice
+        The categories to display.
+    tags : list of str
+        The tags to display.
+    match_all : bool
+        If True, the resources must match every category and tag.
+        Otherwise, any of them.
+    locale : str, default=DEFAULT_LOCALE
+        The catalog locale of the response.
+
+    Returns
+    -------
+    CommandResult
+        The response.
 
     """
-    resources: dict[str, list[str]] = fetch_all_resources()
+    resources: list[ResourceLink] = get_repository().fetch_resources(
+        [choice.value for choice in categories], tags, match_all
+    )
+    filters: str = format_filters(categories, tags, match_all)
 
-    if resources:
-        link_list: str = ""
+    if not resources:
+        return CommandResult(
+            format_response("no_filtered_resources", locale, filters=filters),
+            20.0,
+        )
 
-        for category_id, links in resources.items():
-            category_list: str = "\n".join(set(links))
-            link_list += (
-                f"**{fetch_category(category_id)}**\n{category_list}\n"
-            )
+    link_list: str = f"**{filters}**\n" + "\n".join(
+        format_link(link) for link in resources
+    )
 
-        await interaction.response.send_message(
-            embed=create_response(link_list, type="success"),
-            ephemeral=True,
-            delete_after=60.0,
+    if len(link_list) > MAX_FIELD_LENGTH:
+        return get_resources_page(
+            ",".join(choice.value for choice in categories),
+            ",".join(tags),
+            match_all,
+            locale=locale,
         )
 
-    else:
-        await interaction.response.send_message(
-            embed=create_response(
-                f"🇬🇧 No resources found.\n🇫🇷 Aucune ressource trouvée.",
-                type="warning",
+    return CommandResult(create_response(link_list, type="success"), 60.0)
+
+
+@handler("get_resources_page")
+async def handle_get_resources_page(
+    category: str,
+    tags: str,
+    match_all: bool,
+    cursor: int = 0,
+    size: int = PAGE_SIZE,
+    locale: str = DEFAULT_LOCALE,
+) -> CommandResult:
+    """List a page of the resources matching categories and tags.
+
+    Parameters
+    ----------
+    category : str
+        The comma-separated category values, empty for all resources.
+    tags : str
+        The comma-separated tags.
+    match_all : bool
+        If True, the resources must match every category and tag.
+        Otherwise, any of them.
+    cursor : int, default=0
+        Position of the page's first resource in the listing.
+    size : int, default=PAGE_SIZE
+        Maximum number of resources on the page.
+    locale : str, default=DEFAULT_LOCALE
+        The catalog locale of the response.
+
+    Returns
+    -------
+    CommandResult
+        The response.
+
+    """
+    return get_resources_page(category, tags, match_all, cursor, size, locale)
+
+
+def get_resources_page(
+    category: str,
+    tags: str,
+    match_all: bool,
+    cursor: int = 0,
+    size: int = PAGE_SIZE,
+    locale: str = DEFAULT_LOCALE,
+) -> CommandResult:
+    """List a page of the resources matching categories and tags.
+
+    The resources are streamed from the repository and only those of the
+    page are formatted. A page ends early if its links don't fit in the
+    response.
+
+    Parameters
+    ----------
+    category : str
+        The comma-separated category values, empty for all resources.
+    tags : str
+        The comma-separated tags.
+    match_all : bool
+        If True, the resources must match every category and tag.
+        Otherwise, any of them.
+    cursor : int, default=0
+        Position of the page's first resource in the listing.
+    size : int, default=PAGE_SIZE
+        Maximum number of resources on the page.
+    locale : str, default=DEFAULT_LOCALE
+        The catalog locale of the response.
+
+    Returns
+    -------
+    CommandResult
+        The response, with the page shown.
+
+    """
+    categories, _ = find_categories(category)
+    tag_list: list[str] = normalize_tags(tags)
+    size = max(1, min(size, MAX_PAGE_SIZE))
+    filters: str = format_filters(categories, tag_list, match_all)
+    # Room for the heading, for example '**Web, #heap** 11-20/42'.
+    length: int = len(filters) + 32
+    lines: list[str] = []
+    full: bool = False
+    total: int = 0
+
+    for row in get_repository().iter_resources(
+        [choice.value for choice in categories], tag_list, match_all
+    ):
+        if cursor <= total < cursor + size and not full:
+            line: str = format_link(ResourceLink(row.url, row.title, row.dead))
+            limit: int = MAX_FIELD_LENGTH - length
+
+            if len(line) < limit:
+                lines.append(line)
+                length += len(line) + 1
+
+            elif lines:
+                full = True
+
+            else:
+                lines.append(line[:limit])
+
+        total += 1
+
+    if not total:
+        return CommandResult(
+            (
+                format_response(
+                    "no_filtered_resources", locale, filters=filters
+                )
+                if filters
+                else static_response("no_resources", locale)
             ),
-            ephemeral=True,
-            delete_after=20.0,
+            20.0,
         )
 
+    page = ResourcePage(
+        ",".join(choice.value for choice in categories),
+        ",".join(tag_list),
+        match_all,
+        cursor,
+        size,
+        len(lines),
+        total,
+    )
+    heading: str = (
+        f"**{filters or format_message('all_resources', locale)}** "
+        f"{cursor + 1}-{cursor + len(lines)}/{total}"
+    )
+
+    return CommandResult(
+        create_response("\n".join([heading] + lines), type="success"),
+        PAGE_DELETE_AFTER,
+        page=page,
+    )
 
-async def get_category_resources(
-    interaction: Interaction, category: Choice[str]
-) -> None:
-    """Display all resources matching category.
+
+def export_listing(
+    categories: list[Choice[str]],
+    tags: list[str],
+    match_all: bool,
+    format: str,
+    locale: str = DEFAULT_LOCALE,
+) -> CommandResult:
+    """Attach all resources matching categories and tags as a file.
+
+    The rows are streamed from the repository to the file, so that large
+    listings are sent in a single response.
 
     Parameters
     ----------
-    interaction : discord.Interaction
-        A user interaction with the bot (slash command).
-    category : discord.app_commands.Choice
-        The category to display.
+    categories : list of discord.app_commands.Choice
+        The categories to export, all resources if there are no filters.
+    tags : list of str
+        The tags to export.
+    match_all : bool
+        If True, the resources must match every category and tag.
+        Otherwise, any of them.
+    format : {'markdown', 'csv'}
+        The file format.
+    locale : str, default=DEFAULT_LOCALE
+        The catalog locale of the response.
+
+    Returns
+    -------
+    CommandResult
+        The response.
 
     """
-    resources: list[str] = fetch_resources(category.value)
-
-    if resources:
-        link_list: str = "\n".join(set(resources))
+    extension, _ = EXPORT_FORMATS[format]
 
-        await interaction.response.send_message(
-            embed=create_response(
-                f"**{category.name}**\n{link_list}", type="success"
+    try:
+        buffer, count = export_resources(
+            get_repository().iter_resources(
+                [choice.value for choice in categories], tags, match_all
             ),
-            ephemeral=True,
-            delete_after=60.0,
+            format,
+        )
+
+    except ValueError as err:
+        programLogger.warning(f"Failed exporting resources: {err}")
+        return CommandResult(static_response("export_too_large", locale), 20.0)
+
+    if not count:
+        buffer.close()
+        return CommandResult(static_response("no_resources", locale), 20.0)
+
+    filters: str = format_filters(categories, tags, match_all)
+
+    return CommandResult(
+        format_response(
+            "resources_exported",
+            locale,
+            filters=filters or format_message("all_resources", locale),
+            count=count,
+        ),
+        EXPORT_DELETE_AFTER,
+        file=File(buffer, filename=f"resources.{extension}"),
+    )
+
+
+def get_matching_resources(
+    search: str, locale: str = DEFAULT_LOCALE
+) -> CommandResult:
+    """List the indexed links matching the searched text.
+
+    Parameters
+    ----------
+    search : str
+        The beginning of the link, its host or one of its path segments.
+    locale : str, default=DEFAULT_LOCALE
+        The catalog locale of the response.
+
+    Returns
+    -------
+    CommandResult
+        The response.
+
+    """
+    resources: list[str] = RESOURCE_INDEX.search(search)
+
+    if not resources:
+        return CommandResult(
+            format_response("no_matching_resources", locale, search=search),
+            20.0,
         )
 
-    else:
-        await interaction.response.send_message(
-            embed=create_response(
-                (
-                    f"🇬🇧 No resources found in {category.name}.\n"
-                    f"🇫🇷 Aucune ressource trouvée dans {category.name}."
-                ),
-                type="warning",
+    content: str = format_message(
+        "matching_title", locale, search=search[:MAX_CHOICE_LENGTH]
+    )
+
+    for idx, url in enumerate(resources):
+        line: str = f"\n{url}"
+        more: str = f"\n… +{len(resources) - idx}"
+
+        if len(content) + len(line) + len(more) > MAX_FIELD_LENGTH:
+            if not idx:
+                # Cut a link too long to be listed alone.
+                more = f"\n… +{len(resources) - 1}" if resources[1:] else ""
+                content += line[: MAX_FIELD_LENGTH - len(content) - len(more)]
+
+            content += more
+            break
+
+        content += line
+
+    return CommandResult(create_response(content, type="success"), 60.0)
+
+
+@handler("get_resources")
+async def handle_get_resources(
+    category: str | None = None,
+    tags: str | None = None,
+    match_all: bool = False,
+    search: str | None = None,
+    export: str | None = None,
+    locale: str = DEFAULT_LOCALE,
+) -> CommandResult:
+    """List all resources or only those matching filters or search.
+
+    Listings too long for a response are split into pages.
+
+    Parameters
+    ----------
+    category : str or None, default=None
+        If not None, the comma-separated category names or values.
+    tags : str or None, default=None
+        If not None, the comma-separated tags.
+    match_all : bool, default=False
+        Whether resources match all filters or any of them.
+    search : str or None, default=None
+        If not None, the text the links must match.
+    export : {'markdown', 'csv'} or None, default=None
+        If not None, the format of the file the resources are attached
+        as. Ignored when searching.
+    locale : str, default=DEFAULT_LOCALE
+        The catalog locale of the response.
+
+    Returns
+    -------
+    CommandResult
+        The response.
+
+    """
+    categories, unknown = find_categories(category)
+    tag_list: list[str] = normalize_tags(tags)
+
+    if search:
+        return get_matching_resources(search, locale)
+
+    if unknown:
+        return CommandResult(
+            format_response(
+                "unknown_category", locale, categories=", ".join(unknown)
             ),
-            ephemeral=True,
-            delete_after=20.0,
+            20.0,
         )
 
+    if export:
+        return export_listing(categories, tag_list, match_all, export, locale)
+
+    if categories or tag_list:
+        return get_filtered_resources(categories, tag_list, match_all, locale)
+
+    return get_all_resources(locale)
+
 
-@describe(category="The resource's category")
-@choices(category=CATEGORIES)
+@rate_limited("get_resources")
+@describe(category="The categories, separated by commas")
+@describe(tags="The tags, separated by commas")
+@describe(match="Whether resources match any or all categories and tags")
+@describe(search="The beginning of the link, its host or path")
+@describe(export="Download the resources as a file")
+@choices(match=MATCH_CHOICES, export=EXPORT_CHOICES)
+@autocomplete(
+    category=category_autocomplete,
+    tags=tag_autocomplete,
+    search=resource_autocomplete,
+)
 async def get_resources(
-    interaction: Interaction, category: Choice[str] | None = None
+    interaction: Interaction,
+    category: str | None = None,
+    tags: str | None = None,
+    match: Choice[str] | None = None,
+    search: str | None = None,
+    export: Choice[str] | None = None,
 ) -> None:
-    """Display all resources or only those matching category.
+    """Display all resources or only those matching filters or search.
 
     Parameters
     ----------
     interaction : discord.Interaction
         A user interaction with the bot (slash command).
-    category : discord.app_commands.Choice or None, default=None
-        If not None, the category to display.
+    category : str or None, default=None
+        If not None, the comma-separated category names or values.
+    tags : str or None, default=None
+        If not None, the comma-separated tags.
+    match : discord.app_commands.Choice or None, default=None
+        Whether resources match 'any' (default) or 'all' filters.
+    search : str or None, default=None
+        If not None, the text the links must match.
+    export : discord.app_commands.Choice or None, default=None
+        If not None, the format of the file the resources are attached as.
 
     """
-    log_interaction(interaction)
-
-    try:
-        if category:
-            await get_category_resources(interaction, category)
-        else:
-            await get_all_resources(interaction)
-
-    except CommandInvokeError as err:
-        await interaction.response.send_message(
-            embed=create_response("Wrong command.", type="error"),
-            ephemeral=True,
-            delete_after=20.0,
-        )
-        programLogger.error(err)
+    action: str = log_interaction(interaction)
+    trace = InteractionTrace(interaction)
+    await run_command(
+        trace,
+        action,
+        "get_resources",
+        category=category,
+        tags=tags,
+        match_all=match is not None and match.value == "all",
+        search=search,
+        export=export.value if export else None,
+    )
@@ -0,0 +1,389 @@
+"""Reconciliation of the reaction roles with the roles message."""
+
+from asyncio import (
+    CancelledError,
+    Lock,
+    Semaphore,
+    Task,
+    create_task,
+    gather,
+    sleep,
+)
+from time import perf_counter
+
+from discord import (
+    Forbidden,
+    Guild,
+    HTTPException,
+    Interaction,
+    Member,
+    Message,
+    NotFound,
+    Role,
+)
+from discord.app_commands import default_permissions
+from discord.ext.commands import Bot
+
+from chatbot.audit import AUDIT_LOG
+from chatbot.classes import RoleReconciliation
+from chatbot.logger import programLogger
+from chatbot.shutdown import WORK
+
+from .emoji import ROLE_IDS
+from .formatting import log_bot_action, log_interaction
+from .messages import format_response, static_response
+from .tracing import InteractionTrace
+
+# Maximum number of role changes sent to Discord at the same time. The
+# member routes share a per-server rate limit, discord.py waits for it.
+MAX_CONCURRENT_CHANGES: int = 4
+# Seconds each concurrent slot waits after a change, to stay under the
+# rate limit instead of hitting it.
+CHANGE_DELAY: float = 0.25
+# Maximum number of roles removed by a reconciliation, the others are
+# left for the next one.
+MAX_REMOVALS: int = 25
+# Reason of the changes shown in the server's audit log.
+RECONCILE_REASON: str = "Reaction roles reconciliation"
+
+ROLE_RECONCILER = None
+
+
+class RoleReconciler:
+    """Class giving and removing roles to match the roles message.
+
+    Reactions added or removed while the bot was offline aren't received,
+    so the reactors of each role emoji are paged through and compared
+    with the role holders in the members cache. Only the differences are
+    sent to Discord, a few at a time.
+
+    Roles are only removed when asked, since members may have been given
+    them by hand, and never for an emoji without reactions on the
+    message: cleared or renamed reactions would strip every holder.
+
+    Attributes
+    ----------
+    client : discord.ext.commands.Bot
+        The bot client.
+    guild_id : int
+        The server ID.
+    message_id : int
+        ID of the message to react to to get roles.
+
+    Methods
+    -------
+    start()
+        Reconcile the roles in the background.
+    stop()
+        Cancel the background reconciliation.
+    fetch_message(guild)
+        Fetch the roles message.
+    reconcile(remove)
+        Give and remove roles to match the reactions.
+
+    """
+
+    def __init__(self, client: Bot, guild_id: int, message_id: int) -> None:
+        """Set the roles message.
+
+        Parameters
+        ----------
+        client : discord.ext.commands.Bot
+            The bot client.
+        guild_id : int
+            The server ID.
+        message_id : int
+            ID of the message to react to to get roles.
+
+        """
+        self.client: Bot = client
+        self.guild_id: int = guild_id
+        self.message_id: int = message_id
+        self._channel_id: int | None = None
+        self._lock = Lock()
+        self._task: Task[None] | None = None
+
+    def start(self) -> None:
+        """Reconcile the roles in the background, unless it is running."""
+        if self._task and not self._task.done():
+            return
+
+        self._task = create_task(self._run(), name="role-reconciler")
+
+    def stop(self) -> None:
+        """Cancel the background reconciliation."""
+        if self._task:
+            self._task.cancel()
+
+        self._task = None
+
+    async def _run(self) -> None:
+        """Reconcile the roles and log the changes."""
+        await self.client.wait_until_ready()
+
+        try:
+            report: RoleReconciliation = await self.reconcile()
+
+            if report.added or report.failed or report.pending:
+                await log_bot_action(
+                    f"Reconciled roles in {report.duration:.1f} s: "
+                    f"{report.added} given, {report.failed} failed, "
+                    f"{report.pending} to remove with /sync_roles.",
+                    action="role",
+                )
+
+        except CancelledError:
+            raise
+
+        except Exception as err:
+            programLogger.error(f"Failed reconciling roles: {err}")
+
+    async def fetch_message(self, guild: Guild) -> Message | None:
+        """Fetch the roles message.
+
+        Its channel is found once among the channels the bot can read,
+        then remembered.
+
+        Parameters
+        ----------
+        guild : discord.Guild
+            The server.
+
+        Returns
+        -------
+        discord.Message or None
+            The roles message if found.
+
+        """
+        channels = sorted(
+            (
+                channel
+                for channel in guild.text_channels
+                if channel.permissions_for(guild.me).read_message_history
+            ),
+            key=lambda channel: channel.id != self._channel_id,
+        )
+
+        for channel in channels:
+            try:
+                message: Message = await channel.fetch_message(self.message_id)
+
+            except (NotFound, Forbidden):
+                continue
+
+            self._channel_id = channel.id
+
+            return message
+
+        return None
+
+    async def _change(
+        self, semaphore: Semaphore, member: Member, role: Role, add: bool
+    ) -> bool:
+        """Give or remove a role, once a slot is free."""
+        async with semaphore:
+            try:
+                if add:
+                    await member.add_roles(role, reason=RECONCILE_REASON)
+                else:
+                    await member.remove_roles(role, reason=RECONCILE_REASON)
+
+            except HTTPException as err:
+                programLogger.warning(
+                    f"Failed reconciling role '{role.name}' of "
+                    f"{member.name}: {err}"
+                )
+                return False
+
+            AUDIT_LOG.record(
+                "role",
+                f"{'Gave' if add else 'Removed'} role '{role.name}' "
+                "(reconciliation).",
+                member.id,
+            )
+            await sleep(CHANGE_DELAY)
+
+            return True
+
+    async def reconcile(self, remove: bool = False) -> RoleReconciliation:
+        """Give and remove roles to match the reactions.
+
+        Parameters
+        ----------
+        remove : bool, default=False
+            Whether up to MAX_REMOVALS roles of members who didn't react
+            are removed. Otherwise, they are only counted.
+
+        Returns
+        -------
+        RoleReconciliation
+            The number of changes and the duration.
+
+        Raises
+        ------
+        RuntimeError
+            If the server or the roles message reactions can't be fetched.
+
+        """
+        start: float = perf_counter()
+
+        async with self._lock:
+            guild: Guild | None = self.client.get_guild(self.guild_id)
+
+            if guild is None:
+                raise RuntimeError("Server not found.")
+
+            reactors: dict[str, set[int]] = {}
+
+            try:
+                message: Message | None = await self.fetch_message(guild)
+
+                if message is None:
+                    raise RuntimeError(
+                        f"Roles message {self.message_id} not found."
+                    )
+
+                for reaction in message.reactions:
+                    emoji: str = getattr(
+                        reaction.emoji, "name", reaction.emoji
+                    )
+
+                    if emoji in ROLE_IDS:
+                        # Paged by discord.py, 100 users per request.
+                        reactors[emoji] = {
+                            user.id
+                            async for user in reaction.users(limit=None)
+                            if not user.bot
+                        }
+
+            except HTTPException as err:
+                raise RuntimeError(
+                    f"Failed fetching the roles message reactions: {err}"
+                ) from err
+
+            changes: list[tuple[Member, Role, bool]] = []
+            removals: list[tuple[Member, Role, bool]] = []
+
+            for emoji, role_id in ROLE_IDS.items():
+                role: Role | None = guild.get_role(role_id)
+
+                if role is None:
+                    programLogger.warning(f"Role of {emoji} not found.")
+                    continue
+
+                if emoji not in reactors:
+                    # Without reactions, the holders can't be told apart
+                    # from a cleared or renamed reaction.
+                    continue
+
+                wanted: set[int] = reactors[emoji]
+                holders: set[int] = {member.id for member in role.members}
+
+                for user_id in wanted - holders:
+                    member: Member | None = guild.get_member(user_id)
+
+                    if member:
+                        changes.append((member, role, True))
+
+                removals.extend(
+                    (member, role, False)
+                    for member in role.members
+                    if member.id not in wanted
+                )
+
+            if remove:
+                changes.extend(removals[:MAX_REMOVALS])
+                removals = removals[MAX_REMOVALS:]
+
+            semaphore = Semaphore(MAX_CONCURRENT_CHANGES)
+            results: list[bool] = await gather(
+                *(self._change(semaphore, *change) for change in changes)
+            )
+
+        report = RoleReconciliation(
+            added=sum(
+                done for done, change in zip(results, changes) if change[2]
+            ),
+            removed=sum(
+                done for done, change in zip(results, changes) if not change[2]
+            ),
+            failed=results.count(False),
+            pending=len(removals),
+            duration=perf_counter() - start,
+        )
+        programLogger.info(
+            f"Reconciled roles in {report.duration:.2f} s: {report.added} "
+            f"given, {report.removed} removed, {report.failed} failed, "
+            f"{report.pending} left."
+        )
+
+        return report
+
+
+def set_role_reconciler(reconciler: RoleReconciler | None) -> None:
+    """Set the reconciler used by the command.
+
+    Parameters
+    ----------
+    reconciler : RoleReconciler or None
+        The reconciler of the roles message.
+
+    """
+    globals()["ROLE_RECONCILER"] = reconciler
+
+
+@default_permissions(manage_roles=True)
+async def sync_roles(interaction: Interaction) -> None:
+    """Give and remove roles to match the roles message's reactions.
+
+    Parameters
+    ----------
+    interaction : discord.Interaction
+        A user interaction with the bot (slash command).
+
+    """
+    action: str = log_interaction(interaction)
+    trace = InteractionTrace(interaction)
+
+    if not WORK.accepting or ROLE_RECONCILER is None:
+        # The reconciler is only missing before the bot is set up.
+        await trace.send(
+            static_response("shutting_down", trace.locale), delete_after=20.0
+        )
+        return
+
+    async with WORK.track():
+        await trace.defer()
+
+        try:
+            report: RoleReconciliation = await ROLE_RECONCILER.reconcile(
+                remove=True
+            )
+
+        except RuntimeError as err:
+            programLogger.error(f"Failed reconciling roles: {err}")
+            await trace.send(
+                static_response("roles_not_reconciled", trace.locale),
+                delete_after=20.0,
+            )
+            return
+
+        await trace.checkpoint("handled")
+        await trace.send(
+            format_response(
+                "roles_reconciled",
+                trace.locale,
+                duration=f"{report.duration:.1f}",
+                added=report.added,
+                removed=report.removed,
+                failed=report.failed,
+                pending=report.pending,
+            ),
+            delete_after=60.0,
+        )
+        await log_bot_action(
+            f"{action} {report.added} roles given, {report.removed} "
+            f"removed, {report.failed} failed, {report.pending} left.",
+            interaction.user.id,
+            "sync_roles",
+        )
@@ -0,0 +1,120 @@
+"""Command callbacks for the command usage statistics."""
+
+from collections import Counter
+from datetime import datetime, timezone
+from time import time
+
+from discord import Interaction
+from discord.app_commands import Range, default_permissions, describe
+
+from chatbot.classes import CATEGORY_NAMES, UsageCount
+from chatbot.repository import get_repository
+
+from .dispatch import CommandResult, handler
+from .formatting import create_response, log_interaction
+from .messages import DEFAULT_LOCALE, format_message, format_response
+from .resources import run_command
+from .tracing import InteractionTrace
+
+# Number of most used categories displayed.
+TOP_CATEGORIES: int = 5
+# Number of most recent days displayed.
+RECENT_DAYS: int = 7
+
+
+@handler("save_usage")
+async def save_usage(counts: list[tuple[int, str, str, int]]) -> None:
+    """Add command uses to the hourly rollup.
+
+    Parameters
+    ----------
+    counts : list of tuple
+        The hour, command, category and number of uses of each counter.
+
+    """
+    get_repository().save_usage([UsageCount(*count) for count in counts])
+
+
+@handler("usage_stats")
+async def usage_stats(
+    days: int, locale: str = DEFAULT_LOCALE
+) -> CommandResult:
+    """Summarize the command uses of the last days.
+
+    Parameters
+    ----------
+    days : int
+        Number of days to look back.
+    locale : str, default=DEFAULT_LOCALE
+        The catalog locale of the response.
+
+    Returns
+    -------
+    CommandResult
+        The response.
+
+    """
+    usage: list[UsageCount] = get_repository().fetch_usage(
+        time() - days * 86400
+    )
+    commands: Counter[str] = Counter()
+    categories: Counter[str] = Counter()
+    per_day: Counter[int] = Counter()
+
+    for row in usage:
+        if row.category:
+            categories[row.category] += row.count
+        else:
+            commands[row.command] += row.count
+            per_day[row.period - row.period % 86400] += row.count
+
+    if not commands:
+        return CommandResult(
+            format_response("no_usage", locale, days=days), 20.0
+        )
+
+    lines: list[str] = [
+        format_message(
+            "stats_title", locale, days=days, count=commands.total()
+        )
+    ]
+    lines += [
+        f"/{command}: {count}" for command, count in commands.most_common()
+    ]
+
+    if categories:
+        lines.append(format_message("stats_categories", locale))
+        lines += [
+            f"{CATEGORY_NAMES.get(category, category)}: {count}"
+            for category, count in categories.most_common(TOP_CATEGORIES)
+        ]
+
+    lines.append(format_message("stats_per_day", locale))
+    lines += [
+        f"{datetime.fromtimestamp(day, timezone.utc):%Y-%m-%d}: {count}"
+        for day, count in sorted(per_day.items())[-RECENT_DAYS:]
+    ]
+
+    return CommandResult(
+        create_response("\n".join(lines), type="success"), 60.0
+    )
+
+
+@default_permissions(manage_guild=True)
+@describe(days="Number of days to look back, 7 by default")
+async def stats(
+    interaction: Interaction, days: Range[int, 1, 365] = 7
+) -> None:
+    """Display how often commands and categories were used.
+
+    Parameters
+    ----------
+    interaction : discord.Interaction
+        A user interaction with the bot (slash command).
+    days : int, default=7
+        Number of days to look back.
+
+    """
+    action: str = log_interaction(interaction)
+    trace = InteractionTrace(interaction)
+    await run_command(trace, action, "usage_stats", days=days)
@@ -0,0 +1,272 @@
+"""Interaction lifecycle tracing."""
+
+from time import perf_counter
+
+from discord import (
+    Embed,
+    File,
+    HTTPException,
+    Interaction,
+    InteractionType,
+    NotFound,
+)
+from discord.ui import View
+
+from chatbot.logger import programLogger
+from chatbot.metrics import increment_metric
+
+from .messages import get_locale
+
+# Discord invalidates the interaction if no response is sent within 3 sec.
+INTERACTION_DEADLINE: float = 3.0
+# Projected latency (in seconds) from which the response is deferred.
+DEFER_THRESHOLD: float = 1.5
+# Weight of the last measure in the per-command latency average.
+LATENCY_SMOOTHING: float = 0.2
+# Command names to their average latency in seconds.
+COMMAND_LATENCIES: dict[str, float] = {}
+
+
+class InteractionTrace:
+    """Class tracing an interaction from reception to response.
+
+    Attributes
+    ----------
+    interaction : discord.Interaction
+        A user interaction with the bot (slash command).
+    command : str
+        The command name.
+    locale : str
+        The catalog locale of the user's messages.
+    stages : list of tuple
+        The stage names with their elapsed time in seconds.
+    deferred : bool
+        Whether the response was deferred.
+    missed : bool
+        Whether the interaction deadline was missed.
+
+    Methods
+    -------
+    mark(stage)
+        Record the elapsed time for a stage.
+    checkpoint(stage)
+        Record a stage and defer the response if it is late.
+    defer_if_late()
+        Defer the response if the projected latency is too high.
+    defer()
+        Defer the response.
+    send(embed, delete_after, file, view)
+        Send the response or a follow-up if it was deferred.
+    edit(embed, view)
+        Replace the message of the clicked component with the response.
+
+    """
+
+    def __init__(
+        self, interaction: Interaction, command: str | None = None
+    ) -> None:
+        """Start tracing the interaction.
+
+        Parameters
+        ----------
+        interaction : discord.Interaction
+            A user interaction with the bot (slash command or component).
+        command : str or None, default=None
+            If not None, the name the interaction is traced as. Otherwise,
+            the command name.
+
+        """
+        self.interaction: Interaction = interaction
+        self.command: str = command or (
+            interaction.command.name if interaction.command else "unknown"
+        )
+        self.locale: str = get_locale(interaction.locale)
+        self.stages: list[tuple[str, float]] = [("received", 0.0)]
+        self.deferred: bool = False
+        self.missed: bool = False
+        self._start: float = perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds elapsed since the interaction was received."""
+        return perf_counter() - self._start
+
+    def projected_latency(self) -> float:
+        """Estimate the total latency of the interaction.
+
+        Returns
+        -------
+        float
+            The projected latency in seconds.
+
+        """
+        return max(self.elapsed, COMMAND_LATENCIES.get(self.command, 0.0))
+
+    def mark(self, stage: str) -> None:
+        """Record the elapsed time for a stage.
+
+        Parameters
+        ----------
+        stage : str
+            The stage name.
+
+        """
+        self.stages.append((stage, self.elapsed))
+
+    async def checkpoint(self, stage: str) -> None:
+        """Record a stage and defer the response if it is late.
+
+        Parameters
+        ----------
+        stage : str
+            The stage name.
+
+        """
+        self.mark(stage)
+        await self.defer_if_late()
+
+    async def defer_if_late(self) -> None:
+        """Defer the response if the projected latency is too high."""
+        if self.projected_latency() >= DEFER_THRESHOLD:
+            await self.defer()
+
+    async def defer(self) -> None:
+        """Defer the response, for commands known to be slow."""
+        if self.deferred or self.interaction.response.is_done():
+            return
+
+        try:
+            if self.interaction.type == InteractionType.component:
+                # A click updates its message later, without a new one.
+                await self.interaction.response.defer()
+            else:
+                await self.interaction.response.defer(
+                    ephemeral=True, thinking=True
+                )
+
+            self.deferred = True
+            self.mark("deferred")
+            increment_metric("interactions.deferred")
+
+        except NotFound:
+            self._record_miss()
+
+        except HTTPException as err:
+            programLogger.error(f"Failed deferring interaction: {err}")
+
+    async def send(
+        self,
+        embed: Embed,
+        delete_after: float,
+        file: File | None = None,
+        view: View | None = None,
+    ) -> None:
+        """Send the response or a follow-up if it was deferred.
+
+        Parameters
+        ----------
+        embed : discord.Embed
+            The response content.
+        delete_after : float
+            Delay in seconds before the message is deleted.
+        file : discord.File or None, default=None
+            If not None, the file attached to the response.
+        view : discord.ui.View or None, default=None
+            If not None, the components attached to the response.
+
+        """
+        # discord.py doesn't accept file=None nor view=None.
+        attachments: dict[str, File | View] = {}
+
+        if file:
+            attachments["file"] = file
+
+        if view:
+            attachments["view"] = view
+
+        try:
+            if self.deferred:
+                message = await self.interaction.followup.send(
+                    embed=embed, ephemeral=True, wait=True, **attachments
+                )
+                await message.delete(delay=delete_after)
+
+            else:
+                if self.elapsed > INTERACTION_DEADLINE:
+                    self._record_miss()
+
+                await self.interaction.response.send_message(
+                    embed=embed,
+                    ephemeral=True,
+                    delete_after=delete_after,
+                    **attachments,
+                )
+
+        except NotFound as err:
+            # Unknown interaction: the token expired before the response.
+            self._record_miss()
+            programLogger.error(f"Failed responding to interaction: {err}")
+
+        self.mark("response_sent")
+        self._finish()
+
+    async def edit(self, embed: Embed, view: View | None = None) -> None:
+        """Replace the message of the clicked component with the response.
+
+        If the click was deferred, the message is edited after it.
+
+        Parameters
+        ----------
+        embed : discord.Embed
+            The response content.
+        view : discord.ui.View or None, default=None
+            The components replacing the message's ones, None to remove
+            them.
+
+        """
+        try:
+            if self.deferred:
+                await self.interaction.edit_original_response(
+                    embed=embed, view=view
+                )
+
+            else:
+                if self.elapsed > INTERACTION_DEADLINE:
+                    self._record_miss()
+
+                await self.interaction.response.edit_message(
+                    embed=embed, view=view
+                )
+
+        except NotFound as err:
+            self._record_miss()
+            programLogger.error(f"Failed responding to interaction: {err}")
+
+        except HTTPException as err:
+            programLogger.error(f"Failed editing message: {err}")
+
+        self.mark("response_sent")
+        self._finish()
+
+    def _record_miss(self) -> None:
+        """Count a missed interaction deadline once."""
+        if not self.missed:
+            self.missed = True
+            increment_metric("interactions.deadline_missed")
+
+    def _finish(self) -> None:
+        """Update the command's latency average and log the trace."""
+        total: float = self.elapsed
+        average: float | None = COMMAND_LATENCIES.get(self.command)
+
+        COMMAND_LATENCIES[self.command] = (
+            total
+            if average is None
+            else average + LATENCY_SMOOTHING * (total - average)
+        )
+        increment_metric("interactions.completed")
+
+        trace: str = " ".join(
+            f"{stage}={elapsed * 1000:.1f}ms" for stage, elapsed in self.stages
+        )
+        programLogger.debug(f"Interaction '{self.command}': {trace}")
@@ -0,0 +1,218 @@
+"""Persistent components keeping their state in their custom ID."""
+
+from dataclasses import replace
+from re import Match
+
+from discord import ButtonStyle, HTTPException, Interaction
+from discord.ui import Button, DynamicItem, Item, View
+
+from chatbot.classes import ResourcePage
+from chatbot.ipc import WorkerError
+from chatbot.logger import programLogger
+from chatbot.shutdown import WORK
+
+from .dispatch import CommandResult, run_handler
+from .messages import static_response
+from .rate_limit import allow
+from .tracing import InteractionTrace
+
+# Maximum length of a component's custom ID.
+MAX_CUSTOM_ID_LENGTH: int = 100
+# Custom ID of the listing pages: position of the first resource, page
+# size, 'a'll or 'o'ne filter matched, category values and tags.
+PAGE_TEMPLATE: str = (
+    r"page:(?P<cursor>\d+):(?P<size>\d+):(?P<match>[ao]):"
+    r"(?P<category>[^:]*):(?P<tags>.*)"
+)
+
+
+def encode_page(page: ResourcePage) -> str:
+    """Encode a listing page as a custom ID.
+
+    Parameters
+    ----------
+    page : ResourcePage
+        The page.
+
+    Returns
+    -------
+    str
+        The custom ID matching PAGE_TEMPLATE.
+
+    """
+    match: str = "a" if page.match_all else "o"
+
+    return (
+        f"page:{page.cursor}:{page.size}:{match}:{page.category}:{page.tags}"
+    )
+
+
+# DynamicItem is Any to mypy, which doesn't know its template keyword.
+class PageButton(
+    DynamicItem[Button], template=PAGE_TEMPLATE  # type: ignore[call-arg]
+):
+    """Class defining a button showing a page of a resources listing.
+
+    The page is only described by the button's custom ID, so that no
+    state is kept in memory and the buttons keep working after the bot
+    restarts.
+
+    Attributes
+    ----------
+    page : ResourcePage
+        The page the button shows.
+
+    """
+
+    def __init__(
+        self, page: ResourcePage, label: str, disabled: bool = False
+    ) -> None:
+        """Create a button.
+
+        Parameters
+        ----------
+        page : ResourcePage
+            The page the button shows.
+        label : str
+            The button label.
+        disabled : bool, default=False
+            Whether the button can't be clicked.
+
+        """
+        super().__init__(
+            Button(
+                label=label,
+                style=ButtonStyle.secondary,
+                custom_id=encode_page(page),
+                disabled=disabled,
+            )
+        )
+        self.page: ResourcePage = page
+
+    @classmethod
+    async def from_custom_id(
+        cls, interaction: Interaction, item: Item, match: Match[str]
+    ) -> "PageButton":
+        """Rebuild a clicked button from its custom ID.
+
+        Parameters
+        ----------
+        interaction : discord.Interaction
+            The click.
+        item : discord.ui.Item
+            The clicked component.
+        match : re.Match
+            The custom ID matching PAGE_TEMPLATE.
+
+        Returns
+        -------
+        PageButton
+
+        """
+        page = ResourcePage(
+            match["category"],
+            match["tags"],
+            match["match"] == "a",
+            int(match["cursor"]),
+            int(match["size"]),
+        )
+
+        return cls(page, getattr(item, "label", None) or "")
+
+    async def callback(self, interaction: Interaction) -> None:
+        """Replace the listing with the button's page.
+
+        Parameters
+        ----------
+        interaction : discord.Interaction
+            The click.
+
+        """
+        await show_page(interaction, self.page)
+
+
+def build_page_view(page: ResourcePage) -> View | None:
+    """Build the buttons browsing a listing from one of its pages.
+
+    Parameters
+    ----------
+    page : ResourcePage
+        The page shown.
+
+    Returns
+    -------
+    discord.ui.View or None
+        The previous and next page buttons, or None if the listing has a
+        single page or its filters don't fit in a custom ID.
+
+    """
+    if page.cursor == 0 and page.shown >= page.total:
+        return None
+
+    previous: ResourcePage = replace(
+        page, cursor=max(0, page.cursor - page.size)
+    )
+    following: ResourcePage = replace(page, cursor=page.cursor + page.shown)
+
+    if len(encode_page(following)) > MAX_CUSTOM_ID_LENGTH:
+        return None
+
+    view = View(timeout=None)
+    view.add_item(PageButton(previous, "◀", disabled=page.cursor == 0))
+    view.add_item(
+        PageButton(following, "▶", disabled=following.cursor >= page.total)
+    )
+
+    return view
+
+
+async def show_page(interaction: Interaction, page: ResourcePage) -> None:
+    """Replace a listing with one of its pages.
+
+    Parameters
+    ----------
+    interaction : discord.Interaction
+        The click on a page button.
+    page : ResourcePage
+        The page to show.
+
+    """
+    trace = InteractionTrace(interaction, "get_resources_page")
+    result: CommandResult
+
+    if not WORK.accepting or not allow("get_resources", interaction):
+        key: str = "rate_limited" if WORK.accepting else "shutting_down"
+
+        try:
+            await interaction.response.send_message(
+                embed=static_response(key, trace.locale), ephemeral=True
+            )
+
+        except HTTPException as err:
+            programLogger.debug(f"Failed rejecting click: {err}")
+
+        return
+
+    async with WORK.track():
+        try:
+            await trace.defer_if_late()
+            result = await run_handler(
+                "get_resources_page",
+                category=page.category,
+                tags=page.tags,
+                match_all=page.match_all,
+                cursor=page.cursor,
+                size=page.size,
+                locale=trace.locale,
+            )
+            await trace.checkpoint("handled")
+
+        except (ConnectionError, TimeoutError, WorkerError) as err:
+            programLogger.error(f"Failed running command: {err}")
+            result = CommandResult(
+                static_response("database_error", trace.locale), 20.0
+            )
+
+        await trace.edit(
+            result.embed, build_page_view(result.page) if result.page else None
+        )
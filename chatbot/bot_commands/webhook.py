@@ -0,0 +1,212 @@
+"""Delivery of the bot logs through a webhook."""
+
+from asyncio import (
+    CancelledError,
+    Lock,
+    Task,
+    TimeoutError,
+    create_task,
+    sleep,
+)
+from collections import deque
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+from discord import Embed, HTTPException, NotFound, Webhook
+
+from chatbot.health import register_queue
+from chatbot.logger import programLogger
+
+# Seconds between two deliveries, so that close logs share a request.
+FLUSH_INTERVAL: float = 1.0
+# Maximum number of embeds in a message.
+MAX_BATCH_EMBEDS: int = 10
+# Maximum total length of the embeds of a message.
+MAX_BATCH_LENGTH: int = 6000
+# Maximum length of an embed's description.
+MAX_DESCRIPTION_LENGTH: int = 4096
+# Maximum number of logs waiting to be sent, the oldest are dropped.
+MAX_BUFFERED: int = 1000
+# Connections of the webhook session, apart from the bot's and the jobs'.
+MAX_CONNECTIONS: int = 2
+
+# Sends embeds through the bot logs channel, raising RuntimeError.
+Fallback = Callable[[list[Embed]], Awaitable[None]]
+
+
+class LogWebhook:
+    """Class sending the bot logs through a webhook by batches.
+
+    Webhooks have their own rate limits, apart from the bot's, and the
+    logs are sent from their own HTTP session, so that logging never
+    delays the responses to users. Logs are buffered and sent as embeds,
+    up to MAX_BATCH_EMBEDS per request. Batches the webhook fails to send
+    go through the bot logs channel instead.
+
+    Attributes
+    ----------
+    url : str
+        The webhook URL.
+    fallback : callable
+        The coroutine sending embeds through the bot logs channel.
+
+    Methods
+    -------
+    post(message)
+        Buffer a log to send.
+    start()
+        Open the session and start sending the logs periodically.
+    stop()
+        Send the waiting logs and close the session.
+    flush()
+        Send the waiting logs.
+
+    """
+
+    def __init__(self, url: str, fallback: Fallback) -> None:
+        """Set the webhook.
+
+        Parameters
+        ----------
+        url : str
+            The webhook URL.
+        fallback : callable
+            The coroutine sending embeds through the bot logs channel.
+
+        """
+        self.url: str = url
+        self.fallback: Fallback = fallback
+        self._buffer: deque[Embed] = deque(maxlen=MAX_BUFFERED)
+        self._lock = Lock()
+        self._session: ClientSession | None = None
+        self._webhook: Webhook | None = None
+        self._task: Task[None] | None = None
+        self._flush_task: Task[int] | None = None
+
+    def post(self, message: str) -> None:
+        """Buffer a log to send.
+
+        Parameters
+        ----------
+        message : str
+            The message content.
+
+        """
+        self._buffer.append(
+            Embed(
+                description=message[:MAX_DESCRIPTION_LENGTH],
+                timestamp=datetime.now(timezone.utc),
+            )
+        )
+
+        if (
+            self._task
+            and len(self._buffer) >= MAX_BATCH_EMBEDS
+            and (self._flush_task is None or self._flush_task.done())
+        ):
+            self._flush_task = create_task(self.flush())
+
+    def start(self) -> None:
+        """Open the session and start sending the logs periodically."""
+        self._session = ClientSession(
+            connector=TCPConnector(limit=MAX_CONNECTIONS),
+            timeout=ClientTimeout(total=15.0),
+        )
+
+        try:
+            self._webhook = Webhook.from_url(self.url, session=self._session)
+
+        except ValueError:
+            programLogger.error(
+                "Invalid bot logs webhook URL, using the logs channel."
+            )
+
+        self._task = create_task(self._run(), name="log-webhook")
+        register_queue("log_webhook", lambda: len(self._buffer))
+
+    async def stop(self) -> None:
+        """Send the waiting logs and close the session."""
+        if self._task:
+            self._task.cancel()
+
+        self._task = None
+        await self.flush()
+
+        if self._session:
+            await self._session.close()
+
+        self._session = None
+
+    async def _run(self) -> None:
+        """Send the waiting logs periodically."""
+        while True:
+            await sleep(FLUSH_INTERVAL)
+
+            try:
+                await self.flush()
+
+            except CancelledError:
+                raise
+
+            except Exception as err:
+                programLogger.error(f"Failed sending bot logs: {err}")
+
+    def _next_batch(self) -> list[Embed]:
+        """Take the oldest logs fitting in a message."""
+        batch: list[Embed] = []
+        length: int = 0
+
+        while self._buffer and len(batch) < MAX_BATCH_EMBEDS:
+            size: int = len(self._buffer[0].description or "")
+
+            if batch and length + size > MAX_BATCH_LENGTH:
+                break
+
+            batch.append(self._buffer.popleft())
+            length += size
+
+        return batch
+
+    async def _send(self, batch: list[Embed]) -> None:
+        """Send a batch through the webhook, or the channel if it fails."""
+        if self._webhook:
+            try:
+                await self._webhook.send(embeds=batch)
+                return
+
+            except NotFound:
+                programLogger.error(
+                    "Bot logs webhook was deleted, using the logs channel."
+                )
+                self._webhook = None
+
+            except (HTTPException, ClientError, TimeoutError) as err:
+                programLogger.warning(
+                    f"Failed sending bot logs to webhook: {err}"
+                )
+
+        try:
+            await self.fallback(batch)
+
+        except RuntimeError as err:
+            programLogger.error(f"Failed sending bot logs: {err}")
+
+    async def flush(self) -> int:
+        """Send the waiting logs.
+
+        Returns
+        -------
+        int
+            The number of logs sent.
+
+        """
+        sent: int = 0
+
+        async with self._lock:
+            while self._buffer:
+                batch: list[Embed] = self._next_batch()
+                await self._send(batch)
+                sent += len(batch)
+
+        return sent
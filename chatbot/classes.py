@@ -1,6 +1,6 @@
 """Data models."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from discord.app_commands import Choice
 
@@ -17,6 +17,141 @@ CATEGORIES: list[Choice] = [
     Choice(name="Web", value="web"),
     Choice(name="Web3", value="web3"),
 ]
+# Lowercase category names and values to categories.
+CATEGORY_LOOKUP: dict[str, Choice] = {
+    **{category.name.lower(): category for category in CATEGORIES},
+    **{category.value: category for category in CATEGORIES},
+}
+# Category values to their displayed names.
+CATEGORY_NAMES: dict[str, str] = {
+    category.value: category.name for category in CATEGORIES
+}
+
+
+# Maximum number of tags per resource.
+MAX_TAGS: int = 10
+# Maximum length of a tag.
+MAX_TAG_LENGTH: int = 32
+
+
+def split_values(text: str | None) -> list[str]:
+    """Split comma-separated values typed by a user.
+
+    Parameters
+    ----------
+    text : str or None
+        The comma-separated values.
+
+    Returns
+    -------
+    list of str
+        The unique non-empty values, in order.
+
+    """
+    if not text:
+        return []
+
+    values: dict[str, None] = {}
+
+    for value in text.split(","):
+        if value.strip():
+            values[value.strip()] = None
+
+    return list(values)
+
+
+def normalize_tags(text: str | None) -> list[str]:
+    """Normalize comma-separated tags typed by a user.
+
+    Parameters
+    ----------
+    text : str or None
+        The comma-separated tags.
+
+    Returns
+    -------
+    list of str
+        The lowercase tags with dashes instead of spaces.
+
+    """
+    tags: dict[str, None] = {}
+
+    for value in split_values(text):
+        tags["-".join(value.lower().split())[:MAX_TAG_LENGTH]] = None
+
+    return list(tags)[:MAX_TAGS]
+
+
+def set_categories(categories: list[Choice]) -> None:
+    """Replace the categories offered to users.
+
+    The list and lookups are updated in place, so that the modules which
+    imported them see the new categories.
+
+    Parameters
+    ----------
+    categories : list of discord.app_commands.Choice
+        The categories, in display order.
+
+    """
+    lookup: dict[str, Choice] = {
+        **{category.name.lower(): category for category in categories},
+        **{category.value: category for category in categories},
+    }
+    names: dict[str, str] = {
+        category.value: category.name for category in categories
+    }
+
+    CATEGORIES[:] = categories
+    CATEGORY_LOOKUP.clear()
+    CATEGORY_LOOKUP.update(lookup)
+    CATEGORY_NAMES.clear()
+    CATEGORY_NAMES.update(names)
+
+
+def find_category(text: str) -> Choice | None:
+    """Find the category matching a name or value.
+
+    Parameters
+    ----------
+    text : str
+        The category name or value, case insensitive.
+
+    Returns
+    -------
+    discord.app_commands.Choice or None
+        The category if found.
+
+    """
+    return CATEGORY_LOOKUP.get(text.strip().lower())
+
+
+def find_categories(text: str | None) -> tuple[list[Choice], list[str]]:
+    """Find the categories matching comma-separated names or values.
+
+    Parameters
+    ----------
+    text : str or None
+        The comma-separated category names or values.
+
+    Returns
+    -------
+    tuple
+        The categories found and the values matching no category.
+
+    """
+    found: list[Choice] = []
+    unknown: list[str] = []
+
+    for value in split_values(text):
+        category: Choice | None = find_category(value)
+
+        if category is None:
+            unknown.append(value)
+        elif category not in found:
+            found.append(category)
+
+    return found, unknown
 
 
 class Category:
@@ -47,3 +182,268 @@ class Resource:
 
     url: str
     category_id: int
+
+
+@dataclass
+class ResourceRequest:
+    """Class defining a request to add a resource.
+
+    Attributes
+    ----------
+    url : str
+        The URL.
+    categories : list of str
+        The category names.
+    tags : list of str
+        The tag names.
+
+    """
+
+    url: str
+    categories: list[str]
+    tags: list[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class ResourceLink:
+    """Class defining a resource's link as displayed in listings.
+
+    Attributes
+    ----------
+    url : str
+        The URL.
+    title : str or None
+        The page title if known.
+    dead : bool
+        Whether the link failed its last checks.
+
+    """
+
+    url: str
+    title: str | None = None
+    dead: bool = False
+
+
+@dataclass
+class UrlMetadata:
+    """Class defining the metadata fetched for a resource's link.
+
+    Attributes
+    ----------
+    url : str
+        The URL.
+    title : str or None
+        The page title.
+    canonical_url : str or None
+        The canonical URL declared by the page.
+    etag : str or None
+        The ETag header, to revalidate the page.
+    last_modified : str or None
+        The Last-Modified header, to revalidate the page.
+    status : int or None
+        The HTTP status of the last fetch.
+    fetched_at : float
+        Timestamp of the last fetch.
+
+    """
+
+    url: str
+    title: str | None
+    canonical_url: str | None
+    etag: str | None
+    last_modified: str | None
+    status: int | None
+    fetched_at: float
+
+
+@dataclass
+class CatalogEntry:
+    """Class defining a resource with everything stored about it.
+
+    Attributes
+    ----------
+    id : int
+        The resource's ID.
+    url : str
+        The URL.
+    categories : list of str
+        The category names.
+    tags : list of str
+        The tag names.
+    link_status : int or None
+        The HTTP status of the last link check.
+    last_checked : float or None
+        Timestamp of the last link check.
+    check_failures : int
+        Number of consecutive failed link checks.
+    created_at : float or None
+        Timestamp of the resource's creation, 0 if it is unknown.
+
+    """
+
+    id: int
+    url: str
+    categories: list[str] = field(default_factory=list)
+    tags: list[str] = field(default_factory=list)
+    link_status: int | None = None
+    last_checked: float | None = None
+    check_failures: int = 0
+    created_at: float | None = None
+
+
+@dataclass
+class Pin:
+    """Class defining a pinned message.
+
+    Attributes
+    ----------
+    channel_id : int
+        The channel's ID.
+    message_id : int
+        The message's ID.
+    pinned_by : int or None
+        ID of the user who pinned the message, None if it was pinned
+        without the bot.
+    pinned_at : float
+        Timestamp of the pin.
+
+    """
+
+    channel_id: int
+    message_id: int
+    pinned_by: int | None
+    pinned_at: float
+
+
+@dataclass
+class AuditEvent:
+    """Class defining an action recorded in the audit log.
+
+    Attributes
+    ----------
+    created_at : float
+        Timestamp of the action.
+    user_id : int or None
+        ID of the user who acted, None for the bot's own actions.
+    action : str
+        The action name, for example the command name.
+    detail : str
+        What happened.
+
+    """
+
+    created_at: float
+    user_id: int | None
+    action: str
+    detail: str
+
+
+@dataclass
+class UsageCount:
+    """Class defining the number of uses of a command over a period.
+
+    Attributes
+    ----------
+    period : int
+        Timestamp of the start of the hour or day.
+    command : str
+        The command name.
+    category : str
+        The category value the command was used with, or an empty string
+        for all uses of the command.
+    count : int
+        The number of uses.
+
+    """
+
+    period: int
+    command: str
+    category: str
+    count: int
+
+
+@dataclass
+class ExportRow:
+    """Class defining a resource as written in an export file.
+
+    Attributes
+    ----------
+    url : str
+        The URL.
+    title : str or None
+        The page title, if fetched.
+    categories : list of str
+        The category values.
+    tags : list of str
+        The tag names.
+    dead : bool
+        Whether the link failed several checks in a row.
+    created_at : float or None, default=None
+        The creation timestamp, if read.
+
+    """
+
+    url: str
+    title: str | None
+    categories: list[str]
+    tags: list[str]
+    dead: bool
+    created_at: float | None = None
+
+
+@dataclass
+class ResourcePage:
+    """Class defining a page of a resources listing.
+
+    Attributes
+    ----------
+    category : str
+        The comma-separated category values, empty for all resources.
+    tags : str
+        The comma-separated tags.
+    match_all : bool
+        Whether the resources match every category and tag.
+    cursor : int
+        Position of the page's first resource in the listing.
+    size : int
+        Maximum number of resources per page.
+    shown : int
+        Number of resources on the page.
+    total : int
+        Number of resources in the listing.
+
+    """
+
+    category: str
+    tags: str
+    match_all: bool
+    cursor: int
+    size: int
+    shown: int = 0
+    total: int = 0
+
+
+@dataclass
+class RoleReconciliation:
+    """Class defining the report of a reaction roles reconciliation.
+
+    Attributes
+    ----------
+    added : int
+        Number of roles given to members who reacted.
+    removed : int
+        Number of roles removed from members who didn't react.
+    failed : int
+        Number of changes Discord refused.
+    pending : int
+        Number of roles of members who didn't react, left in place.
+    duration : float
+        Duration of the reconciliation in seconds.
+
+    """
+
+    added: int = 0
+    removed: int = 0
+    failed: int = 0
+    pending: int = 0
+    duration: float = 0.0
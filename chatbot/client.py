@@ -1,5 +1,13 @@
 """Discord bot client class."""
 
+from asyncio import Task, create_task, get_running_loop, run
+from hashlib import sha256
+from json import dumps
+from os import replace
+from pathlib import Path
+from signal import SIGINT, SIGTERM
+from typing import TYPE_CHECKING, Any
+
 from discord import (
     Forbidden,
     HTTPException,
@@ -11,15 +19,26 @@ from discord import (
 )
 from discord.app_commands import Command
 from discord.ext.commands import Bot
+from discord.utils import setup_logging
 
-from chatbot.bot_commands import (
-    add_resource,
-    get_resources,
-    help,
-    process_emoji_reaction,
-    set_logs_channel,
-)
+from chatbot.backup import BackupScheduler
+from chatbot.health import HealthMonitor
+from chatbot.ipc import WorkerPool
 from chatbot.logger import programLogger
+from chatbot.profiling import StartupProfile
+from chatbot.shutdown import SHUTDOWN_TIMEOUT, WORK
+
+if TYPE_CHECKING:
+    from chatbot.bot_commands import (
+        DigestScheduler,
+        LogWebhook,
+        PinReconciler,
+        RoleReconciler,
+    )
+    from chatbot.config import ConfigWatcher, RuntimeConfig
+
+# File keeping the fingerprint of the last commands synced with Discord.
+COMMANDS_FILE: str = "logs/commands.sha256"
 
 
 async def send_message_to_channel(
@@ -83,16 +102,60 @@ class BotClient:
         The server object.
     roles_message_id : int
         ID of the message to react to to get roles.
+    logs_channel_id : int or None
+        ID of the bot logs channel, once the callbacks are registered.
+    startup_profile : StartupProfile
+        The startup profile completed when the bot is ready.
+    health_monitor : HealthMonitor or None
+        The monitor writing the bot status file.
+    backups : BackupScheduler or None
+        The scheduler of the database snapshots.
+    workers : WorkerPool or None
+        The worker processes running the commands and the database.
+    pin_reconciler : PinReconciler or None
+        The job reconciling the pins index with Discord, once started.
+    role_reconciler : RoleReconciler or None
+        The job reconciling the roles with the roles message reactions,
+        once set up.
+    digest_channel_id : int or None
+        ID of the channel the digests of new resources are posted to.
+    digest_interval : float
+        Seconds between two digests.
+    digest : DigestScheduler or None
+        The job posting the digests, once started.
+    config : ConfigWatcher or None
+        The watcher applying the changes of the configuration file.
+    logs_webhook_url : str or None
+        URL of the webhook the bot logs are sent through.
+    logs_webhook : LogWebhook or None
+        The delivery of the bot logs through the webhook, once started.
 
     Methods
     -------
+    setup_hook()
+        Start background tasks before connecting to the gateway.
+    apply_config(old, new)
+        Apply the settings of the client that changed.
+    sync_commands()
+        Register the commands on the server if they changed.
     start()
         Run Discord bot.
 
     """
 
     def __init__(
-        self, bot_token: str, guild_id: int, roles_message_id: int
+        self,
+        bot_token: str,
+        guild_id: int,
+        roles_message_id: int,
+        startup_profile: StartupProfile | None = None,
+        health_file: str | None = None,
+        backups: BackupScheduler | None = None,
+        workers: WorkerPool | None = None,
+        digest_channel_id: int | None = None,
+        digest_interval: float = 24 * 3600.0,
+        config: "ConfigWatcher | None" = None,
+        logs_webhook_url: str | None = None,
     ) -> None:
         """Initialize the Discord bot and set parameters.
 
@@ -104,15 +167,209 @@ class BotClient:
             The server ID.
         roles_message_id : int
             ID of the message to react to to get roles.
+        startup_profile : StartupProfile or None, default=None
+            The startup profile to complete when the bot is ready.
+        health_file : str or None, default=None
+            If not None, path to the status file for the healthcheck.
+        backups : BackupScheduler or None, default=None
+            If not None, the scheduler of the database snapshots.
+        workers : WorkerPool or None, default=None
+            If not None, the worker processes running the commands and
+            the database, and their background jobs.
+        digest_channel_id : int or None, default=None
+            If not None, ID of the channel the digests of new resources
+            are posted to.
+        digest_interval : float, default=86400
+            Seconds between two digests, 0 to disable them.
+        config : ConfigWatcher or None, default=None
+            If not None, the watcher of the configuration file, already
+            loaded. The client applies its settings.
+        logs_webhook_url : str or None, default=None
+            If not None, URL of the webhook the bot logs are sent
+            through, instead of the bot logs channel.
 
         """
         self.client: Bot = init_bot()
         self.bot_token = bot_token
         self.guild = Object(id=guild_id)
         self.roles_message_id: int = roles_message_id
+        self.logs_channel_id: int | None = None
+        self.startup_profile: StartupProfile = (
+            startup_profile or StartupProfile(None)
+        )
+        self.health_monitor: HealthMonitor | None = (
+            HealthMonitor(self.client, health_file) if health_file else None
+        )
+        self.backups: BackupScheduler | None = backups
+        self.workers: WorkerPool | None = workers
+        self.pin_reconciler: PinReconciler | None = None
+        self.role_reconciler: RoleReconciler | None = None
+        self.digest_channel_id: int | None = digest_channel_id
+        self.digest_interval: float = digest_interval
+        self.digest: DigestScheduler | None = None
+        self.config: ConfigWatcher | None = config
+        self.logs_webhook_url: str | None = logs_webhook_url
+        self.logs_webhook: LogWebhook | None = None
+        self._shutdown_task: Task[None] | None = None
+        self.client.setup_hook = self.setup_hook
+
+        if config:
+            # Catch up with the settings loaded before the client existed.
+            self.apply_config(config.defaults, config.config)
+            config.appliers.append(self.apply_config)
+
+    async def setup_hook(self) -> None:
+        """Start background tasks before connecting to the gateway."""
+        from chatbot.audit import AUDIT_LOG, AUDIT_RETENTION
+        from chatbot.bot_commands import (
+            DigestScheduler,
+            LogWebhook,
+            PinReconciler,
+            RoleReconciler,
+            send_logs_embeds,
+            set_logs_webhook,
+            set_role_reconciler,
+        )
+        from chatbot.enrichment import ENRICHER
+        from chatbot.link_checker import LINK_CHECKER
+        from chatbot.repository import get_repository
+        from chatbot.usage import USAGE, USAGE_ROLLUP
+
+        if self.health_monitor:
+            self.health_monitor.start()
+
+        if self.config:
+            self.config.start()
+
+        if self.logs_webhook_url:
+            self.logs_webhook = LogWebhook(
+                self.logs_webhook_url, send_logs_embeds
+            )
+            self.logs_webhook.start()
+            set_logs_webhook(self.logs_webhook)
+
+        self.pin_reconciler = PinReconciler(self.client)
+        self.pin_reconciler.start()
+        # Started once connected, when the members and reactions are known.
+        self.role_reconciler = RoleReconciler(
+            self.client, self.guild.id, self.roles_message_id
+        )
+        set_role_reconciler(self.role_reconciler)
+
+        if self.digest_channel_id and self.digest_interval > 0:
+            self.digest = DigestScheduler(
+                self.client, self.digest_channel_id, self.digest_interval
+            )
+            self.digest.start()
+
+        AUDIT_LOG.start()
+        USAGE.start()
+
+        if self.workers:
+            self.workers.start()
+            return
+
+        if self.backups:
+            self.backups.start()
+
+        get_repository().start()
+        ENRICHER.start()
+        LINK_CHECKER.start()
+        AUDIT_RETENTION.start()
+        USAGE_ROLLUP.start()
+
+    def apply_config(self, old: "RuntimeConfig", new: "RuntimeConfig") -> None:
+        """Apply the settings of the client that changed.
+
+        Parameters
+        ----------
+        old : RuntimeConfig
+            The configuration applied.
+        new : RuntimeConfig
+            The configuration to apply.
+
+        """
+        # Imported here like in register_guild_callbacks.
+        from chatbot.bot_commands import fetch_logs_channel, set_role_ids
+
+        if old.role_ids != new.role_ids:
+            set_role_ids(new.role_ids)
+
+        if (
+            new.roles_message_id
+            and old.roles_message_id != new.roles_message_id
+        ):
+            self.roles_message_id = new.roles_message_id
+
+            if self.role_reconciler:
+                self.role_reconciler.message_id = new.roles_message_id
+
+        if new.logs_channel_id and old.logs_channel_id != new.logs_channel_id:
+            self.logs_channel_id = new.logs_channel_id
+
+            if self.client.is_ready():
+                create_task(
+                    fetch_logs_channel(self.client, new.logs_channel_id),
+                    name="fetch-logs-channel",
+                )
+
+        if self.client.is_ready():
+            create_task(self.sync_commands(), name="sync-commands")
+
+            if self.role_reconciler and (
+                old.role_ids != new.role_ids
+                or old.roles_message_id != new.roles_message_id
+            ):
+                self.role_reconciler.start()
+
+    async def sync_commands(self) -> bool:
+        """Register the commands on the server if they changed.
+
+        Syncing is rate limited by Discord, so the definitions are only sent
+        when their fingerprint differs from the last ones synced. Delete
+        COMMANDS_FILE to force a sync.
+
+        Returns
+        -------
+        bool
+            Whether the commands were synced.
+
+        """
+        payload: list[dict[str, Any]] = [
+            command.to_dict(self.client.tree)
+            for command in self.client.tree.get_commands(guild=self.guild)
+        ]
+        fingerprint: str = sha256(
+            dumps(
+                [self.guild.id, payload], sort_keys=True, default=str
+            ).encode()
+        ).hexdigest()
+        path = Path(COMMANDS_FILE)
+
+        try:
+            if path.read_text() == fingerprint:
+                programLogger.debug("Commands unchanged, not synced.")
+                return False
+
+        except OSError:
+            pass
+
+        await self.client.tree.sync(guild=self.guild)
+        programLogger.info(f"Synced {len(payload)} commands.")
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path: Path = path.with_suffix(".tmp")
+            tmp_path.write_text(fingerprint)
+            replace(tmp_path, path)
+
+        except OSError as err:
+            programLogger.error(f"Failed saving commands fingerprint: {err}")
+
+        return True
 
     def register_guild_callbacks(self, logs_channel_id: int) -> None:
-        """Register commands.
+        """Register commands and persistent components.
 
         Parameters
         ----------
@@ -120,6 +377,24 @@ class BotClient:
             ID of the bot logs channel.
 
         """
+        # Imported here so that helper scripts only sending messages don't
+        # load the commands, the database and their dependencies.
+        from chatbot.bot_commands import (
+            PageButton,
+            add_resource,
+            audit,
+            duplicates,
+            fetch_logs_channel,
+            get_resources,
+            help,
+            pins,
+            process_emoji_reaction,
+            stats,
+            sync_roles,
+        )
+
+        self.logs_channel_id = logs_channel_id
+
         # Clear commands
         # for server in client.guilds:
         #     client.tree.clear_commands(guild=Object(id=server.id))
@@ -143,36 +418,184 @@ class BotClient:
         self.client.tree.add_command(
             Command(
                 name="get_resources",
-                description="Display resources matching provided category.",
+                description="Display resources matching categories or tags.",
                 callback=get_resources,
             ),
             guild=self.guild,
         )
+        self.client.tree.add_command(
+            Command(
+                name="pins",
+                description="List the messages pinned in a channel.",
+                callback=pins,
+            ),
+            guild=self.guild,
+        )
+
+        self.client.tree.add_command(
+            Command(
+                name="audit",
+                description="Display the recent actions of the bot and users.",
+                callback=audit,
+            ),
+            guild=self.guild,
+        )
+
+        self.client.tree.add_command(
+            Command(
+                name="stats",
+                description="Display how often commands were used.",
+                callback=stats,
+            ),
+            guild=self.guild,
+        )
+
+        self.client.tree.add_command(
+            Command(
+                name="duplicates",
+                description="Display groups of similar links to clean up.",
+                callback=duplicates,
+            ),
+            guild=self.guild,
+        )
+
+        self.client.tree.add_command(
+            Command(
+                name="sync_roles",
+                description="Give and remove roles to match the reactions.",
+                callback=sync_roles,
+            ),
+            guild=self.guild,
+        )
+
+        # Components keeping their state in their custom ID, dispatched
+        # whichever message or bot run they were sent from.
+        self.client.add_dynamic_items(PageButton)
 
         @self.client.event
         async def on_ready() -> None:
             """Sync the application commands and log when bot is ready."""
-            await self.client.tree.sync(guild=self.guild)
-            set_logs_channel(self.client.get_channel(logs_channel_id))
+            await self.sync_commands()
+            await fetch_logs_channel(self.client, logs_channel_id)
+
+            if self.role_reconciler:
+                # Also after reconnecting, reactions may have been missed.
+                self.role_reconciler.start()
 
             programLogger.notice(f"Bot '{self.client.user}' connected.")
+            self.startup_profile.finish()
 
         @self.client.event
         async def on_raw_reaction_add(payload: RawReactionActionEvent) -> None:
             """Give role or pin message when the user reacts with emoji."""
-            await process_emoji_reaction(
-                self.client, payload, self.roles_message_id, True
-            )
+            if not WORK.accepting:
+                return
+
+            async with WORK.track():
+                await process_emoji_reaction(
+                    self.client, payload, self.roles_message_id, True
+                )
 
         @self.client.event
         async def on_raw_reaction_remove(
             payload: RawReactionActionEvent,
         ) -> None:
             """Remove role or unpin message when the user removes emoji."""
-            await process_emoji_reaction(
-                self.client, payload, self.roles_message_id, False
-            )
+            if not WORK.accepting:
+                return
+
+            async with WORK.track():
+                await process_emoji_reaction(
+                    self.client, payload, self.roles_message_id, False
+                )
 
     def start(self) -> None:
-        """Run Discord bot."""
-        self.client.run(self.bot_token)
+        """Run Discord bot until it is stopped by SIGINT or SIGTERM."""
+        setup_logging()
+        run(self._run())
+
+    async def _run(self) -> None:
+        """Connect to Discord and wait for the shutdown to complete."""
+        loop = get_running_loop()
+
+        for signal in (SIGINT, SIGTERM):
+            loop.add_signal_handler(signal, self.request_shutdown)
+
+        async with self.client:
+            await self.client.start(self.bot_token)
+
+        if self._shutdown_task:
+            await self._shutdown_task
+
+    def request_shutdown(self) -> None:
+        """Start the shutdown, once."""
+        if self._shutdown_task is None:
+            self._shutdown_task = create_task(self.shutdown(), name="shutdown")
+
+    async def shutdown(self) -> None:
+        """Stop the bot without losing work in progress.
+
+        New commands and reactions are refused, background jobs are
+        stopped, pending inserts are written and the work in progress is
+        given SHUTDOWN_TIMEOUT seconds to finish. Then the connection is
+        closed and the storage flushed and closed.
+
+        """
+        # Imported here like in setup_hook.
+        from chatbot.audit import AUDIT_LOG, AUDIT_RETENTION
+        from chatbot.coalescer import RESOURCE_WRITER
+        from chatbot.enrichment import ENRICHER
+        from chatbot.http import close_session
+        from chatbot.link_checker import LINK_CHECKER
+        from chatbot.repository import REPOSITORY
+        from chatbot.usage import USAGE, USAGE_ROLLUP
+
+        programLogger.notice("Shutting down ...")
+        WORK.stop_accepting()
+
+        if self.backups:
+            self.backups.stop()
+
+        if self.pin_reconciler:
+            self.pin_reconciler.stop()
+
+        if self.role_reconciler:
+            self.role_reconciler.stop()
+
+        if self.digest:
+            self.digest.stop()
+
+        if self.config:
+            self.config.stop()
+
+        ENRICHER.stop()
+        LINK_CHECKER.stop()
+        AUDIT_RETENTION.stop()
+        USAGE_ROLLUP.stop()
+        RESOURCE_WRITER.flush()
+
+        if not await WORK.wait_idle(SHUTDOWN_TIMEOUT):
+            programLogger.warning(
+                f"Stopping with {len(WORK)} commands or reactions running."
+            )
+
+        if self.logs_webhook:
+            # Sent before closing the client, the fallback uses it.
+            await self.logs_webhook.stop()
+
+        await self.client.close()
+        await AUDIT_LOG.stop()
+        await USAGE.stop()
+
+        if self.workers:
+            await self.workers.stop()
+
+        if REPOSITORY:
+            await REPOSITORY.close()
+
+        await close_session()
+
+        if self.health_monitor:
+            self.health_monitor.stop()
+
+        programLogger.notice("Bot stopped.")
@@ -0,0 +1,125 @@
+"""Coalescing of concurrent resource inserts into one transaction."""
+
+from asyncio import Future, TimerHandle, get_running_loop
+
+from .classes import ResourceRequest
+from .logger import programLogger
+from .metrics import increment_metric
+from .repository import get_repository
+
+# Seconds during which inserts are collected before being written.
+COALESCE_WINDOW: float = 0.005
+# Number of inserts from which they are written without waiting.
+MAX_BATCH: int = 64
+
+
+class WriteCoalescer:
+    """Class grouping resource inserts issued at the same time.
+
+    Inserts arriving within a few milliseconds of each other are written
+    in a single transaction, so that they share one commit instead of
+    paying one journal sync each. Every caller still gets its own
+    result.
+
+    Methods
+    -------
+    create_resource(url, categories, tags)
+        Insert a resource with the next batch.
+    flush()
+        Write the pending inserts.
+
+    """
+
+    def __init__(
+        self, window: float = COALESCE_WINDOW, max_batch: int = MAX_BATCH
+    ) -> None:
+        """Set the batches parameters.
+
+        Parameters
+        ----------
+        window : float, default=COALESCE_WINDOW
+            Seconds during which inserts are collected.
+        max_batch : int, default=MAX_BATCH
+            Number of inserts from which they are written without
+            waiting.
+
+        """
+        self.window: float = window
+        self.max_batch: int = max_batch
+        self._pending: list[tuple[ResourceRequest, Future[int | None]]] = []
+        self._timer: TimerHandle | None = None
+
+    async def create_resource(
+        self, url: str, categories: list[str], tags: list[str] | None = None
+    ) -> int | None:
+        """Insert a resource with the next batch.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        categories : list of str
+            The category names.
+        tags : list of str or None, default=None
+            The tag names.
+
+        Returns
+        -------
+        int or None
+            The resource ID if object was created or updated. Otherwise,
+            None.
+
+        Raises
+        ------
+        ValueError
+            If resource already exists with these categories and tags.
+
+        """
+        loop = get_running_loop()
+        future: Future[int | None] = loop.create_future()
+        self._pending.append(
+            (ResourceRequest(url, categories, tags or []), future)
+        )
+
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+
+        return await future
+
+    def flush(self) -> None:
+        """Write the pending inserts and resolve their callers."""
+        if self._timer:
+            self._timer.cancel()
+
+        self._timer = None
+        batch, self._pending = self._pending, []
+
+        if not batch:
+            return
+
+        requests: list[ResourceRequest] = [request for request, _ in batch]
+        results: list[int | ValueError | None]
+
+        try:
+            results = get_repository().create_resources(requests)
+
+        except Exception as err:
+            programLogger.error(f"Failed creating resources: {err}")
+            results = [None] * len(batch)
+
+        increment_metric("resources.batches")
+        increment_metric("resources.batched_inserts", len(batch))
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+
+            if isinstance(result, ValueError):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+RESOURCE_WRITER = WriteCoalescer()
@@ -0,0 +1,436 @@
+"""Runtime configuration reloaded while the bot runs."""
+
+from asyncio import CancelledError, Task, create_task, sleep
+from dataclasses import dataclass, field, fields
+from json import loads
+from pathlib import Path
+from re import compile
+from typing import Any, Callable
+
+from discord.app_commands import Choice
+
+from .classes import CATEGORIES, set_categories
+from .logger import programLogger
+from .search import index_categories
+
+# Seconds between two checks of the configuration file.
+CONFIG_CHECK_INTERVAL: float = 5.0
+# Category values, kept free of the separators of the comma-separated
+# filters and of the listings' custom IDs.
+CATEGORY_VALUE = compile(r"[a-z0-9_-]{1,32}")
+# Maximum length of a category name, the length of a choice's name.
+MAX_CATEGORY_NAME_LENGTH: int = 100
+
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """Class defining the settings that can change while the bot runs.
+
+    Attributes
+    ----------
+    roles_message_id : int or None
+        ID of the message to react to to get roles.
+    logs_channel_id : int or None
+        ID of the bot logs channel.
+    role_ids : dict
+        The emojis to the IDs of the roles they give.
+    categories : dict
+        The category values to their names, in display order.
+
+    """
+
+    roles_message_id: int | None = None
+    logs_channel_id: int | None = None
+    role_ids: dict[str, int] = field(default_factory=dict)
+    categories: dict[str, str] = field(default_factory=dict)
+
+    def changes(self, other: "RuntimeConfig") -> list[str]:
+        """List the settings that differ from another configuration.
+
+        Parameters
+        ----------
+        other : RuntimeConfig
+            The other configuration.
+
+        Returns
+        -------
+        list of str
+            The names of the settings that differ.
+
+        """
+        return [
+            setting.name
+            for setting in fields(self)
+            if getattr(self, setting.name) != getattr(other, setting.name)
+        ]
+
+
+# Applies the settings that changed from a configuration to the next.
+ConfigApplier = Callable[[RuntimeConfig, RuntimeConfig], None]
+
+
+def check_id(name: str, value: Any) -> int:
+    """Check that a setting is a Discord ID.
+
+    Parameters
+    ----------
+    name : str
+        The setting name, for error messages.
+    value : Any
+        The setting value.
+
+    Returns
+    -------
+    int
+        The ID.
+
+    Raises
+    ------
+    ValueError
+        If the value isn't a positive integer.
+
+    """
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        raise ValueError(f"'{name}' must be a Discord ID, not {value!r}.")
+
+    return value
+
+
+def check_role_ids(value: Any) -> dict[str, int]:
+    """Check the emojis to role IDs mapping.
+
+    Parameters
+    ----------
+    value : Any
+        The 'roles' setting.
+
+    Returns
+    -------
+    dict
+        The emojis to role IDs.
+
+    Raises
+    ------
+    ValueError
+
+    """
+    if not isinstance(value, dict):
+        raise ValueError("'roles' must map emojis to role IDs.")
+
+    for emoji, role_id in value.items():
+        if not emoji.strip():
+            raise ValueError("'roles' has an empty emoji.")
+
+        check_id(f"roles.{emoji}", role_id)
+
+    return dict(value)
+
+
+def check_categories(value: Any) -> dict[str, str]:
+    """Check the category values to names mapping.
+
+    Parameters
+    ----------
+    value : Any
+        The 'categories' setting.
+
+    Returns
+    -------
+    dict
+        The category values to names.
+
+    Raises
+    ------
+    ValueError
+
+    """
+    if not isinstance(value, dict) or not value:
+        raise ValueError("'categories' must map values to names.")
+
+    names: set[str] = set()
+
+    for category, name in value.items():
+        if not CATEGORY_VALUE.fullmatch(category):
+            raise ValueError(
+                f"Category value '{category}' must be 1 to 32 lowercase "
+                "letters, digits, '-' or '_'."
+            )
+
+        if (
+            not isinstance(name, str)
+            or not name.strip()
+            or len(name) > MAX_CATEGORY_NAME_LENGTH
+        ):
+            raise ValueError(f"Category '{category}' has an invalid name.")
+
+        if name.lower() in names:
+            raise ValueError(f"Category name '{name}' is used twice.")
+
+        names.add(name.lower())
+
+    return dict(value)
+
+
+def load_config(path: str, defaults: RuntimeConfig) -> RuntimeConfig:
+    """Load and validate the configuration file.
+
+    Parameters
+    ----------
+    path : str
+        Path to the JSON configuration file.
+    defaults : RuntimeConfig
+        The settings used when the file omits them.
+
+    Returns
+    -------
+    RuntimeConfig
+        The configuration.
+
+    Raises
+    ------
+    OSError
+        If the file can't be read.
+    ValueError
+        If the file isn't valid JSON or a setting is invalid.
+
+    """
+    data: Any = loads(Path(path).read_text())
+
+    if not isinstance(data, dict):
+        raise ValueError("The configuration must be a JSON object.")
+
+    unknown: set[str] = set(data) - {
+        "roles_message_id",
+        "logs_channel_id",
+        "roles",
+        "categories",
+    }
+
+    if unknown:
+        raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}.")
+
+    return RuntimeConfig(
+        roles_message_id=(
+            check_id("roles_message_id", data["roles_message_id"])
+            if "roles_message_id" in data
+            else defaults.roles_message_id
+        ),
+        logs_channel_id=(
+            check_id("logs_channel_id", data["logs_channel_id"])
+            if "logs_channel_id" in data
+            else defaults.logs_channel_id
+        ),
+        role_ids=(
+            check_role_ids(data["roles"])
+            if "roles" in data
+            else defaults.role_ids
+        ),
+        categories=(
+            check_categories(data["categories"])
+            if "categories" in data
+            else defaults.categories
+        ),
+    )
+
+
+def apply_categories(old: RuntimeConfig, new: RuntimeConfig) -> None:
+    """Rebuild the category lookups if the categories changed.
+
+    Categories removed from the configuration are kept in the storage, so
+    that their resources keep them, but they can't be selected anymore.
+
+    Parameters
+    ----------
+    old : RuntimeConfig
+        The configuration applied.
+    new : RuntimeConfig
+        The configuration to apply.
+
+    """
+    # Imported here to read the storage set when the config is applied.
+    from .repository import REPOSITORY
+
+    if old.categories == new.categories:
+        return
+
+    set_categories(
+        [
+            Choice(name=name, value=value)
+            for value, name in new.categories.items()
+        ]
+    )
+    index_categories()
+
+    if REPOSITORY:
+        REPOSITORY.add_categories(list(new.categories))
+
+
+def default_categories() -> dict[str, str]:
+    """Return the categories defined in the code.
+
+    Returns
+    -------
+    dict
+        The category values to their names.
+
+    """
+    return {category.value: category.name for category in CATEGORIES}
+
+
+class ConfigWatcher:
+    """Class applying the changes of the configuration file while it runs.
+
+    The file is validated as a whole before anything is applied, and the
+    appliers run one after the other without yielding to the event loop,
+    so that commands and reactions see either the old or the new
+    configuration. Each applier only rebuilds the lookups of the settings
+    that changed. An invalid file is logged and ignored.
+
+    Attributes
+    ----------
+    path : str
+        Path to the JSON configuration file.
+    defaults : RuntimeConfig
+        The settings used when the file omits them.
+    appliers : list of callable
+        The functions applying the changed settings.
+    config : RuntimeConfig
+        The configuration applied.
+
+    Methods
+    -------
+    load()
+        Load and apply the configuration file.
+    reload()
+        Apply the configuration file if it changed.
+    start()
+        Start watching the configuration file.
+    stop()
+        Stop watching the configuration file.
+
+    """
+
+    def __init__(
+        self,
+        path: str,
+        defaults: RuntimeConfig,
+        appliers: list[ConfigApplier] | None = None,
+    ) -> None:
+        """Set the configuration file.
+
+        Parameters
+        ----------
+        path : str
+            Path to the JSON configuration file.
+        defaults : RuntimeConfig
+            The settings used when the file omits them.
+        appliers : list of callable or None, default=None
+            The functions applying the changed settings.
+
+        """
+        self.path: str = path
+        self.defaults: RuntimeConfig = defaults
+        self.appliers: list[ConfigApplier] = appliers or []
+        self.config: RuntimeConfig = defaults
+        self._modified: tuple[int, int] | None = None
+        self._task: Task[None] | None = None
+
+    def _stat(self) -> tuple[int, int] | None:
+        """Return the modification time and size of the file."""
+        try:
+            stat = Path(self.path).stat()
+
+        except OSError:
+            return None
+
+        return stat.st_mtime_ns, stat.st_size
+
+    def _apply(self, config: RuntimeConfig) -> list[str]:
+        """Apply a configuration and return the settings that changed."""
+        changes: list[str] = self.config.changes(config)
+
+        if changes:
+            for apply in self.appliers:
+                apply(self.config, config)
+
+            self.config = config
+
+        return changes
+
+    def load(self) -> RuntimeConfig:
+        """Load and apply the configuration file.
+
+        Returns
+        -------
+        RuntimeConfig
+            The configuration.
+
+        Raises
+        ------
+        OSError
+            If the file can't be read.
+        ValueError
+            If the file isn't valid JSON or a setting is invalid.
+
+        """
+        self._modified = self._stat()
+        self._apply(load_config(self.path, self.defaults))
+
+        return self.config
+
+    def reload(self) -> list[str]:
+        """Apply the configuration file if it changed.
+
+        Returns
+        -------
+        list of str
+            The names of the settings applied.
+
+        """
+        modified: tuple[int, int] | None = self._stat()
+
+        if modified is None or modified == self._modified:
+            return []
+
+        self._modified = modified
+
+        try:
+            config: RuntimeConfig = load_config(self.path, self.defaults)
+
+        except (OSError, ValueError) as err:
+            programLogger.error(f"Ignored invalid configuration: {err}")
+            return []
+
+        changes: list[str] = self._apply(config)
+
+        if changes:
+            programLogger.notice(
+                f"Applied configuration: {', '.join(changes)}."
+            )
+
+        return changes
+
+    def start(self) -> None:
+        """Start watching the configuration file."""
+        self._task = create_task(self._run(), name="config-watcher")
+
+    def stop(self) -> None:
+        """Stop watching the configuration file."""
+        if self._task:
+            self._task.cancel()
+
+        self._task = None
+
+    async def _run(self) -> None:
+        """Check the configuration file periodically."""
+        while True:
+            await sleep(CONFIG_CHECK_INTERVAL)
+
+            try:
+                self.reload()
+
+            except CancelledError:
+                raise
+
+            except Exception as err:
+                programLogger.error(f"Failed applying configuration: {err}")
@@ -1,17 +1,31 @@
-"""SQLite helpers."""
+"""SQLite storage of the resources catalog."""
 
 from dataclasses import astuple
+from logging import DEBUG
 from sqlite3 import Connection, Cursor
 from sqlite3 import Error as SqliteError
 from sqlite3 import IntegrityError, connect
-from typing import Any
-
-from rich.pretty import pretty_repr
-
-from .classes import CATEGORIES, Resource
+from time import perf_counter, time
+from typing import Any, Iterator
+
+from .classes import (
+    CATEGORIES,
+    AuditEvent,
+    CatalogEntry,
+    ExportRow,
+    Pin,
+    Resource,
+    ResourceLink,
+    ResourceRequest,
+    UrlMetadata,
+    UsageCount,
+)
 from .logger import programLogger
+from .repository import DEAD_LINK_FAILURES, ResourceRepository
+from .search import index_resource, index_tag, index_title
 
-DB_CONNECTION: Connection
+# Version of the database schema, stored in 'PRAGMA user_version'.
+SCHEMA_VERSION: int = 2
 
 sql_create_categories_table: str = """
 CREATE TABLE IF NOT EXISTS categories (
@@ -20,6 +34,8 @@ CREATE TABLE IF NOT EXISTS categories (
 );
 """
 
+# NOTE: One row per URL since schema version 1. 'category_id' only keeps
+# the first category, categories are stored in 'resource_categories'.
 sql_create_resources_table: str = """
 CREATE TABLE IF NOT EXISTS resources (
     id integer PRIMARY KEY,
@@ -29,260 +45,1363 @@ CREATE TABLE IF NOT EXISTS resources (
 );
 """
 
+# The primary keys are the covering indexes of the lookups by category or
+# tag, the second indexes those of the lookups by resource.
+sql_create_resource_categories_table: str = """
+CREATE TABLE IF NOT EXISTS resource_categories (
+    category_id integer NOT NULL,
+    resource_id integer NOT NULL,
+    PRIMARY KEY (category_id, resource_id),
+    FOREIGN KEY (category_id) REFERENCES categories (id),
+    FOREIGN KEY (resource_id) REFERENCES resources (id)
+) WITHOUT ROWID;
+"""
 
-def create_categories() -> None:
-    """Set categories in database."""
-    cursor: Cursor = DB_CONNECTION.cursor()
-    query: str = "INSERT INTO categories (name) VALUES "
-
-    for idx, category in enumerate(CATEGORIES, start=1):
-        query += f'("{category.value}")'
-        if idx < len(CATEGORIES):
-            query += ","
+sql_create_tags_table: str = """
+CREATE TABLE IF NOT EXISTS tags (
+    id integer PRIMARY KEY,
+    name text NOT NULL UNIQUE
+);
+"""
 
-    try:
-        cursor.execute(query)
-        DB_CONNECTION.commit()
-        programLogger.notice("Created categories.")
+sql_create_resource_tags_table: str = """
+CREATE TABLE IF NOT EXISTS resource_tags (
+    tag_id integer NOT NULL,
+    resource_id integer NOT NULL,
+    PRIMARY KEY (tag_id, resource_id),
+    FOREIGN KEY (tag_id) REFERENCES tags (id),
+    FOREIGN KEY (resource_id) REFERENCES resources (id)
+) WITHOUT ROWID;
+"""
 
-    except (IntegrityError, SqliteError) as err:
-        programLogger.warning(f"Failed creating categories: {err}")
+sql_resources_columns: dict[str, str] = {
+    "link_status": "integer",
+    "last_checked": "real",
+    "check_failures": "integer NOT NULL DEFAULT 0",
+    "created_at": "real",
+}
 
+sql_create_resources_indexes: list[str] = [
+    """
+    CREATE INDEX IF NOT EXISTS idx_categories_name
+    ON categories (name, id);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_resources_last_checked
+    ON resources (last_checked);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_resources_created_at
+    ON resources (created_at);
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_resources_url
+    ON resources (url);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_resource_categories_resource
+    ON resource_categories (resource_id, category_id);
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_resource_tags_resource
+    ON resource_tags (resource_id, tag_id);
+    """,
+]
+
+# Queries migrating the data of a schema version to the next one.
+sql_migrations: dict[int, list[str]] = {
+    # Move categories to 'resource_categories' and merge duplicated URLs.
+    1: [
+        """
+        INSERT OR IGNORE INTO resource_categories (category_id, resource_id)
+        SELECT legacy.category_id, (
+            SELECT MIN(first.id) FROM resources AS first
+            WHERE first.url = legacy.url
+        )
+        FROM resources AS legacy WHERE legacy.category_id IS NOT NULL;
+        """,
+        """
+        DELETE FROM resources
+        WHERE id NOT IN (SELECT MIN(id) FROM resources GROUP BY url);
+        """,
+    ],
+    # Date the resources created before 'created_at' existed as unknown, so
+    # that they never appear in the digest of new resources.
+    2: [
+        """
+        UPDATE resources SET created_at = 0 WHERE created_at IS NULL;
+        """,
+    ],
+}
+
+sql_create_url_metadata_table: str = """
+CREATE TABLE IF NOT EXISTS url_metadata (
+    url text PRIMARY KEY,
+    title text,
+    canonical_url text,
+    etag text,
+    last_modified text,
+    status integer,
+    fetched_at real NOT NULL
+);
+"""
 
-def create_tables() -> None:
-    """Create all tables.
+sql_create_pins_table: str = """
+CREATE TABLE IF NOT EXISTS pins (
+    channel_id integer NOT NULL,
+    message_id integer NOT NULL,
+    pinned_by integer,
+    pinned_at real NOT NULL,
+    PRIMARY KEY (channel_id, message_id)
+) WITHOUT ROWID;
+"""
 
-    Raises
-    ------
-    sqlite3.Error
+# Append-only: events are only inserted, and deleted after retention.
+sql_create_audit_log_table: str = """
+CREATE TABLE IF NOT EXISTS audit_log (
+    id integer PRIMARY KEY,
+    created_at real NOT NULL,
+    user_id integer,
+    action text NOT NULL,
+    detail text NOT NULL
+);
+"""
 
+sql_create_audit_log_indexes: list[str] = [
+    """
+    CREATE INDEX IF NOT EXISTS idx_audit_log_created_at
+    ON audit_log (created_at);
+    """,
     """
-    cursor: Cursor = DB_CONNECTION.cursor()
-    programLogger.debug("Creating tables ...")
+    CREATE INDEX IF NOT EXISTS idx_audit_log_user
+    ON audit_log (user_id, created_at);
+    """,
+]
+
+# Command uses by hour, merged into days after a week. An empty category
+# counts all uses of the command.
+sql_create_usage_tables: list[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS usage_hourly (
+        period integer NOT NULL,
+        command text NOT NULL,
+        category text NOT NULL,
+        count integer NOT NULL,
+        PRIMARY KEY (period, command, category)
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS usage_daily (
+        period integer NOT NULL,
+        command text NOT NULL,
+        category text NOT NULL,
+        count integer NOT NULL,
+        PRIMARY KEY (period, command, category)
+    ) WITHOUT ROWID;
+    """,
+]
 
-    cursor.execute(sql_create_categories_table)
-    cursor.execute(sql_create_resources_table)
-    create_categories()
 
+def match_resources(
+    categories: list[str], tags: list[str], match_all: bool
+) -> str | None:
+    """Build the query of the IDs of resources matching filters.
 
-def init_db_connection(database_path: str) -> None:
-    """Initialize database connection.
+    The query is a union or an intersection of lookups on the covering
+    indexes, with a parameter per category name then per tag name.
 
     Parameters
     ----------
-    database_path : str
-        Path to database file.
+    categories : list of str
+        The category names.
+    tags : list of str
+        The tag names.
+    match_all : bool
+        If True, the resources must match every category and tag.
+        Otherwise, any of them.
+
+    Returns
+    -------
+    str or None
+        The query, None if there are no filters.
 
     """
-    global DB_CONNECTION
-    DB_CONNECTION = connect(database_path)
-    create_tables()
+    lookups: list[str] = [
+        "SELECT resource_id FROM resource_categories WHERE category_id IN "
+        "(SELECT id FROM categories WHERE name=?)"
+    ] * len(categories) + [
+        "SELECT resource_id FROM resource_tags WHERE tag_id="
+        "(SELECT id FROM tags WHERE name=?)"
+    ] * len(
+        tags
+    )
 
+    if not lookups:
+        return None
 
-def fetch_category(category_id: str) -> str | None:
-    """Fetch category by name.
+    operator: str = " INTERSECT " if match_all else " UNION "
 
-    Parameters
+    return operator.join(lookups)
+
+
+class SqliteRepository(ResourceRepository):
+    """Class storing the resources catalog in a SQLite database.
+
+    Attributes
     ----------
-    category_id : str
-        The category ID.
+    connection : sqlite3.Connection
+        The database connection.
+    raise_write_errors : bool
+        Whether failed writes are raised once logged, for a write-behind
+        cache to retry them.
 
-    Returns
+    Methods
     -------
-    str
-        The object name.
+    create_tables()
+        Create all tables.
+    fetch_category(category_id)
+        Fetch category by ID.
+    fetch_category_id(category_name)
+        Fetch category by name.
 
     """
-    cursor: Cursor = DB_CONNECTION.cursor()
-    query: str = "SELECT name FROM categories WHERE id=?"
 
-    try:
-        result: Cursor = cursor.execute(query, (category_id,))
-        first_result: Any | None = result.fetchone()
+    def __init__(
+        self, database_path: str, raise_write_errors: bool = False
+    ) -> None:
+        """Open the database and create the missing tables.
+
+        Parameters
+        ----------
+        database_path : str
+            Path to database file.
+        raise_write_errors : bool, default=False
+            Whether failed writes are raised once logged. Otherwise, they
+            are only logged.
+
+        """
+        self.connection: Connection = connect(database_path)
+        self.raise_write_errors: bool = False
+        self.create_tables()
+        # Set once the tables exist, so that startup isn't stopped by the
+        # categories' creation, as without a cache.
+        self.raise_write_errors = raise_write_errors
+
+    def _write_failed(self, message: str, err: SqliteError) -> None:
+        """Log a failed write and raise it if asked to."""
+        programLogger.error(f"{message}: {err}")
+
+        if self.raise_write_errors:
+            raise err
+
+    async def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    def create_categories(self) -> None:
+        """Set categories in database."""
+        self.add_categories([category.value for category in CATEGORIES])
+
+    def add_categories(self, values: list[str]) -> None:
+        """Add the categories missing from the storage.
+
+        Parameters
+        ----------
+        values : list of str
+            The category values.
+
+        """
+        query: str = (
+            "INSERT INTO categories (name) SELECT ? "
+            "WHERE NOT EXISTS (SELECT 1 FROM categories WHERE name=?)"
+        )
+        changes: int = self.connection.total_changes
 
-        if first_result:
-            return str(first_result[0])
+        try:
+            self.connection.executemany(
+                query, [(value, value) for value in values]
+            )
+            self.connection.commit()
 
-    except SqliteError as err:
-        programLogger.error(f"Failed fetching category: {err}")
+        except SqliteError as err:
+            self._write_failed("Failed creating categories", err)
+            return
 
-    return None
+        if self.connection.total_changes > changes:
+            programLogger.notice(
+                f"Created {self.connection.total_changes - changes} "
+                "categories."
+            )
 
+    def migrate_tables(self) -> None:
+        """Add the columns missing from tables created by older versions.
 
-def fetch_category_id(category_name: str) -> int | None:
-    """Fetch category by name.
+        Raises
+        ------
+        sqlite3.Error
 
-    Parameters
-    ----------
-    category_name : str
-        The category name.
+        """
+        cursor: Cursor = self.connection.cursor()
+        columns: set[str] = {
+            row[1] for row in cursor.execute("PRAGMA table_info(resources)")
+        }
 
-    Returns
-    -------
-    int or None
-        The ID if object was found. Otherwise, None.
+        for name, definition in sql_resources_columns.items():
+            if name not in columns:
+                programLogger.notice(f"Adding column resources.{name}")
+                cursor.execute(
+                    f"ALTER TABLE resources ADD COLUMN {name} {definition}"
+                )
 
-    """
-    cursor: Cursor = DB_CONNECTION.cursor()
-    query: str = "SELECT id FROM categories WHERE name=?"
+        version: int = cursor.execute("PRAGMA user_version").fetchone()[0]
 
-    try:
-        result: Cursor = cursor.execute(query, (category_name,))
-        first_result: Any | None = result.fetchone()
+        for target_version in range(version + 1, SCHEMA_VERSION + 1):
+            programLogger.notice(
+                f"Migrating database to version {target_version}"
+            )
 
-        if first_result:
-            return int(first_result[0])
+            for query in sql_migrations.get(target_version, []):
+                cursor.execute(query)
 
-    except SqliteError as err:
-        programLogger.error(f"Failed fetching category: {err}")
+            cursor.execute(f"PRAGMA user_version = {target_version}")
 
-    return None
+        for query in sql_create_resources_indexes:
+            cursor.execute(query)
 
+        self.connection.commit()
 
-def fetch_all_resources() -> dict[str, list[str]]:
-    """Fetch resources by category if provided.
+    def create_tables(self) -> None:
+        """Create all tables.
 
-    Returns
-    -------
-    list
-        The object list.
+        Raises
+        ------
+        sqlite3.Error
 
-    """
-    cursor: Cursor = DB_CONNECTION.cursor()
-    query: str = "SELECT url,category_id FROM resources"
-    links: dict[str, list[str]] = {}
+        """
+        cursor: Cursor = self.connection.cursor()
+        programLogger.debug("Creating tables ...")
 
-    try:
-        result: Cursor = cursor.execute(query)
+        cursor.execute(sql_create_categories_table)
+        cursor.execute(sql_create_resources_table)
+        cursor.execute(sql_create_url_metadata_table)
+        cursor.execute(sql_create_resource_categories_table)
+        cursor.execute(sql_create_tags_table)
+        cursor.execute(sql_create_resource_tags_table)
+        cursor.execute(sql_create_pins_table)
+        cursor.execute(sql_create_audit_log_table)
 
-        for row in result.fetchall():
-            if row[1] not in links:
-                links[row[1]] = []
-            links[row[1]].append(row[0])
+        for query in sql_create_audit_log_indexes + sql_create_usage_tables:
+            cursor.execute(query)
 
-    except SqliteError as err:
-        programLogger.error(f"Failed fetching resources: {err}")
+        self.migrate_tables()
+        self.create_categories()
 
-    return links
+    def ping(self) -> float | None:
+        """Check that the database answers queries.
 
+        Returns
+        -------
+        float or None
+            The query duration in seconds if the database answered.
+            Otherwise, None.
 
-def fetch_resources(category_name: str) -> list[Any]:
-    """Fetch resources by category if provided.
+        """
+        start: float = perf_counter()
 
-    Parameters
-    ----------
-    category_name : str
-        The category name.
+        try:
+            self.connection.execute("SELECT 1").fetchone()
 
-    Returns
-    -------
-    list
-        The object list.
+        except SqliteError as err:
+            programLogger.error(f"Database ping failed: {err}")
+            return None
 
-    """
-    cursor: Cursor = DB_CONNECTION.cursor()
+        return perf_counter() - start
+
+    def fetch_category(self, category_id: str) -> str | None:
+        """Fetch category by ID.
+
+        Parameters
+        ----------
+        category_id : str
+            The category ID.
 
-    try:
-        category_id: int | None = fetch_category_id(category_name)
-        query: str = "SELECT url FROM resources WHERE category_id=?"
+        Returns
+        -------
+        str
+            The object name.
 
-        if not category_id:
-            programLogger.error(f"No ID found for category {category_name}")
+        """
+        cursor: Cursor = self.connection.cursor()
+        query: str = "SELECT name FROM categories WHERE id=?"
+
+        try:
+            result: Cursor = cursor.execute(query, (category_id,))
+            first_result: Any | None = result.fetchone()
+
+            if first_result:
+                return str(first_result[0])
+
+        except SqliteError as err:
+            programLogger.error(f"Failed fetching category: {err}")
+
+        return None
+
+    def fetch_category_id(self, category_name: str) -> int | None:
+        """Fetch category by name.
+
+        Parameters
+        ----------
+        category_name : str
+            The category name.
+
+        Returns
+        -------
+        int or None
+            The ID if object was found. Otherwise, None.
+
+        """
+        cursor: Cursor = self.connection.cursor()
+        query: str = "SELECT id FROM categories WHERE name=?"
+
+        try:
+            result: Cursor = cursor.execute(query, (category_name,))
+            first_result: Any | None = result.fetchone()
+
+            if first_result:
+                return int(first_result[0])
+
+        except SqliteError as err:
+            programLogger.error(f"Failed fetching category: {err}")
+
+        return None
+
+    def fetch_all_resources(self) -> dict[str, list[ResourceLink]]:
+        """Fetch all resources by category.
+
+        Returns
+        -------
+        dict
+            The category names to the links.
+
+        """
+        cursor: Cursor = self.connection.cursor()
+        query: str = (
+            "SELECT categories.name,resources.url,title,check_failures>=? "
+            "FROM resource_categories "
+            "JOIN categories "
+            "ON categories.id = resource_categories.category_id "
+            "JOIN resources ON resources.id = resource_categories.resource_id "
+            "LEFT JOIN url_metadata ON url_metadata.url = resources.url "
+            "ORDER BY categories.id"
+        )
+        links: dict[str, list[ResourceLink]] = {}
+
+        try:
+            result: Cursor = cursor.execute(query, (DEAD_LINK_FAILURES,))
+
+            for row in result.fetchall():
+                if row[0] not in links:
+                    links[row[0]] = []
+                links[row[0]].append(
+                    ResourceLink(row[1], row[2], bool(row[3]))
+                )
+
+        except SqliteError as err:
+            programLogger.error(f"Failed fetching resources: {err}")
+
+        return links
+
+    def fetch_resources(
+        self,
+        categories: list[str],
+        tags: list[str] | None = None,
+        match_all: bool = False,
+    ) -> list[ResourceLink]:
+        """Fetch resources matching any or all categories and tags.
+
+        The filters are answered by a single query: a union or an
+        intersection of lookups on the covering indexes.
+
+        Parameters
+        ----------
+        categories : list of str
+            The category names.
+        tags : list of str or None, default=None
+            The tag names.
+        match_all : bool, default=False
+            If True, the resources must match every category and tag.
+            Otherwise, any of them.
+
+        Returns
+        -------
+        list of ResourceLink
+            The links.
+
+        """
+        tags = tags or []
+        matching: str | None = match_resources(categories, tags, match_all)
+
+        if not matching:
+            return []
+
+        query: str = (
+            "SELECT resources.url,title,check_failures>=? FROM resources "
+            "LEFT JOIN url_metadata ON url_metadata.url = resources.url "
+            f"WHERE resources.id IN ({matching})"
+        )
+
+        try:
+            result: Cursor = self.connection.execute(
+                query, (DEAD_LINK_FAILURES, *categories, *tags)
+            )
+            return [
+                ResourceLink(row[0], row[1], bool(row[2]))
+                for row in result.fetchall()
+            ]
+
+        except SqliteError as err:
+            programLogger.error(f"Failed fetching resources: {err}")
+
+        return []
+
+    def fetch_resource(self, url: str) -> int | None:
+        """Fetch resource by URL.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+
+        Returns
+        -------
+        int or None
+            The ID if object was found. Otherwise, None.
+
+        """
+        query: str = "SELECT id FROM resources WHERE url=?"
+
+        try:
+            first_result: Any | None = self.connection.execute(
+                query, (url,)
+            ).fetchone()
+
+            if first_result:
+                return int(first_result[0])
+
+        except SqliteError as err:
+            programLogger.error(f"Failed fetching resources: {err}")
+
+        return None
+
+    def create_resource(
+        self, url: str, categories: list[str], tags: list[str] | None = None
+    ) -> int | None:
+        """Insert a new resource or add categories and tags to it.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        categories : list of str
+            The category names.
+        tags : list of str or None, default=None
+            The tag names.
+
+        Returns
+        -------
+        int or None
+            The resource ID if object was created or updated. Otherwise,
+            None.
+
+        Raises
+        ------
+        ValueError
+            If resource already exists in database with these categories
+            and tags.
+
+        """
+        result: int | ValueError | None = self.create_resources(
+            [ResourceRequest(url, categories, tags or [])]
+        )[0]
+
+        if isinstance(result, ValueError):
+            raise result
+
+        return result
+
+    def create_resources(
+        self, requests: list[ResourceRequest]
+    ) -> list[int | ValueError | None]:
+        """Insert resources in a single transaction.
+
+        Each request is applied in its own savepoint, so that a duplicate
+        or a failure only discards that request. The transaction is
+        committed once for all of them.
+
+        Parameters
+        ----------
+        requests : list of ResourceRequest
+            The resources to create or update.
+
+        Returns
+        -------
+        list
+            For each request, the resource ID if object was created or
+            updated, a ValueError if it already exists with these
+            categories and tags, or None if it failed.
+
+        """
+        results: list[int | ValueError | None] = []
+
+        try:
+            if not self.connection.in_transaction:
+                self.connection.execute("BEGIN")
+
+            for request in requests:
+                self.connection.execute("SAVEPOINT create_resource")
+
+                try:
+                    results.append(self._insert_resource(request))
+
+                except (ValueError, IntegrityError) as err:
+                    self.connection.execute("ROLLBACK TO create_resource")
+
+                    if isinstance(err, ValueError):
+                        results.append(err)
+                    else:
+                        programLogger.warning(
+                            f"Failed creating resource: {err}"
+                        )
+                        results.append(None)
+
+                self.connection.execute("RELEASE create_resource")
+
+            self.connection.commit()
+
+        except SqliteError as err:
+            self.connection.rollback()
+            self._write_failed("Failed creating resources", err)
+            return [None] * len(requests)
+
+        for request, result in zip(requests, results):
+            if isinstance(result, int):
+                programLogger.notice(f"Created resource ID: {result}")
+                index_resource(request.url)
+
+                for tag in request.tags:
+                    index_tag(tag)
+
+        if programLogger.isEnabledFor(DEBUG):
+            # Imported lazily: only needed when debug logs are enabled.
+            from rich.pretty import pretty_repr
+
+            programLogger.debug(pretty_repr(requests))
+
+        return results
+
+    def _insert_resource(self, request: ResourceRequest) -> int | None:
+        """Insert a resource without committing.
+
+        Parameters
+        ----------
+        request : ResourceRequest
+            The resource to create or update.
+
+        Returns
+        -------
+        int or None
+            The resource ID if object was created or updated. None if no
+            category was found.
+
+        Raises
+        ------
+        ValueError
+            If resource already exists in database with these categories
+            and tags.
+        sqlite3.Error
+
+        """
+        category_ids: list[int] = []
+
+        for category in request.categories:
+            category_id: int | None = self.fetch_category_id(category)
+
+            if category_id:
+                category_ids.append(category_id)
+            else:
+                programLogger.error(f"No ID found for category {category}")
+
+        if not category_ids:
+            return None
+
+        resource_id: int | None = self.fetch_resource(request.url)
+        cursor: Cursor = self.connection.cursor()
+        changes: int = self.connection.total_changes
+
+        if resource_id is None:
+            resource = Resource(request.url, category_ids[0])
+            cursor.execute(
+                "INSERT INTO resources(url,category_id,created_at) "
+                "VALUES(?,?,?)",
+                (*astuple(resource), time()),
+            )
+            resource_id = cursor.lastrowid
+            changes = self.connection.total_changes
+
+        cursor.executemany(
+            "INSERT OR IGNORE INTO resource_categories"
+            "(category_id,resource_id) VALUES(?,?)",
+            [(category_id, resource_id) for category_id in category_ids],
+        )
+        cursor.executemany(
+            "INSERT OR IGNORE INTO tags(name) VALUES(?)",
+            [(tag,) for tag in request.tags],
+        )
+        cursor.executemany(
+            "INSERT OR IGNORE INTO resource_tags(tag_id,resource_id) "
+            "SELECT id,? FROM tags WHERE name=?",
+            [(resource_id, tag) for tag in request.tags],
+        )
+
+        if self.connection.total_changes == changes:
+            raise ValueError("Resource already exist.")
+
+        return resource_id
+
+    def fetch_catalog(self) -> list[CatalogEntry]:
+        """Fetch every resource with its categories, tags and checks.
+
+        Returns
+        -------
+        list of CatalogEntry
+            The resources, by ID.
+
+        """
+        entries: dict[int, CatalogEntry] = {}
+
+        try:
+            for row in self.connection.execute(
+                "SELECT id,url,link_status,last_checked,check_failures,"
+                "created_at FROM resources ORDER BY id"
+            ):
+                entries[row[0]] = CatalogEntry(
+                    row[0],
+                    row[1],
+                    link_status=row[2],
+                    last_checked=row[3],
+                    check_failures=row[4],
+                    created_at=row[5],
+                )
+
+            for row in self.connection.execute(
+                "SELECT resource_id,categories.name FROM resource_categories "
+                "JOIN categories "
+                "ON categories.id = resource_categories.category_id "
+                "ORDER BY categories.id"
+            ):
+                if row[0] in entries:
+                    entries[row[0]].categories.append(row[1])
+
+            for row in self.connection.execute(
+                "SELECT resource_id,tags.name FROM resource_tags "
+                "JOIN tags ON tags.id = resource_tags.tag_id "
+                "ORDER BY tags.id"
+            ):
+                if row[0] in entries:
+                    entries[row[0]].tags.append(row[1])
+
+        except SqliteError as err:
+            programLogger.error(f"Failed fetching catalog: {err}")
+
+        return list(entries.values())
+
+    def iter_resources(
+        self,
+        categories: list[str] | None = None,
+        tags: list[str] | None = None,
+        match_all: bool = False,
+    ) -> Iterator[ExportRow]:
+        """Iterate over the resources to export, one at a time.
+
+        Rows are read from the cursor as they are written: the listing
+        is never loaded in memory as a whole.
+
+        Parameters
+        ----------
+        categories : list of str or None, default=None
+            The category names.
+        tags : list of str or None, default=None
+            The tag names.
+        match_all : bool, default=False
+            If True, the resources must match every category and tag.
+            Otherwise, any of them.
+
+        Yields
+        ------
+        ExportRow
+            The resources matching the filters, every resource if there
+            are none, by ID.
+
+        """
+        categories = categories or []
+        tags = tags or []
+        matching: str | None = match_resources(categories, tags, match_all)
+        query: str = (
+            "SELECT resources.url,title,check_failures>=?,"
+            "(SELECT GROUP_CONCAT(name,',') FROM resource_categories "
+            "JOIN categories "
+            "ON categories.id = resource_categories.category_id "
+            "WHERE resource_id = resources.id),"
+            "(SELECT GROUP_CONCAT(name,',') FROM resource_tags "
+            "JOIN tags ON tags.id = resource_tags.tag_id "
+            "WHERE resource_id = resources.id) "
+            "FROM resources "
+            "LEFT JOIN url_metadata ON url_metadata.url = resources.url "
+        )
+
+        if matching:
+            query += f"WHERE resources.id IN ({matching}) "
+
+        try:
+            for row in self.connection.execute(
+                query + "ORDER BY resources.id",
+                (DEAD_LINK_FAILURES, *categories, *tags),
+            ):
+                yield ExportRow(
+                    row[0],
+                    row[1],
+                    row[3].split(",") if row[3] else [],
+                    row[4].split(",") if row[4] else [],
+                    bool(row[2]),
+                )
+
+        except SqliteError as err:
+            programLogger.error(f"Failed exporting resources: {err}")
+
+    def fetch_new_resources(
+        self, since: float, until: float, limit: int
+    ) -> list[ExportRow]:
+        """Fetch the resources created during a period.
+
+        Parameters
+        ----------
+        since : float
+            Timestamp after which the resources were created.
+        until : float
+            Timestamp until which the resources were created, included.
+        limit : int
+            Maximum number of resources.
+
+        Returns
+        -------
+        list of ExportRow
+            The oldest resources of the period first.
+
+        """
+        query: str = (
+            "SELECT resources.url,title,check_failures>=?,"
+            "(SELECT GROUP_CONCAT(name,',') FROM resource_categories "
+            "JOIN categories "
+            "ON categories.id = resource_categories.category_id "
+            "WHERE resource_id = resources.id),"
+            "(SELECT GROUP_CONCAT(name,',') FROM resource_tags "
+            "JOIN tags ON tags.id = resource_tags.tag_id "
+            "WHERE resource_id = resources.id),"
+            "created_at "
+            "FROM resources "
+            "LEFT JOIN url_metadata ON url_metadata.url = resources.url "
+            "WHERE created_at > ? AND created_at <= ? "
+            "ORDER BY created_at LIMIT ?"
+        )
 
-        else:
-            result: Cursor = cursor.execute(query, (str(category_id),))
+        try:
+            return [
+                ExportRow(
+                    row[0],
+                    row[1],
+                    row[3].split(",") if row[3] else [],
+                    row[4].split(",") if row[4] else [],
+                    bool(row[2]),
+                    row[5],
+                )
+                for row in self.connection.execute(
+                    query, (DEAD_LINK_FAILURES, since, until, limit)
+                )
+            ]
+
+        except SqliteError as err:
+            programLogger.error(f"Failed fetching new resources: {err}")
+            return []
+
+    def fetch_all_url_metadata(self) -> list[UrlMetadata]:
+        """Fetch the metadata of every URL.
+
+        Returns
+        -------
+        list of UrlMetadata
+            The metadata.
+
+        """
+        query: str = (
+            "SELECT url,title,canonical_url,etag,last_modified,status,"
+            "fetched_at FROM url_metadata"
+        )
+
+        try:
+            return [
+                UrlMetadata(*row) for row in self.connection.execute(query)
+            ]
+
+        except SqliteError as err:
+            programLogger.error(f"Failed fetching URL metadata: {err}")
+
+        return []
+
+    def fetch_urls_to_enrich(self, fetched_before: float) -> list[str]:
+        """Fetch the URLs without metadata or with outdated metadata.
+
+        Parameters
+        ----------
+        fetched_before : float
+            Timestamp before which metadata is outdated.
+
+        Returns
+        -------
+        list of str
+            The URLs, never fetched first.
+
+        """
+        query: str = (
+            "SELECT resources.url FROM resources "
+            "LEFT JOIN url_metadata ON url_metadata.url = resources.url "
+            "WHERE url_metadata.fetched_at IS NULL "
+            "OR url_metadata.fetched_at < ? "
+            "ORDER BY url_metadata.fetched_at IS NOT NULL, "
+            "url_metadata.fetched_at"
+        )
+
+        try:
+            result: Cursor = self.connection.execute(query, (fetched_before,))
             return [row[0] for row in result.fetchall()]
 
-    except SqliteError as err:
-        programLogger.error(f"Failed fetching resources: {err}")
+        except SqliteError as err:
+            programLogger.error(f"Failed fetching URLs to enrich: {err}")
 
-    return []
+        return []
 
+    def fetch_url_metadata(self, url: str) -> UrlMetadata | None:
+        """Fetch the cached metadata of a URL.
 
-def fetch_resource(url: str, category_name: str) -> Any | None:
-    """Fetch resource by URL and category.
+        Parameters
+        ----------
+        url : str
+            The URL.
 
-    Parameters
-    ----------
-    url : str
-        The URL.
-    category_name : str
-        The category name.
+        Returns
+        -------
+        UrlMetadata or None
+            The metadata if the URL was already fetched.
 
-    Returns
-    -------
-    Any or None
-        The object if found.
+        """
+        query: str = (
+            "SELECT url,title,canonical_url,etag,last_modified,status,"
+            "fetched_at FROM url_metadata WHERE url=?"
+        )
 
-    """
-    cursor: Cursor = DB_CONNECTION.cursor()
-
-    try:
-        category_id: int | None = fetch_category_id(category_name)
-        query: str = "SELECT * FROM resources WHERE url=? AND category_id=?"
-
-        if not category_id:
-            programLogger.error(f"No ID found for category {category_name}")
-
-        else:
-            result: Cursor = cursor.execute(
-                query,
-                (
-                    url,
-                    str(category_id),
-                ),
+        try:
+            row: Any | None = self.connection.execute(query, (url,)).fetchone()
+
+            if row:
+                return UrlMetadata(*row)
+
+        except SqliteError as err:
+            programLogger.error(f"Failed fetching URL metadata: {err}")
+
+        return None
+
+    def save_url_metadata(self, metadata: UrlMetadata) -> None:
+        """Insert or replace the metadata of a URL.
+
+        Parameters
+        ----------
+        metadata : UrlMetadata
+            The metadata.
+
+        """
+        query: str = (
+            "INSERT OR REPLACE INTO url_metadata"
+            "(url,title,canonical_url,etag,last_modified,status,fetched_at) "
+            "VALUES(?,?,?,?,?,?,?)"
+        )
+
+        try:
+            self.connection.execute(query, astuple(metadata))
+            self.connection.commit()
+
+            if metadata.title:
+                index_title(metadata.url, metadata.title)
+
+        except SqliteError as err:
+            self._write_failed("Failed saving URL metadata", err)
+
+    def fetch_urls_to_check(
+        self, checked_before: float, limit: int
+    ) -> list[str]:
+        """Fetch the URLs checked the longest time ago.
+
+        Parameters
+        ----------
+        checked_before : float
+            Timestamp after which a check is recent enough.
+        limit : int
+            Maximum number of URLs.
+
+        Returns
+        -------
+        list of str
+            The URLs, never checked first.
+
+        """
+        query: str = (
+            "SELECT url FROM resources "
+            "WHERE last_checked IS NULL OR last_checked < ? "
+            "ORDER BY last_checked IS NOT NULL, last_checked LIMIT ?"
+        )
+
+        try:
+            result: Cursor = self.connection.execute(
+                query, (checked_before, limit)
             )
-            return result.fetchone()
+            return [row[0] for row in result.fetchall()]
 
-    except SqliteError as err:
-        programLogger.error(f"Failed fetching resources: {err}")
+        except SqliteError as err:
+            programLogger.error(f"Failed fetching URLs to check: {err}")
+
+        return []
+
+    def save_link_check(
+        self, url: str, status: int | None, alive: bool, checked_at: float
+    ) -> None:
+        """Record the result of a link check.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        status : int or None
+            The HTTP status, or None if the request failed.
+        alive : bool
+            Whether the link works.
+        checked_at : float
+            Timestamp of the check.
+
+        """
+        query: str = (
+            "UPDATE resources SET link_status=?, last_checked=?, "
+            "check_failures=CASE WHEN ? THEN 0 ELSE check_failures + 1 END "
+            "WHERE url=?"
+        )
 
-    return None
+        try:
+            self.connection.execute(query, (status, checked_at, alive, url))
+            self.connection.commit()
 
+        except SqliteError as err:
+            self._write_failed("Failed saving link check", err)
 
-def create_resource(url: str, category: str) -> int | None:
-    """Insert a new resource row.
+    def save_pin(self, pin: Pin) -> None:
+        """Insert or replace a pinned message.
 
-    Parameters
-    ----------
-    url : str
-        The URL.
-    category : str
-        The category name.
+        Parameters
+        ----------
+        pin : Pin
+            The pinned message.
 
-    Returns
-    -------
-    int or None
-        The generated ID if object was created. Otherwise, None.
+        """
+        query: str = (
+            "INSERT OR REPLACE INTO pins"
+            "(channel_id,message_id,pinned_by,pinned_at) VALUES(?,?,?,?)"
+        )
 
-    Raises
-    ------
-    ValueError
-        If resource already exists in database.
+        try:
+            self.connection.execute(query, astuple(pin))
+            self.connection.commit()
 
-    """
-    if fetch_resource(url, category):
-        raise ValueError("Resource already exist.")
+        except SqliteError as err:
+            self._write_failed("Failed saving pin", err)
 
-    resource_id: int | None = None
-    category_id: int | None = fetch_category_id(category)
+    def delete_pin(self, channel_id: int, message_id: int) -> None:
+        """Remove an unpinned message.
 
-    if category_id:
-        resource = Resource(url, category_id)
-        query: str = "INSERT INTO resources(url,category_id) VALUES(?,?)"
-        cursor: Cursor = DB_CONNECTION.cursor()
+        Parameters
+        ----------
+        channel_id : int
+            The channel ID.
+        message_id : int
+            The message ID.
+
+        """
+        query: str = "DELETE FROM pins WHERE channel_id=? AND message_id=?"
 
         try:
-            cursor.execute(query, astuple(resource))
-            DB_CONNECTION.commit()
-            resource_id = cursor.lastrowid
-            programLogger.notice(f"Created resource ID: {resource_id}")
-            programLogger.debug(pretty_repr(resource))
+            self.connection.execute(query, (channel_id, message_id))
+            self.connection.commit()
+
+        except SqliteError as err:
+            self._write_failed("Failed deleting pin", err)
+
+    def fetch_pins(self, channel_id: int | None = None) -> list[Pin]:
+        """Fetch the pinned messages of a channel or of every channel.
+
+        Parameters
+        ----------
+        channel_id : int or None, default=None
+            The channel ID. If None, the pins of every channel.
 
-        except IntegrityError as err:
-            programLogger.warning(f"Failed creating resource: {err}")
+        Returns
+        -------
+        list of Pin
+            The pinned messages, most recent first.
+
+        """
+        query: str = (
+            "SELECT channel_id,message_id,pinned_by,pinned_at FROM pins "
+        )
+        parameters: tuple[int, ...] = ()
+
+        if channel_id is not None:
+            query += "WHERE channel_id=? "
+            parameters = (channel_id,)
+
+        try:
+            result: Cursor = self.connection.execute(
+                query + "ORDER BY pinned_at DESC", parameters
+            )
+            return [Pin(*row) for row in result.fetchall()]
+
+        except SqliteError as err:
+            programLogger.error(f"Failed fetching pins: {err}")
+
+        return []
+
+    def replace_pins(self, channel_id: int, pins: list[Pin]) -> None:
+        """Replace the pinned messages of a channel.
+
+        Parameters
+        ----------
+        channel_id : int
+            The channel ID.
+        pins : list of Pin
+            The messages currently pinned in the channel.
+
+        """
+        try:
+            with self.connection:
+                self.connection.execute(
+                    "DELETE FROM pins WHERE channel_id=?", (channel_id,)
+                )
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO pins"
+                    "(channel_id,message_id,pinned_by,pinned_at) "
+                    "VALUES(?,?,?,?)",
+                    [astuple(pin) for pin in pins],
+                )
+
+        except SqliteError as err:
+            self._write_failed("Failed replacing pins", err)
+
+    def save_audit_events(self, events: list[AuditEvent]) -> None:
+        """Append events to the audit log.
+
+        Parameters
+        ----------
+        events : list of AuditEvent
+            The events, in order.
+
+        """
+        query: str = (
+            "INSERT INTO audit_log(created_at,user_id,action,detail) "
+            "VALUES(?,?,?,?)"
+        )
+
+        try:
+            with self.connection:
+                self.connection.executemany(
+                    query, [astuple(event) for event in events]
+                )
+
+        except SqliteError as err:
+            self._write_failed("Failed saving audit events", err)
+
+    def fetch_audit_events(
+        self,
+        since: float,
+        user_id: int | None = None,
+        action: str | None = None,
+        limit: int = 100,
+    ) -> list[AuditEvent]:
+        """Fetch the most recent audit events matching filters.
+
+        Parameters
+        ----------
+        since : float
+            Timestamp from which events are fetched.
+        user_id : int or None, default=None
+            If not None, the ID of the user who acted.
+        action : str or None, default=None
+            If not None, the action name.
+        limit : int, default=100
+            Maximum number of events.
+
+        Returns
+        -------
+        list of AuditEvent
+            The events, most recent first.
+
+        """
+        query: str = (
+            "SELECT created_at,user_id,action,detail FROM audit_log "
+            "WHERE created_at >= ? "
+        )
+        parameters: list[Any] = [since]
+
+        if user_id is not None:
+            query += "AND user_id=? "
+            parameters.append(user_id)
+
+        if action is not None:
+            query += "AND action=? "
+            parameters.append(action)
+
+        try:
+            result: Cursor = self.connection.execute(
+                query + "ORDER BY created_at DESC LIMIT ?",
+                (*parameters, limit),
+            )
+            return [AuditEvent(*row) for row in result.fetchall()]
+
+        except SqliteError as err:
+            programLogger.error(f"Failed fetching audit events: {err}")
+
+        return []
+
+    def delete_audit_events(self, before: float, limit: int) -> int:
+        """Delete a batch of audit events older than a date.
+
+        Parameters
+        ----------
+        before : float
+            Timestamp before which events are deleted.
+        limit : int
+            Maximum number of events deleted.
+
+        Returns
+        -------
+        int
+            The number of events deleted.
+
+        """
+        query: str = (
+            "DELETE FROM audit_log WHERE id IN ("
+            "SELECT id FROM audit_log WHERE created_at < ? "
+            "ORDER BY created_at LIMIT ?)"
+        )
+
+        try:
+            with self.connection:
+                return self.connection.execute(query, (before, limit)).rowcount
+
+        except SqliteError as err:
+            programLogger.error(f"Failed deleting audit events: {err}")
+
+        return 0
+
+    def save_usage(self, counts: list[UsageCount]) -> None:
+        """Add command uses to the hourly rollup.
+
+        Parameters
+        ----------
+        counts : list of UsageCount
+            The uses by hour, command and category.
+
+        """
+        query: str = (
+            "INSERT INTO usage_hourly(period,command,category,count) "
+            "VALUES(?,?,?,?) ON CONFLICT(period,command,category) "
+            "DO UPDATE SET count=count+excluded.count"
+        )
+
+        try:
+            with self.connection:
+                self.connection.executemany(
+                    query, [astuple(count) for count in counts]
+                )
+
+        except SqliteError as err:
+            self._write_failed("Failed saving usage", err)
+
+    def fetch_usage(self, since: float) -> list[UsageCount]:
+        """Fetch the hourly and daily command uses since a date.
+
+        Parameters
+        ----------
+        since : float
+            Timestamp from which uses are fetched. Days are fetched
+            whole.
+
+        Returns
+        -------
+        list of UsageCount
+            The uses by hour or day, command and category.
+
+        """
+        query: str = (
+            "SELECT period,command,category,count FROM usage_hourly "
+            "WHERE period >= ? UNION ALL "
+            "SELECT period,command,category,count FROM usage_daily "
+            "WHERE period >= ?"
+        )
+
+        try:
+            result: Cursor = self.connection.execute(
+                query, (since, since - since % 86400)
+            )
+            return [UsageCount(*row) for row in result.fetchall()]
+
+        except SqliteError as err:
+            programLogger.error(f"Failed fetching usage: {err}")
+
+        return []
+
+    def roll_up_usage(self, before: float) -> int:
+        """Merge the hourly uses older than a date into the daily rollup.
+
+        Parameters
+        ----------
+        before : float
+            Timestamp before which hourly uses are merged.
+
+        Returns
+        -------
+        int
+            The number of hourly rows merged.
+
+        """
+        try:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO usage_daily(period,command,category,count) "
+                    "SELECT period - period % 86400,command,category,"
+                    "SUM(count) FROM usage_hourly WHERE period < ? "
+                    "GROUP BY 1,2,3 ON CONFLICT(period,command,category) "
+                    "DO UPDATE SET count=count+excluded.count",
+                    (before,),
+                )
+                return self.connection.execute(
+                    "DELETE FROM usage_hourly WHERE period < ?", (before,)
+                ).rowcount
 
         except SqliteError as err:
-            programLogger.error(f"Failed creating resource: {err}")
+            programLogger.error(f"Failed rolling up usage: {err}")
 
-    return resource_id
+        return 0
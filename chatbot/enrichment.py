@@ -0,0 +1,297 @@
+"""Background enrichment of resources with their page metadata."""
+
+from asyncio import CancelledError, Queue, Task, create_task, sleep
+from html.parser import HTMLParser
+from time import time
+from urllib.parse import urljoin, urlsplit
+
+from aiohttp import ClientError, ClientSession
+
+from .classes import UrlMetadata
+from .health import register_queue
+from .http import HostRateLimiter, get_session
+from .logger import programLogger
+from .repository import get_repository
+
+# Number of pages fetched at the same time.
+MAX_CONCURRENCY: int = 4
+# Minimum delay in seconds between two requests to the same host.
+HOST_DELAY: float = 2.0
+# Maximum number of bytes read from a page to find its metadata.
+MAX_PAGE_SIZE: int = 256 * 1024
+# Age in seconds from which metadata is revalidated.
+REVALIDATE_AFTER: float = 7 * 24 * 3600.0
+# Delay in seconds between two scans for URLs to enrich.
+SCAN_INTERVAL: float = 3600.0
+
+
+class MetadataParser(HTMLParser):
+    """Class extracting the title and canonical URL from an HTML page.
+
+    Attributes
+    ----------
+    title : str or None
+        The page title.
+    canonical_url : str or None
+        The canonical URL as declared in the page.
+
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        super().__init__(convert_charrefs=True)
+        self.title: str | None = None
+        self.canonical_url: str | None = None
+        self._og_title: str | None = None
+        self._in_title: bool = False
+        self._title_parts: list[str] = []
+
+    def handle_starttag(
+        self, tag: str, attrs: list[tuple[str, str | None]]
+    ) -> None:
+        """Look for the title, canonical link and Open Graph title."""
+        attributes: dict[str, str | None] = dict(attrs)
+
+        if tag == "title" and self.title is None:
+            self._in_title = True
+
+        elif (
+            tag == "link"
+            and "canonical" in (attributes.get("rel") or "").lower().split()
+        ):
+            self.canonical_url = attributes.get("href")
+
+        elif tag == "meta" and attributes.get("property") == "og:title":
+            self._og_title = attributes.get("content")
+
+    def handle_endtag(self, tag: str) -> None:
+        """Close the title."""
+        if tag == "title" and self._in_title:
+            self._in_title = False
+            self.title = " ".join("".join(self._title_parts).split()) or None
+
+    def handle_data(self, data: str) -> None:
+        """Collect the title text."""
+        if self._in_title:
+            self._title_parts.append(data)
+
+    def close(self) -> None:
+        """Fall back to the Open Graph title."""
+        super().close()
+
+        if not self.title and self._og_title:
+            self.title = " ".join(self._og_title.split())
+
+
+def parse_metadata(html: str, base_url: str) -> tuple[str | None, str | None]:
+    """Extract the title and canonical URL from an HTML page.
+
+    Parameters
+    ----------
+    html : str
+        The page content.
+    base_url : str
+        The page URL, to resolve a relative canonical URL.
+
+    Returns
+    -------
+    tuple
+        The title and canonical URL if found.
+
+    """
+    parser = MetadataParser()
+    parser.feed(html)
+    parser.close()
+    canonical_url: str | None = (
+        urljoin(base_url, parser.canonical_url)
+        if parser.canonical_url
+        else None
+    )
+
+    return parser.title, canonical_url
+
+
+class MetadataEnricher:
+    """Class fetching resources' page metadata in the background.
+
+    The pooled HTTP session is shared by a bounded number of workers.
+    Requests to the same host are spaced out, pages are revalidated with
+    their ETag and Last-Modified headers and results are persisted in the
+    database, which acts as cache.
+
+    Attributes
+    ----------
+    queue : asyncio.Queue
+        The URLs waiting to be fetched.
+
+    Methods
+    -------
+    start(session)
+        Start the workers.
+    stop()
+        Cancel the workers.
+    enqueue(url)
+        Schedule a URL to be fetched.
+    enrich(url)
+        Fetch and save the metadata of a URL.
+
+    """
+
+    def __init__(
+        self,
+        concurrency: int = MAX_CONCURRENCY,
+        host_delay: float = HOST_DELAY,
+    ) -> None:
+        """Set the enrichment parameters.
+
+        Parameters
+        ----------
+        concurrency : int, default=MAX_CONCURRENCY
+            Number of pages fetched at the same time.
+        host_delay : float, default=HOST_DELAY
+            Minimum delay in seconds between two requests to a host.
+
+        """
+        self.queue: Queue[str] = Queue()
+        self._concurrency: int = concurrency
+        self._pending: set[str] = set()
+        self._rate_limiter = HostRateLimiter(host_delay)
+        self._session: ClientSession | None = None
+        self._tasks: list[Task[None]] = []
+
+    def start(self, session: ClientSession | None = None) -> None:
+        """Start the workers.
+
+        Parameters
+        ----------
+        session : aiohttp.ClientSession or None, default=None
+            The HTTP session to use. If None, the shared pooled session.
+
+        """
+        self._session = session or get_session()
+        self._tasks = [
+            create_task(self._work(), name=f"enrichment-{idx}")
+            for idx in range(self._concurrency)
+        ]
+        self._tasks.append(create_task(self._scan(), name="enrichment-scan"))
+        register_queue("enrichment", self.queue.qsize)
+
+    def stop(self) -> None:
+        """Cancel the workers."""
+        for task in self._tasks:
+            task.cancel()
+
+        self._tasks = []
+        self._session = None
+
+    def enqueue(self, url: str) -> None:
+        """Schedule a URL to be fetched.
+
+        URLs are ignored when the workers are not started: the periodic
+        scan of the process running them picks them up.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+
+        """
+        if self._tasks and url not in self._pending:
+            self._pending.add(url)
+            self.queue.put_nowait(url)
+
+    async def _scan(self) -> None:
+        """Periodically schedule the URLs never fetched or outdated."""
+        while True:
+            for url in get_repository().fetch_urls_to_enrich(
+                time() - REVALIDATE_AFTER
+            ):
+                self.enqueue(url)
+
+            await sleep(SCAN_INTERVAL)
+
+    async def _work(self) -> None:
+        """Fetch the scheduled URLs."""
+        while True:
+            url: str = await self.queue.get()
+
+            try:
+                await self.enrich(url)
+
+            except CancelledError:
+                raise
+
+            except Exception as err:
+                programLogger.warning(f"Failed enriching '{url}': {err}")
+
+            finally:
+                self._pending.discard(url)
+                self.queue.task_done()
+
+    async def enrich(self, url: str) -> UrlMetadata | None:
+        """Fetch and save the metadata of a URL.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+
+        Returns
+        -------
+        UrlMetadata or None
+            The saved metadata, or None if the page couldn't be fetched.
+
+        """
+        if self._session is None:
+            raise RuntimeError("Enrichment session is not started.")
+
+        cached: UrlMetadata | None = get_repository().fetch_url_metadata(url)
+        headers: dict[str, str] = {}
+
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+        await self._rate_limiter.wait(urlsplit(url).netloc)
+
+        try:
+            async with self._session.get(url, headers=headers) as response:
+                if response.status == 304 and cached:
+                    cached.status = response.status
+                    cached.fetched_at = time()
+                    get_repository().save_url_metadata(cached)
+                    return cached
+
+                title: str | None = None
+                canonical_url: str | None = None
+
+                if response.ok and "html" in response.content_type:
+                    content: bytes = await response.content.read(MAX_PAGE_SIZE)
+                    title, canonical_url = parse_metadata(
+                        content.decode(
+                            response.charset or "utf-8", errors="replace"
+                        ),
+                        str(response.url),
+                    )
+
+                metadata = UrlMetadata(
+                    url=url,
+                    title=title,
+                    canonical_url=canonical_url,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    status=response.status,
+                    fetched_at=time(),
+                )
+
+        except (ClientError, TimeoutError, UnicodeDecodeError) as err:
+            programLogger.warning(f"Failed fetching '{url}': {err}")
+            return None
+
+        get_repository().save_url_metadata(metadata)
+        programLogger.debug(f"Enriched '{url}': {metadata.title}")
+        return metadata
+
+
+ENRICHER = MetadataEnricher()
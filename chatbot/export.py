@@ -0,0 +1,159 @@
+"""Export of resources listings to Markdown or CSV files."""
+
+from csv import writer
+from datetime import datetime, timezone
+from io import TextIOWrapper
+from tempfile import SpooledTemporaryFile
+from typing import Callable, Iterable, TextIO
+
+from .classes import ExportRow
+
+# Size in bytes from which an export is spooled to disk.
+SPOOL_SIZE: int = 1 << 20
+# Maximum size in bytes of an export, under Discord's upload limit.
+MAX_EXPORT_SIZE: int = 8 << 20
+
+
+def escape_markdown_cell(text: str) -> str:
+    """Escape text so that it stays in its Markdown table cell.
+
+    Parameters
+    ----------
+    text : str
+        The cell content.
+
+    Returns
+    -------
+    str
+        The content without pipes or line breaks.
+
+    """
+    return text.replace("|", "\\|").replace("\n", " ")
+
+
+def write_markdown(rows: Iterable[ExportRow], stream: TextIO) -> int:
+    """Write resources as a Markdown table.
+
+    Parameters
+    ----------
+    rows : iterable of ExportRow
+        The resources.
+    stream : TextIO
+        The output.
+
+    Returns
+    -------
+    int
+        The number of resources written.
+
+    """
+    count: int = 0
+    date: str = f"{datetime.now(timezone.utc):%Y-%m-%d %H:%M} UTC"
+    stream.write(f"# Resources\n\nExported on {date}.\n\n")
+    stream.write("| Link | Categories | Tags |\n| --- | --- | --- |\n")
+
+    for row in rows:
+        link: str = (
+            f"[{escape_markdown_cell(row.title)}]({row.url})"
+            if row.title
+            else row.url
+        )
+
+        if row.dead:
+            link += " ⚠️ dead link"
+
+        stream.write(
+            f"| {link} | {', '.join(row.categories)} | "
+            f"{escape_markdown_cell(', '.join(row.tags))} |\n"
+        )
+        count += 1
+
+    return count
+
+
+def write_csv(rows: Iterable[ExportRow], stream: TextIO) -> int:
+    """Write resources as CSV.
+
+    Parameters
+    ----------
+    rows : iterable of ExportRow
+        The resources.
+    stream : TextIO
+        The output.
+
+    Returns
+    -------
+    int
+        The number of resources written.
+
+    """
+    count: int = 0
+    csv_writer = writer(stream)
+    csv_writer.writerow(["url", "title", "categories", "tags", "dead"])
+
+    for row in rows:
+        csv_writer.writerow(
+            [
+                row.url,
+                row.title or "",
+                ",".join(row.categories),
+                ",".join(row.tags),
+                int(row.dead),
+            ]
+        )
+        count += 1
+
+    return count
+
+
+# Export formats to their file extension and writer.
+EXPORT_FORMATS: dict[
+    str, tuple[str, Callable[[Iterable[ExportRow], TextIO], int]]
+] = {
+    "markdown": ("md", write_markdown),
+    "csv": ("csv", write_csv),
+}
+
+
+def export_resources(
+    rows: Iterable[ExportRow], format: str
+) -> tuple[SpooledTemporaryFile[bytes], int]:
+    """Write resources to a file, in memory unless it is large.
+
+    The rows are written as they are iterated, so that the listing is
+    never held in memory as a whole.
+
+    Parameters
+    ----------
+    rows : iterable of ExportRow
+        The resources.
+    format : {'markdown', 'csv'}
+        The file format.
+
+    Returns
+    -------
+    tuple
+        The file, rewound, and the number of resources written.
+
+    Raises
+    ------
+    ValueError
+        If the file exceeds MAX_EXPORT_SIZE.
+
+    """
+    _, write = EXPORT_FORMATS[format]
+    buffer: SpooledTemporaryFile[bytes] = SpooledTemporaryFile(
+        max_size=SPOOL_SIZE
+    )
+    stream = TextIOWrapper(buffer, encoding="utf-8", newline="")
+    count: int = write(rows, stream)
+    stream.flush()
+    stream.detach()
+
+    if buffer.tell() > MAX_EXPORT_SIZE:
+        buffer.close()
+        raise ValueError("Export is too large to be uploaded.")
+
+    buffer.seek(0)
+
+    return buffer, count
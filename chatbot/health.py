@@ -0,0 +1,253 @@
+"""Liveness and readiness probe.
+
+The bot periodically writes its status to a JSON file that the
+``chatbot-healthcheck`` command reads to tell the orchestrator whether
+the process is healthy.
+"""
+
+from argparse import ArgumentParser, Namespace
+from asyncio import CancelledError, Task, create_task, get_running_loop, sleep
+from datetime import datetime
+from json import JSONDecodeError, dumps, loads
+from math import isfinite
+from os import replace
+from pathlib import Path
+from time import time
+from typing import Any, Callable
+
+from .logger import programLogger
+
+# Seconds between two ticks of the event-loop lag probe.
+TICK_INTERVAL: float = 0.5
+# Seconds between two writes of the status file.
+STATUS_INTERVAL: float = 15.0
+# Event-loop lag (in seconds) from which the process is wedged.
+MAX_LOOP_LAG: float = 5.0
+# Queue names to functions returning their current size.
+QUEUE_BACKLOGS: dict[str, Callable[[], int]] = {}
+
+
+def register_queue(name: str, size: Callable[[], int]) -> None:
+    """Report the backlog of a queue in the status.
+
+    Parameters
+    ----------
+    name : str
+        The queue name.
+    size : callable
+        Function returning the number of pending items.
+
+    """
+    QUEUE_BACKLOGS[name] = size
+
+
+class HealthMonitor:
+    """Class writing the bot status to a file.
+
+    Attributes
+    ----------
+    client : discord.ext.commands.Bot
+        The Discord client.
+    status_path : pathlib.Path
+        The status file.
+    loop_lag : float
+        The last event-loop lag measured in seconds.
+
+    Methods
+    -------
+    start()
+        Start the background tasks.
+    stop()
+        Cancel the background tasks.
+    collect()
+        Return the current status.
+
+    """
+
+    def __init__(self, client: Any, status_path: str) -> None:
+        """Set the monitored client and the status file.
+
+        Parameters
+        ----------
+        client : discord.ext.commands.Bot
+            The Discord client.
+        status_path : str
+            Path to the status file.
+
+        """
+        self.client: Any = client
+        self.status_path: Path = Path(status_path)
+        self.loop_lag: float = 0.0
+        self._tasks: list[Task[None]] = []
+
+    def start(self) -> None:
+        """Start the background tasks."""
+        self._tasks = [
+            create_task(self._tick(), name="health-ticker"),
+            create_task(self._write_status(), name="health-status"),
+        ]
+
+    def stop(self) -> None:
+        """Cancel the background tasks."""
+        for task in self._tasks:
+            task.cancel()
+
+        self._tasks = []
+
+    async def _tick(self) -> None:
+        """Measure how late the event loop wakes up a sleeping task."""
+        loop = get_running_loop()
+
+        while True:
+            before: float = loop.time()
+            await sleep(TICK_INTERVAL)
+            self.loop_lag = max(loop.time() - before - TICK_INTERVAL, 0.0)
+
+    def collect(self) -> dict[str, Any]:
+        """Return the current status.
+
+        Returns
+        -------
+        dict
+            The status.
+
+        """
+        # Imported here so that the healthcheck command doesn't load them.
+        from .bot_commands.dispatch import WORKER_POOL
+        from .repository import REPOSITORY
+
+        latency: float = self.client.latency
+        connected: bool = (
+            not self.client.is_closed() and self.client.is_ready()
+        )
+        database_latency: float | None = None
+
+        if REPOSITORY:
+            database_latency = REPOSITORY.ping()
+        elif WORKER_POOL:
+            # Gateway: the database is reached through the workers.
+            database_latency = WORKER_POOL.database_latency
+
+        queues: dict[str, int] = {}
+
+        for name, size in QUEUE_BACKLOGS.items():
+            queues[name] = size()
+
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "updated_at": time(),
+            "healthy": (
+                connected
+                and database_latency is not None
+                and self.loop_lag < MAX_LOOP_LAG
+            ),
+            "gateway": {
+                "connected": connected,
+                "latency_ms": (
+                    round(latency * 1000, 1) if isfinite(latency) else None
+                ),
+            },
+            "database": {
+                "responsive": database_latency is not None,
+                "latency_ms": (
+                    round(database_latency * 1000, 1)
+                    if database_latency is not None
+                    else None
+                ),
+            },
+            "loop_lag_ms": round(self.loop_lag * 1000, 1),
+            "queues": queues,
+        }
+
+    async def _write_status(self) -> None:
+        """Write the status file periodically."""
+        while True:
+            try:
+                self.status_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path: Path = self.status_path.with_suffix(".tmp")
+                tmp_path.write_text(dumps(self.collect()))
+                # Atomic so the healthcheck never reads a partial file.
+                replace(tmp_path, self.status_path)
+
+            except CancelledError:
+                raise
+
+            except Exception as err:
+                programLogger.error(f"Failed writing health status: {err}")
+
+            await sleep(STATUS_INTERVAL)
+
+
+def check_health(status_path: str, max_age: float) -> bool:
+    """Check the status file written by the bot.
+
+    Parameters
+    ----------
+    status_path : str
+        Path to the status file.
+    max_age : float
+        Age in seconds from which the status is stale.
+
+    Returns
+    -------
+    bool
+        True if the status is recent and healthy.
+
+    """
+    try:
+        status: dict[str, Any] = loads(Path(status_path).read_text())
+
+    except (FileNotFoundError, OSError, JSONDecodeError) as err:
+        print(f"Unreadable status file '{status_path}': {err}")
+        return False
+
+    age: float = time() - float(status.get("updated_at", 0.0))
+
+    if age > max_age:
+        print(f"Stale status: last updated {age:.0f} sec ago.")
+        return False
+
+    print(dumps(status))
+    return bool(status.get("healthy"))
+
+
+def parse_args() -> Namespace:
+    """Parse the arguments of the healthcheck.
+
+    Returns
+    -------
+    argparse.Namespace
+        Command line arguments of the program.
+
+    """
+    parser: ArgumentParser = ArgumentParser(
+        description="Exit with an error if the bot is not healthy."
+    )
+
+    parser.add_argument(
+        "status_file",
+        type=str,
+        nargs="?",
+        default="logs/health.json",
+        help="status file written by the bot (default: 'logs/health.json')",
+    )
+    parser.add_argument(
+        "-a",
+        "--max-age",
+        type=float,
+        default=STATUS_INTERVAL * 4,
+        metavar="seconds",
+        help=(
+            "age from which the status is stale "
+            f"(default: {STATUS_INTERVAL * 4:.0f})"
+        ),
+    )
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Healthcheck entrypoint."""
+    args: Namespace = parse_args()
+
+    raise SystemExit(0 if check_health(args.status_file, args.max_age) else 1)
@@ -0,0 +1,93 @@
+"""Shared HTTP client for background jobs."""
+
+from asyncio import Lock, get_running_loop, sleep
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+# Maximum number of open connections in the pool.
+MAX_CONNECTIONS: int = 8
+# Maximum number of open connections to the same host.
+MAX_CONNECTIONS_PER_HOST: int = 2
+USER_AGENT: str = "Chatbot (resources indexing bot)"
+
+SESSION: ClientSession | None = None
+
+
+def get_session() -> ClientSession:
+    """Return the pooled HTTP session, created on first use.
+
+    Returns
+    -------
+    aiohttp.ClientSession
+        The session shared by background jobs.
+
+    """
+    global SESSION
+
+    if SESSION is None or SESSION.closed:
+        SESSION = ClientSession(
+            connector=TCPConnector(
+                limit=MAX_CONNECTIONS,
+                limit_per_host=MAX_CONNECTIONS_PER_HOST,
+                ttl_dns_cache=300,
+            ),
+            timeout=ClientTimeout(total=15.0),
+            headers={"User-Agent": USER_AGENT},
+        )
+
+    return SESSION
+
+
+async def close_session() -> None:
+    """Close the pooled HTTP session."""
+    global SESSION
+
+    if SESSION is not None:
+        await SESSION.close()
+        SESSION = None
+
+
+class HostRateLimiter:
+    """Class spacing out the requests sent to the same host.
+
+    Methods
+    -------
+    wait(host)
+        Wait until a request can be sent to the host.
+
+    """
+
+    def __init__(self, delay: float) -> None:
+        """Set the delay between requests.
+
+        Parameters
+        ----------
+        delay : float
+            Minimum delay in seconds between two requests to a host.
+
+        """
+        self.delay: float = delay
+        self._locks: dict[str, Lock] = {}
+        self._last_request: dict[str, float] = {}
+
+    async def wait(self, host: str) -> None:
+        """Wait until a request can be sent to the host.
+
+        Parameters
+        ----------
+        host : str
+            The host name.
+
+        """
+        lock: Lock = self._locks.setdefault(host, Lock())
+
+        async with lock:
+            loop = get_running_loop()
+            delay: float = (
+                self._last_request.get(host, 0.0) + self.delay - loop.time()
+            )
+
+            if delay > 0:
+                await sleep(delay)
+
+            self._last_request[host] = loop.time()
@@ -0,0 +1,467 @@
+"""Local IPC between the gateway and worker processes.
+
+Messages are JSON objects, one per line, over Unix sockets. The gateway
+sends calls `{"id": 1, "call": "name", "args": {...}}` and the worker
+answers `{"id": 1, "result": ...}` or `{"id": 1, "error": "..."}`.
+Calls are answered concurrently, in any order.
+"""
+
+from asyncio import (
+    Future,
+    Lock,
+    Server,
+    StreamReader,
+    StreamWriter,
+    Task,
+    create_task,
+    get_running_loop,
+    open_unix_connection,
+    sleep,
+    start_unix_server,
+    wait_for,
+)
+from functools import partial
+from itertools import count
+from json import dumps, loads
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from .logger import programLogger
+
+# Maximum size of a message in bytes, with room for base64 exports.
+MAX_MESSAGE_SIZE: int = 16 << 20
+# Seconds to wait for a worker's answer.
+CALL_TIMEOUT: float = 10.0
+# Seconds between two pings of the workers.
+PING_INTERVAL: float = 10.0
+# Seconds between two relays of the workers' search index updates.
+RELAY_INTERVAL: float = 1.0
+# Maximum number of index updates kept for a worker that didn't apply them.
+MAX_RELAYED_UPDATES: int = 10000
+
+Dispatcher = Callable[..., Awaitable[Any]]
+
+
+class WorkerError(RuntimeError):
+    """Error raised by a call in a worker process."""
+
+
+async def serve(path: str, dispatch: Dispatcher) -> Server:
+    """Answer the calls received on a Unix socket.
+
+    Parameters
+    ----------
+    path : str
+        Path to the socket file, replaced if it exists.
+    dispatch : callable
+        Coroutine function called with the call name and arguments.
+
+    Returns
+    -------
+    asyncio.Server
+        The server.
+
+    """
+    Path(path).unlink(missing_ok=True)
+
+    return await start_unix_server(
+        partial(_handle_connection, dispatch),
+        path=path,
+        limit=MAX_MESSAGE_SIZE,
+    )
+
+
+async def _handle_connection(
+    dispatch: Dispatcher, reader: StreamReader, writer: StreamWriter
+) -> None:
+    """Answer the calls of a gateway connection until it is closed.
+
+    Parameters
+    ----------
+    dispatch : callable
+        Coroutine function called with the call name and arguments.
+    reader : asyncio.StreamReader
+        The connection input.
+    writer : asyncio.StreamWriter
+        The connection output.
+
+    """
+    tasks: set[Task[None]] = set()
+
+    try:
+        while line := await reader.readline():
+            task: Task[None] = create_task(_answer(dispatch, line, writer))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    except (ConnectionError, ValueError) as err:
+        programLogger.warning(f"Gateway connection lost: {err}")
+
+    finally:
+        writer.close()
+
+
+async def _answer(
+    dispatch: Dispatcher, line: bytes, writer: StreamWriter
+) -> None:
+    """Run a call and send the answer.
+
+    Parameters
+    ----------
+    dispatch : callable
+        Coroutine function called with the call name and arguments.
+    line : bytes
+        The call message.
+    writer : asyncio.StreamWriter
+        The connection output.
+
+    """
+    response: dict[str, Any] = {}
+
+    try:
+        request: dict[str, Any] = loads(line)
+        response["id"] = request["id"]
+        response["result"] = await dispatch(
+            request["call"], **request.get("args", {})
+        )
+
+    except Exception as err:
+        programLogger.error(f"Failed answering call: {err}")
+        response["error"] = f"{type(err).__name__}: {err}"
+
+    try:
+        writer.write(dumps(response).encode() + b"\n")
+        await writer.drain()
+
+    except ConnectionError as err:
+        programLogger.warning(f"Failed answering call: {err}")
+
+
+class IpcClient:
+    """Class sending calls to a worker process.
+
+    The connection is opened on the first call and reopened after the
+    worker restarts.
+
+    Attributes
+    ----------
+    path : str
+        Path to the socket file of the worker.
+
+    Methods
+    -------
+    call(name, **kwargs)
+        Run a call in the worker.
+    close()
+        Close the connection.
+
+    """
+
+    def __init__(self, path: str) -> None:
+        """Set the worker.
+
+        Parameters
+        ----------
+        path : str
+            Path to the socket file of the worker.
+
+        """
+        self.path: str = path
+        self._writer: StreamWriter | None = None
+        self._reader_task: Task[None] | None = None
+        self._pending: dict[int, Future[Any]] = {}
+        self._ids = count()
+        self._lock = Lock()
+
+    async def _connect(self) -> StreamWriter:
+        """Open the connection if it is closed.
+
+        Returns
+        -------
+        asyncio.StreamWriter
+            The connection output.
+
+        """
+        async with self._lock:
+            if self._writer is None or self._writer.is_closing():
+                reader, self._writer = await open_unix_connection(
+                    self.path, limit=MAX_MESSAGE_SIZE
+                )
+                self._reader_task = create_task(
+                    self._read(reader), name=f"ipc-{self.path}"
+                )
+
+            return self._writer
+
+    async def _read(self, reader: StreamReader) -> None:
+        """Resolve the pending calls with the worker's answers.
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+            The connection input.
+
+        """
+        try:
+            while line := await reader.readline():
+                response: dict[str, Any] = loads(line)
+                future: Future[Any] | None = self._pending.pop(
+                    response.get("id", -1), None
+                )
+
+                if future is None or future.done():
+                    continue
+
+                if "error" in response:
+                    future.set_exception(WorkerError(response["error"]))
+                else:
+                    future.set_result(response.get("result"))
+
+        except (ConnectionError, ValueError) as err:
+            programLogger.warning(f"Worker '{self.path}' connection: {err}")
+
+        finally:
+            if self._writer:
+                self._writer.close()
+
+            self._writer = None
+
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(
+                        ConnectionError(f"Worker '{self.path}' disconnected.")
+                    )
+
+            self._pending.clear()
+
+    async def call(self, name: str, **kwargs: Any) -> Any:
+        """Run a call in the worker.
+
+        Parameters
+        ----------
+        name : str
+            The call name.
+        **kwargs
+            The call arguments.
+
+        Returns
+        -------
+        Any
+            The call result.
+
+        Raises
+        ------
+        ConnectionError
+            If the worker can't be reached.
+        WorkerError
+            If the call failed in the worker.
+        TimeoutError
+            If the worker didn't answer in time.
+
+        """
+        try:
+            writer: StreamWriter = await self._connect()
+
+        except OSError as err:
+            raise ConnectionError(err) from err
+
+        call_id: int = next(self._ids)
+        future: Future[Any] = get_running_loop().create_future()
+        self._pending[call_id] = future
+
+        try:
+            writer.write(
+                dumps({"id": call_id, "call": name, "args": kwargs}).encode()
+                + b"\n"
+            )
+            await writer.drain()
+
+            return await wait_for(future, CALL_TIMEOUT)
+
+        finally:
+            self._pending.pop(call_id, None)
+
+    async def close(self) -> None:
+        """Close the connection."""
+        if self._reader_task:
+            self._reader_task.cancel()
+
+        if self._writer:
+            self._writer.close()
+
+        self._writer = None
+
+
+class WorkerPool:
+    """Class spreading calls over worker processes.
+
+    Calls are sent to the workers in turn. A call is sent to the next
+    worker if one can't be reached. The workers are pinged periodically
+    to report their database responsiveness, and the updates of each
+    worker's search indexes are relayed to the others, so that every
+    worker answers autocompletions and similar links alike.
+
+    Attributes
+    ----------
+    clients : list of IpcClient
+        The connections to the workers.
+    latencies : dict
+        Worker socket paths to their last database latency in seconds,
+        or None if they didn't answer.
+
+    Methods
+    -------
+    start()
+        Start pinging the workers and relaying their index updates.
+    stop()
+        Stop the background tasks and close the connections.
+    call(name, **kwargs)
+        Run a call in a worker.
+
+    """
+
+    def __init__(self, paths: list[str]) -> None:
+        """Set the workers.
+
+        Parameters
+        ----------
+        paths : list of str
+            Paths to the socket files of the workers.
+
+        """
+        self.clients: list[IpcClient] = [IpcClient(path) for path in paths]
+        self.latencies: dict[str, float | None] = {
+            path: None for path in paths
+        }
+        self._next: int = 0
+        self._task: Task[None] | None = None
+        self._relay_task: Task[None] | None = None
+        self._relayed: dict[str, list[Any]] = {path: [] for path in paths}
+
+    @property
+    def database_latency(self) -> float | None:
+        """The lowest database latency of the workers, if any answered."""
+        latencies: list[float] = [
+            latency
+            for latency in self.latencies.values()
+            if latency is not None
+        ]
+
+        return min(latencies, default=None)
+
+    def start(self) -> None:
+        """Start pinging the workers and relaying their index updates."""
+        self._task = create_task(self._ping(), name="worker-ping")
+        self._relay_task = create_task(self._relay(), name="worker-relay")
+
+    async def stop(self) -> None:
+        """Stop the background tasks and close the connections."""
+        for task in (self._task, self._relay_task):
+            if task:
+                task.cancel()
+
+        self._task = None
+        self._relay_task = None
+
+        for client in self.clients:
+            await client.close()
+
+    async def _ping(self) -> None:
+        """Record the database latency of the workers periodically."""
+        while True:
+            for client in self.clients:
+                try:
+                    self.latencies[client.path] = await client.call("ping")
+
+                except (ConnectionError, WorkerError, TimeoutError) as err:
+                    programLogger.warning(f"Worker '{client.path}': {err}")
+                    self.latencies[client.path] = None
+
+            await sleep(PING_INTERVAL)
+
+    async def _relay(self) -> None:
+        """Relay the index updates of each worker to the others periodically.
+
+        Updates are kept for a worker until it applies them, so that a
+        worker restarting or busy catches up. Applying an update twice has
+        no effect.
+
+        """
+        while True:
+            for client in self.clients:
+                try:
+                    updates: list[Any] = await client.call(
+                        "take_index_updates"
+                    )
+
+                except (ConnectionError, WorkerError, TimeoutError) as err:
+                    # Unreachable workers are reported by the pings.
+                    programLogger.debug(f"Worker '{client.path}': {err}")
+                    continue
+
+                for other in self.clients:
+                    if other is not client:
+                        self._relayed[other.path].extend(updates)
+
+            for client in self.clients:
+                relayed: list[Any] = self._relayed[client.path]
+
+                if not relayed:
+                    continue
+
+                if len(relayed) > MAX_RELAYED_UPDATES:
+                    programLogger.warning(
+                        f"Worker '{client.path}': dropped "
+                        f"{len(relayed) - MAX_RELAYED_UPDATES} index "
+                        "updates, restart it to reload its indexes."
+                    )
+                    del relayed[:-MAX_RELAYED_UPDATES]
+
+                try:
+                    await client.call("apply_index_updates", updates=relayed)
+                    self._relayed[client.path] = []
+
+                except (ConnectionError, WorkerError, TimeoutError) as err:
+                    programLogger.debug(f"Worker '{client.path}': {err}")
+
+            await sleep(RELAY_INTERVAL)
+
+    async def call(self, name: str, **kwargs: Any) -> Any:
+        """Run a call in a worker.
+
+        Parameters
+        ----------
+        name : str
+            The call name.
+        **kwargs
+            The call arguments.
+
+        Returns
+        -------
+        Any
+            The call result.
+
+        Raises
+        ------
+        ConnectionError
+            If no worker can be reached.
+        WorkerError
+            If the call failed in the worker.
+        TimeoutError
+            If the worker didn't answer in time.
+
+        """
+        error: ConnectionError | None = None
+
+        for _ in self.clients:
+            client: IpcClient = self.clients[self._next % len(self.clients)]
+            self._next += 1
+
+            try:
+                return await client.call(name, **kwargs)
+
+            except ConnectionError as err:
+                programLogger.warning(f"Worker '{client.path}': {err}")
+                error = err
+
+        raise ConnectionError(f"No worker available: {error}")
@@ -0,0 +1,185 @@
+"""Background checker of dead resources' links."""
+
+from asyncio import CancelledError, Semaphore, Task, create_task, gather, sleep
+from time import time
+from urllib.parse import urlsplit
+
+from aiohttp import ClientError, ClientSession
+
+from .http import HostRateLimiter, get_session
+from .logger import programLogger
+from .repository import get_repository
+
+# Number of links checked at the same time.
+MAX_CONCURRENCY: int = 4
+# Minimum delay in seconds between two requests to the same host.
+HOST_DELAY: float = 2.0
+# Number of links checked per batch.
+BATCH_SIZE: int = 20
+# Delay in seconds between two batches.
+CHECK_INTERVAL: float = 300.0
+# Age in seconds from which a link is checked again.
+RECHECK_AFTER: float = 24 * 3600.0
+# Statuses returned by servers refusing bots rather than missing pages.
+BLOCKED_STATUSES: set[int] = {401, 403, 429}
+# Statuses from which HEAD requests are retried with GET.
+HEAD_UNSUPPORTED_STATUSES: set[int] = {405, 501}
+
+
+class LinkChecker:
+    """Class checking resources' links in the background.
+
+    Links are checked by batches, the least recently checked first, with
+    a bounded number of concurrent requests over the shared pooled
+    session and a delay between requests to the same host.
+
+    Methods
+    -------
+    start(session)
+        Start the checks.
+    stop()
+        Cancel the checks.
+    check(url)
+        Check a link and record the result.
+    check_batch()
+        Check the links checked the longest time ago.
+
+    """
+
+    def __init__(
+        self,
+        concurrency: int = MAX_CONCURRENCY,
+        host_delay: float = HOST_DELAY,
+    ) -> None:
+        """Set the checks parameters.
+
+        Parameters
+        ----------
+        concurrency : int, default=MAX_CONCURRENCY
+            Number of links checked at the same time.
+        host_delay : float, default=HOST_DELAY
+            Minimum delay in seconds between two requests to a host.
+
+        """
+        self._semaphore = Semaphore(concurrency)
+        self._rate_limiter = HostRateLimiter(host_delay)
+        self._session: ClientSession | None = None
+        self._task: Task[None] | None = None
+
+    def start(self, session: ClientSession | None = None) -> None:
+        """Start the checks.
+
+        Parameters
+        ----------
+        session : aiohttp.ClientSession or None, default=None
+            The HTTP session to use. If None, the shared pooled session.
+
+        """
+        self._session = session or get_session()
+        self._task = create_task(self._run(), name="link-checker")
+
+    def stop(self) -> None:
+        """Cancel the checks."""
+        if self._task:
+            self._task.cancel()
+
+        self._task = None
+        self._session = None
+
+    async def _run(self) -> None:
+        """Check batches of links periodically."""
+        while True:
+            try:
+                await self.check_batch()
+
+            except CancelledError:
+                raise
+
+            except Exception as err:
+                programLogger.error(f"Failed checking links: {err}")
+
+            await sleep(CHECK_INTERVAL)
+
+    async def check_batch(self) -> int:
+        """Check the links checked the longest time ago.
+
+        Returns
+        -------
+        int
+            The number of dead links found.
+
+        """
+        urls: list[str] = get_repository().fetch_urls_to_check(
+            time() - RECHECK_AFTER, BATCH_SIZE
+        )
+        results: list[bool] = await gather(*(self.check(url) for url in urls))
+        dead: int = results.count(False)
+
+        if urls:
+            programLogger.info(f"Checked {len(urls)} links: {dead} failed.")
+
+        return dead
+
+    async def _request(self, method: str, url: str) -> int:
+        """Send a request and return the response status.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method.
+        url : str
+            The URL.
+
+        Returns
+        -------
+        int
+            The HTTP status.
+
+        """
+        if self._session is None:
+            raise RuntimeError("Link checker session is not started.")
+
+        await self._rate_limiter.wait(urlsplit(url).netloc)
+
+        async with self._session.request(
+            method, url, allow_redirects=True
+        ) as response:
+            status: int = response.status
+
+        return status
+
+    async def check(self, url: str) -> bool:
+        """Check a link and record the result.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+
+        Returns
+        -------
+        bool
+            Whether the link works.
+
+        """
+        status: int | None = None
+
+        async with self._semaphore:
+            try:
+                status = await self._request("HEAD", url)
+
+                if status in HEAD_UNSUPPORTED_STATUSES:
+                    status = await self._request("GET", url)
+
+            except (ClientError, TimeoutError, ValueError) as err:
+                programLogger.debug(f"Failed checking '{url}': {err}")
+
+        alive: bool = status is not None and (
+            status < 400 or status in BLOCKED_STATUSES
+        )
+        get_repository().save_link_check(url, status, alive, time())
+
+        return alive
+
+
+LINK_CHECKER = LinkChecker()
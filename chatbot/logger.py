@@ -4,7 +4,6 @@ from datetime import datetime
 from pathlib import Path
 from typing import Literal, TypeAlias
 
-import coloredlogs
 from verboselogs import VerboseLogger
 
 LogLevel: TypeAlias = Literal["error", "warning"]
@@ -21,6 +20,9 @@ def set_logger(debug: bool) -> None:
         If True, set log verbosity level to debug.
 
     """
+    # Imported lazily: modules using the logger don't need it to be styled.
+    import coloredlogs
+
     level: str = "DEBUG" if debug else "INFO"
 
     coloredlogs.install(
@@ -3,11 +3,98 @@
 from argparse import ArgumentParser, Namespace
 from os import getenv
 
-from aiohttp.client_exceptions import ClientConnectorError
-
-from .client import BotClient
-from .database import init_db_connection
+from .backup import BackupScheduler
 from .logger import log_to_file, programLogger, set_logger
+from .profiling import StartupProfile
+
+# Heavy modules imported at startup, in import order. They are imported
+# only once the arguments and environment are validated.
+STARTUP_IMPORTS: list[str] = [
+    "aiohttp",
+    "discord",
+    "chatbot.repository",
+    "chatbot.bot_commands",
+    "chatbot.client",
+]
+# Names of the storage backends, see chatbot.repository.create_repository.
+STORAGE_BACKENDS: list[str] = ["sqlite", "memory", "tiered"]
+
+
+def add_storage_arguments(parser: ArgumentParser) -> None:
+    """Add the arguments of the storage and its backups.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        The parser of the program's arguments.
+
+    """
+    parser.add_argument(
+        "-f",
+        "--database-file",
+        type=str,
+        metavar="filename.db",
+        default="logs/resources.db",
+        help="SQLite database filename (default: 'logs/resources.db')",
+    )
+    parser.add_argument(
+        "-b",
+        "--storage",
+        type=str,
+        choices=STORAGE_BACKENDS,
+        default="sqlite",
+        help=(
+            "storage backend: 'tiered' serves resources from memory and "
+            "writes them to the database in the background (default: "
+            "'sqlite')"
+        ),
+    )
+    parser.add_argument(
+        "-k",
+        "--backup-dir",
+        type=str,
+        metavar="directory",
+        default="logs/backups",
+        help="database snapshots directory (default: 'logs/backups')",
+    )
+    parser.add_argument(
+        "-i",
+        "--backup-interval",
+        type=float,
+        metavar="hours",
+        default=24.0,
+        help="hours between two snapshots, 0 to disable (default: 24)",
+    )
+    parser.add_argument(
+        "-n",
+        "--backup-retention",
+        type=int,
+        metavar="count",
+        default=7,
+        help="number of snapshots kept (default: 7)",
+    )
+
+
+def add_config_argument(parser: ArgumentParser) -> None:
+    """Add the argument of the runtime configuration file.
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        The parser of the program's arguments.
+
+    """
+    parser.add_argument(
+        "-c",
+        "--config",
+        type=str,
+        metavar="filename.json",
+        default=None,
+        help=(
+            "settings applied while the bot runs when the file changes: "
+            "roles message, logs channel, roles and categories"
+        ),
+    )
 
 
 def parse_args() -> Namespace:
@@ -26,43 +113,173 @@ def parse_args() -> Namespace:
     parser.add_argument(
         "-d", "--debug", action="store_true", help="display debug logs"
     )
+    add_storage_arguments(parser)
+    add_config_argument(parser)
     parser.add_argument(
-        "-f",
-        "--database-file",
+        "-w",
+        "--workers",
         type=str,
-        metavar="filename.db",
-        default="logs/resources.db",
-        help="SQLite database filename (default: 'logs/resources.db')",
+        nargs="+",
+        default=None,
+        metavar="socket",
+        help=(
+            "run as a gateway forwarding commands to the worker processes "
+            "listening on these sockets (see chatbot-worker)"
+        ),
+    )
+    parser.add_argument(
+        "-s",
+        "--health-file",
+        type=str,
+        metavar="filename.json",
+        default="logs/health.json",
+        help="status file for the healthcheck (default: 'logs/health.json')",
+    )
+    parser.add_argument(
+        "-g",
+        "--digest-interval",
+        type=float,
+        metavar="hours",
+        default=24.0,
+        help=(
+            "hours between two digests of the new resources posted to "
+            "DIGEST_CHANNEL_ID, 0 to disable (default: 24)"
+        ),
+    )
+    parser.add_argument(
+        "-p",
+        "--profile-startup",
+        type=str,
+        nargs="?",
+        const="logs/startup_profile.jsonl",
+        default=None,
+        metavar="filename.jsonl",
+        help=(
+            "report where startup time goes and append time-to-ready to "
+            "file (default: 'logs/startup_profile.jsonl')"
+        ),
     )
 
     return parser.parse_args()
 
 
+def create_backup_scheduler(args: Namespace) -> BackupScheduler | None:
+    """Create the scheduler of the database snapshots.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Command line arguments of the program.
+
+    Returns
+    -------
+    BackupScheduler or None
+        The scheduler, or None if backups are disabled.
+
+    """
+    if args.backup_interval <= 0 or args.storage == "memory":
+        return None
+
+    return BackupScheduler(
+        args.database_file,
+        args.backup_dir,
+        args.backup_interval * 3600,
+        args.backup_retention,
+    )
+
+
 def main() -> None:
     """Program's entrypoint."""
     args: Namespace = parse_args()
+    profile = StartupProfile(args.profile_startup)
     bot_token: str | None = getenv("BOT_TOKEN")
     server_id: str | None = getenv("SERVER_ID")
     roles_message_id: str | None = getenv("ROLES_MESSAGE_ID")
     bot_channel_id: str | None = getenv("BOT_LOGS_CHANNEL_ID")
+    digest_channel_id: str | None = getenv("DIGEST_CHANNEL_ID")
+    logs_webhook_url: str | None = getenv("BOT_LOGS_WEBHOOK_URL")
 
     set_logger(args.debug)
+    profile.mark("logger and arguments")
 
-    if not all([bot_token, server_id, roles_message_id, bot_channel_id]):
+    if not all([bot_token, server_id]) or not (
+        args.config or all([roles_message_id, bot_channel_id])
+    ):
         programLogger.error(
             "Missing environment variables. BOT_TOKEN, SERVER_ID, "
             "ROLES_MESSAGE_ID and BOT_LOGS_CHANNEL_ID must be set in .env file."
         )
         return
 
+    for module_name in STARTUP_IMPORTS:
+        profile.time_import(module_name)
+
+    from aiohttp.client_exceptions import ClientConnectorError
+
+    from .bot_commands.dispatch import set_worker_pool
+    from .bot_commands.emoji import ROLE_IDS
+    from .client import BotClient
+    from .config import (
+        ConfigWatcher,
+        RuntimeConfig,
+        apply_categories,
+        default_categories,
+    )
+    from .ipc import WorkerPool
+    from .repository import create_repository, set_repository
+
     try:
-        init_db_connection(args.database_file)
+        workers: WorkerPool | None = None
+
+        if args.workers:
+            workers = WorkerPool(args.workers)
+            set_worker_pool(workers)
+        else:
+            set_repository(create_repository(args.storage, args.database_file))
+
+        profile.mark("storage")
+        config = RuntimeConfig(
+            int(roles_message_id) if roles_message_id else None,
+            int(bot_channel_id) if bot_channel_id else None,
+            dict(ROLE_IDS),
+            default_categories(),
+        )
+        watcher: ConfigWatcher | None = None
+
+        if args.config:
+            watcher = ConfigWatcher(args.config, config, [apply_categories])
+
+            try:
+                config = watcher.load()
+
+            except (OSError, ValueError) as err:
+                programLogger.error(f"Invalid configuration: {err}")
+                return
+
+        if not config.roles_message_id or not config.logs_channel_id:
+            programLogger.error(
+                "Missing settings. ROLES_MESSAGE_ID and BOT_LOGS_CHANNEL_ID "
+                "must be set in .env file or in the configuration file."
+            )
+            return
+
         bot = BotClient(
             bot_token,
             int(server_id),  # type: ignore
-            int(roles_message_id),  # type: ignore
+            config.roles_message_id,
+            startup_profile=profile,
+            health_file=args.health_file,
+            backups=None if workers else create_backup_scheduler(args),
+            workers=workers,
+            digest_channel_id=(
+                int(digest_channel_id) if digest_channel_id else None
+            ),
+            digest_interval=args.digest_interval * 3600,
+            config=watcher,
+            logs_webhook_url=logs_webhook_url or None,
         )
-        bot.register_guild_callbacks(int(bot_channel_id))  # type: ignore
+        bot.register_guild_callbacks(config.logs_channel_id)
+        profile.mark("client setup")
 
         bot.start()
 
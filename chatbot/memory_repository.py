@@ -0,0 +1,715 @@
+"""In-memory storage of the resources catalog."""
+
+from collections import Counter
+from heapq import nsmallest
+from time import time
+from typing import Iterator
+
+from .classes import (
+    CATEGORIES,
+    AuditEvent,
+    CatalogEntry,
+    ExportRow,
+    Pin,
+    ResourceLink,
+    UrlMetadata,
+    UsageCount,
+)
+from .logger import programLogger
+from .repository import DEAD_LINK_FAILURES, ResourceRepository
+from .search import index_resource, index_tag, index_title
+
+
+class MemoryRepository(ResourceRepository):
+    """Class storing the resources catalog in memory.
+
+    Resources are kept by ID with reverse indexes by URL, category and
+    tag, so that filters are answered by set operations. Nothing is
+    persisted: the catalog is lost when the bot stops unless it is
+    loaded from and written to another storage.
+
+    Methods
+    -------
+    load(catalog, metadata, pins)
+        Replace the catalog with resources fetched from another storage.
+
+    """
+
+    def __init__(self) -> None:
+        """Create an empty catalog."""
+        self.load([], [])
+
+    def load(
+        self,
+        catalog: list[CatalogEntry],
+        metadata: list[UrlMetadata],
+        pins: list[Pin] | None = None,
+    ) -> None:
+        """Replace the catalog with resources fetched from another storage.
+
+        Parameters
+        ----------
+        catalog : list of CatalogEntry
+            The resources.
+        metadata : list of UrlMetadata
+            The metadata of the URLs.
+        pins : list of Pin or None, default=None
+            The pinned messages.
+
+        """
+        self._resources: dict[int, CatalogEntry] = {}
+        self._ids: dict[str, int] = {}
+        self._categories: dict[str, set[int]] = {
+            category.value: set() for category in CATEGORIES
+        }
+        self._tags: dict[str, set[int]] = {}
+        self._metadata: dict[str, UrlMetadata] = {
+            item.url: item for item in metadata
+        }
+        self._audit_log: list[AuditEvent] = []
+        # Periods, commands and categories to their number of uses.
+        self._usage_hourly: Counter[tuple[int, str, str]] = Counter()
+        self._usage_daily: Counter[tuple[int, str, str]] = Counter()
+        # Channel IDs to their pins by message ID.
+        self._pins: dict[int, dict[int, Pin]] = {}
+
+        for pin in pins or []:
+            self._pins.setdefault(pin.channel_id, {})[pin.message_id] = pin
+
+        for entry in catalog:
+            self._resources[entry.id] = entry
+            self._ids[entry.url] = entry.id
+
+            for category in entry.categories:
+                self._categories.setdefault(category, set()).add(entry.id)
+
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(entry.id)
+
+    def ping(self) -> float | None:
+        """Check that the storage answers queries.
+
+        Returns
+        -------
+        float
+            The query duration in seconds, always 0 in memory.
+
+        """
+        return 0.0
+
+    def _link(self, resource_id: int) -> ResourceLink:
+        """Return the link of a resource as displayed in listings.
+
+        Parameters
+        ----------
+        resource_id : int
+            The resource ID.
+
+        Returns
+        -------
+        ResourceLink
+            The link.
+
+        """
+        entry: CatalogEntry = self._resources[resource_id]
+        metadata: UrlMetadata | None = self._metadata.get(entry.url)
+
+        return ResourceLink(
+            entry.url,
+            metadata.title if metadata else None,
+            entry.check_failures >= DEAD_LINK_FAILURES,
+        )
+
+    def add_categories(self, values: list[str]) -> None:
+        """Add the categories missing from the storage.
+
+        Parameters
+        ----------
+        values : list of str
+            The category values.
+
+        """
+        for value in values:
+            self._categories.setdefault(value, set())
+
+    def create_resource(
+        self, url: str, categories: list[str], tags: list[str] | None = None
+    ) -> int | None:
+        """Insert a new resource or add categories and tags to it.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        categories : list of str
+            The category names.
+        tags : list of str or None, default=None
+            The tag names.
+
+        Returns
+        -------
+        int or None
+            The resource ID if object was created or updated. Otherwise,
+            None.
+
+        Raises
+        ------
+        ValueError
+            If resource already exists with these categories and tags.
+
+        """
+        tags = tags or []
+        known: list[str] = []
+
+        for category in categories:
+            if category in self._categories:
+                known.append(category)
+            else:
+                programLogger.error(f"No ID found for category {category}")
+
+        if not known:
+            return None
+
+        resource_id: int | None = self._ids.get(url)
+
+        if resource_id is None:
+            # Same IDs as SQLite: the largest one plus one.
+            resource_id = max(self._resources, default=0) + 1
+            self._resources[resource_id] = CatalogEntry(
+                resource_id, url, created_at=time()
+            )
+            self._ids[url] = resource_id
+
+        elif all(
+            resource_id in self._categories[category] for category in known
+        ) and all(resource_id in self._tags.get(tag, ()) for tag in tags):
+            raise ValueError("Resource already exist.")
+
+        entry: CatalogEntry = self._resources[resource_id]
+
+        for category in known:
+            if resource_id not in self._categories[category]:
+                self._categories[category].add(resource_id)
+                entry.categories.append(category)
+
+        for tag in tags:
+            if resource_id not in self._tags.setdefault(tag, set()):
+                self._tags[tag].add(resource_id)
+                entry.tags.append(tag)
+
+        programLogger.notice(f"Created resource ID: {resource_id}")
+        index_resource(url)
+
+        for tag in tags:
+            index_tag(tag)
+
+        return resource_id
+
+    def fetch_resource(self, url: str) -> int | None:
+        """Fetch resource by URL.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+
+        Returns
+        -------
+        int or None
+            The ID if object was found. Otherwise, None.
+
+        """
+        return self._ids.get(url)
+
+    def fetch_all_resources(self) -> dict[str, list[ResourceLink]]:
+        """Fetch all resources by category.
+
+        Returns
+        -------
+        dict
+            The category names to the links.
+
+        """
+        return {
+            category: [self._link(id) for id in sorted(resource_ids)]
+            for category, resource_ids in self._categories.items()
+            if resource_ids
+        }
+
+    def fetch_resources(
+        self,
+        categories: list[str],
+        tags: list[str] | None = None,
+        match_all: bool = False,
+    ) -> list[ResourceLink]:
+        """Fetch resources matching any or all categories and tags.
+
+        Parameters
+        ----------
+        categories : list of str
+            The category names.
+        tags : list of str or None, default=None
+            The tag names.
+        match_all : bool, default=False
+            If True, the resources must match every category and tag.
+            Otherwise, any of them.
+
+        Returns
+        -------
+        list of ResourceLink
+            The links.
+
+        """
+        lookups: list[set[int]] = [
+            self._categories.get(category, set()) for category in categories
+        ] + [self._tags.get(tag, set()) for tag in tags or []]
+
+        if not lookups:
+            return []
+
+        resource_ids: set[int] = (
+            set.intersection(*lookups) if match_all else set.union(*lookups)
+        )
+
+        return [self._link(id) for id in sorted(resource_ids)]
+
+    def fetch_catalog(self) -> list[CatalogEntry]:
+        """Fetch every resource with its categories, tags and checks.
+
+        Returns
+        -------
+        list of CatalogEntry
+            The resources, by ID.
+
+        """
+        return [self._resources[id] for id in sorted(self._resources)]
+
+    def iter_resources(
+        self,
+        categories: list[str] | None = None,
+        tags: list[str] | None = None,
+        match_all: bool = False,
+    ) -> Iterator[ExportRow]:
+        """Iterate over the resources to export, one at a time.
+
+        Parameters
+        ----------
+        categories : list of str or None, default=None
+            The category names.
+        tags : list of str or None, default=None
+            The tag names.
+        match_all : bool, default=False
+            If True, the resources must match every category and tag.
+            Otherwise, any of them.
+
+        Yields
+        ------
+        ExportRow
+            The resources matching the filters, every resource if there
+            are none, by ID.
+
+        """
+        lookups: list[set[int]] = [
+            self._categories.get(category, set())
+            for category in categories or []
+        ] + [self._tags.get(tag, set()) for tag in tags or []]
+        resource_ids: set[int] | dict[int, CatalogEntry] = (
+            (set.intersection if match_all else set.union)(*lookups)
+            if lookups
+            else self._resources
+        )
+
+        for resource_id in sorted(resource_ids):
+            entry: CatalogEntry = self._resources[resource_id]
+            link: ResourceLink = self._link(resource_id)
+            yield ExportRow(
+                entry.url,
+                link.title,
+                list(entry.categories),
+                list(entry.tags),
+                link.dead,
+            )
+
+    def fetch_new_resources(
+        self, since: float, until: float, limit: int
+    ) -> list[ExportRow]:
+        """Fetch the resources created during a period.
+
+        Parameters
+        ----------
+        since : float
+            Timestamp after which the resources were created.
+        until : float
+            Timestamp until which the resources were created, included.
+        limit : int
+            Maximum number of resources.
+
+        Returns
+        -------
+        list of ExportRow
+            The oldest resources of the period first.
+
+        Resources are created in ID order, so only the newest ones are
+        read.
+
+        """
+        rows: list[ExportRow] = []
+
+        for entry in reversed(self._resources.values()):
+            if entry.created_at is None or entry.created_at <= since:
+                break
+
+            if entry.created_at <= until:
+                link: ResourceLink = self._link(entry.id)
+                rows.append(
+                    ExportRow(
+                        entry.url,
+                        link.title,
+                        list(entry.categories),
+                        list(entry.tags),
+                        link.dead,
+                        entry.created_at,
+                    )
+                )
+
+        return rows[::-1][:limit]
+
+    def fetch_all_url_metadata(self) -> list[UrlMetadata]:
+        """Fetch the metadata of every URL.
+
+        Returns
+        -------
+        list of UrlMetadata
+            The metadata.
+
+        """
+        return list(self._metadata.values())
+
+    def fetch_urls_to_enrich(self, fetched_before: float) -> list[str]:
+        """Fetch the URLs without metadata or with outdated metadata.
+
+        Parameters
+        ----------
+        fetched_before : float
+            Timestamp before which metadata is outdated.
+
+        Returns
+        -------
+        list of str
+            The URLs, never fetched first.
+
+        """
+        fetched_at: dict[str, float | None] = {
+            url: (
+                self._metadata[url].fetched_at
+                if url in self._metadata
+                else None
+            )
+            for url in self._ids
+        }
+
+        return sorted(
+            (
+                url
+                for url, timestamp in fetched_at.items()
+                if timestamp is None or timestamp < fetched_before
+            ),
+            key=lambda url: (
+                fetched_at[url] is not None,
+                fetched_at[url] or 0.0,
+            ),
+        )
+
+    def fetch_url_metadata(self, url: str) -> UrlMetadata | None:
+        """Fetch the cached metadata of a URL.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+
+        Returns
+        -------
+        UrlMetadata or None
+            The metadata if the URL was already fetched.
+
+        """
+        return self._metadata.get(url)
+
+    def save_url_metadata(self, metadata: UrlMetadata) -> None:
+        """Insert or replace the metadata of a URL.
+
+        Parameters
+        ----------
+        metadata : UrlMetadata
+            The metadata.
+
+        """
+        self._metadata[metadata.url] = metadata
+
+        if metadata.title:
+            index_title(metadata.url, metadata.title)
+
+    def fetch_urls_to_check(
+        self, checked_before: float, limit: int
+    ) -> list[str]:
+        """Fetch the URLs checked the longest time ago.
+
+        Parameters
+        ----------
+        checked_before : float
+            Timestamp after which a check is recent enough.
+        limit : int
+            Maximum number of URLs.
+
+        Returns
+        -------
+        list of str
+            The URLs, never checked first.
+
+        """
+        entries: list[CatalogEntry] = nsmallest(
+            limit,
+            (
+                entry
+                for entry in self._resources.values()
+                if entry.last_checked is None
+                or entry.last_checked < checked_before
+            ),
+            key=lambda entry: (
+                entry.last_checked is not None,
+                entry.last_checked or 0.0,
+            ),
+        )
+
+        return [entry.url for entry in entries]
+
+    def save_link_check(
+        self, url: str, status: int | None, alive: bool, checked_at: float
+    ) -> None:
+        """Record the result of a link check.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        status : int or None
+            The HTTP status, or None if the request failed.
+        alive : bool
+            Whether the link works.
+        checked_at : float
+            Timestamp of the check.
+
+        """
+        resource_id: int | None = self._ids.get(url)
+
+        if resource_id is None:
+            return
+
+        entry: CatalogEntry = self._resources[resource_id]
+        entry.link_status = status
+        entry.last_checked = checked_at
+        entry.check_failures = 0 if alive else entry.check_failures + 1
+
+    def save_pin(self, pin: Pin) -> None:
+        """Insert or replace a pinned message.
+
+        Parameters
+        ----------
+        pin : Pin
+            The pinned message.
+
+        """
+        self._pins.setdefault(pin.channel_id, {})[pin.message_id] = pin
+
+    def delete_pin(self, channel_id: int, message_id: int) -> None:
+        """Remove an unpinned message.
+
+        Parameters
+        ----------
+        channel_id : int
+            The channel ID.
+        message_id : int
+            The message ID.
+
+        """
+        self._pins.get(channel_id, {}).pop(message_id, None)
+
+    def fetch_pins(self, channel_id: int | None = None) -> list[Pin]:
+        """Fetch the pinned messages of a channel or of every channel.
+
+        Parameters
+        ----------
+        channel_id : int or None, default=None
+            The channel ID. If None, the pins of every channel.
+
+        Returns
+        -------
+        list of Pin
+            The pinned messages, most recent first.
+
+        """
+        channels: list[dict[int, Pin]] = (
+            list(self._pins.values())
+            if channel_id is None
+            else [self._pins.get(channel_id, {})]
+        )
+
+        return sorted(
+            (pin for pins in channels for pin in pins.values()),
+            key=lambda pin: pin.pinned_at,
+            reverse=True,
+        )
+
+    def replace_pins(self, channel_id: int, pins: list[Pin]) -> None:
+        """Replace the pinned messages of a channel.
+
+        Parameters
+        ----------
+        channel_id : int
+            The channel ID.
+        pins : list of Pin
+            The messages currently pinned in the channel.
+
+        """
+        self._pins[channel_id] = {pin.message_id: pin for pin in pins}
+
+    def save_audit_events(self, events: list[AuditEvent]) -> None:
+        """Append events to the audit log.
+
+        Parameters
+        ----------
+        events : list of AuditEvent
+            The events, in order.
+
+        """
+        self._audit_log.extend(events)
+
+    def fetch_audit_events(
+        self,
+        since: float,
+        user_id: int | None = None,
+        action: str | None = None,
+        limit: int = 100,
+    ) -> list[AuditEvent]:
+        """Fetch the most recent audit events matching filters.
+
+        Parameters
+        ----------
+        since : float
+            Timestamp from which events are fetched.
+        user_id : int or None, default=None
+            If not None, the ID of the user who acted.
+        action : str or None, default=None
+            If not None, the action name.
+        limit : int, default=100
+            Maximum number of events.
+
+        Returns
+        -------
+        list of AuditEvent
+            The events, most recent first.
+
+        """
+        events: list[AuditEvent] = [
+            event
+            for event in self._audit_log
+            if event.created_at >= since
+            and (user_id is None or event.user_id == user_id)
+            and (action is None or event.action == action)
+        ]
+
+        return sorted(
+            events, key=lambda event: event.created_at, reverse=True
+        )[:limit]
+
+    def delete_audit_events(self, before: float, limit: int) -> int:
+        """Delete a batch of audit events older than a date.
+
+        Parameters
+        ----------
+        before : float
+            Timestamp before which events are deleted.
+        limit : int
+            Maximum number of events deleted.
+
+        Returns
+        -------
+        int
+            The number of events deleted.
+
+        """
+        old: list[AuditEvent] = sorted(
+            (event for event in self._audit_log if event.created_at < before),
+            key=lambda event: event.created_at,
+        )[:limit]
+        deleted: set[int] = {id(event) for event in old}
+        self._audit_log = [
+            event for event in self._audit_log if id(event) not in deleted
+        ]
+
+        return len(old)
+
+    def save_usage(self, counts: list[UsageCount]) -> None:
+        """Add command uses to the hourly rollup.
+
+        Parameters
+        ----------
+        counts : list of UsageCount
+            The uses by hour, command and category.
+
+        """
+        for usage in counts:
+            self._usage_hourly[
+                (usage.period, usage.command, usage.category)
+            ] += usage.count
+
+    def fetch_usage(self, since: float) -> list[UsageCount]:
+        """Fetch the hourly and daily command uses since a date.
+
+        Parameters
+        ----------
+        since : float
+            Timestamp from which uses are fetched. Days are fetched
+            whole.
+
+        Returns
+        -------
+        list of UsageCount
+            The uses by hour or day, command and category.
+
+        """
+        return [
+            UsageCount(*key, count)
+            for key, count in self._usage_hourly.items()
+            if key[0] >= since
+        ] + [
+            UsageCount(*key, count)
+            for key, count in self._usage_daily.items()
+            if key[0] >= since - since % 86400
+        ]
+
+    def roll_up_usage(self, before: float) -> int:
+        """Merge the hourly uses older than a date into the daily rollup.
+
+        Parameters
+        ----------
+        before : float
+            Timestamp before which hourly uses are merged.
+
+        Returns
+        -------
+        int
+            The number of hourly rows merged.
+
+        """
+        old: list[tuple[int, str, str]] = [
+            key for key in self._usage_hourly if key[0] < before
+        ]
+
+        for period, command, category in old:
+            self._usage_daily[
+                (period - period % 86400, command, category)
+            ] += self._usage_hourly.pop((period, command, category))
+
+        return len(old)
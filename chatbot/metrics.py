@@ -0,0 +1,31 @@
+"""In-process metrics."""
+
+from collections import Counter
+
+METRICS: Counter[str] = Counter()
+
+
+def increment_metric(name: str, value: int = 1) -> None:
+    """Increment a counter.
+
+    Parameters
+    ----------
+    name : str
+        The metric name.
+    value : int, default=1
+        The amount to add.
+
+    """
+    METRICS[name] += value
+
+
+def get_metrics() -> dict[str, int]:
+    """Return a snapshot of all counters.
+
+    Returns
+    -------
+    dict
+        The metric names mapped to their values.
+
+    """
+    return dict(METRICS)
@@ -0,0 +1,142 @@
+"""Startup profiling helpers."""
+
+from datetime import datetime
+from importlib import import_module
+from json import dumps
+from pathlib import Path
+from time import perf_counter
+
+from chatbot import STARTED_AT, __version__
+
+from .logger import programLogger
+
+
+class StartupProfile:
+    """Class measuring where startup time goes.
+
+    Attributes
+    ----------
+    output_path : str or None
+        Path to the file the report is appended to. If None, the profile
+        is disabled.
+    phases : list of tuple
+        The phase names with their duration in seconds.
+    ready : bool
+        Whether the bot was reported ready.
+
+    Methods
+    -------
+    mark(phase)
+        Record the time spent since the previous phase.
+    time_import(module_name)
+        Import a module and record how long it took.
+    finish()
+        Record time-to-ready, log the report and save it.
+
+    """
+
+    def __init__(self, output_path: str | None) -> None:
+        """Start the profile from the package import.
+
+        Parameters
+        ----------
+        output_path : str or None
+            Path to the file the report is appended to. If None, the
+            profile is disabled.
+
+        """
+        self.output_path: str | None = output_path
+        self.phases: list[tuple[str, float]] = []
+        self.ready: bool = False
+        self._last: float = STARTED_AT
+
+    def mark(self, phase: str) -> None:
+        """Record the time spent since the previous phase.
+
+        Parameters
+        ----------
+        phase : str
+            The phase name.
+
+        """
+        if not self.enabled:
+            return
+
+        now: float = perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def time_import(self, module_name: str) -> None:
+        """Import a module and record how long it took.
+
+        Modules already imported are recorded with a null duration.
+
+        Parameters
+        ----------
+        module_name : str
+            The absolute module name.
+
+        """
+        if not self.enabled:
+            return
+
+        start: float = perf_counter()
+        import_module(module_name)
+        self._last = perf_counter()
+        self.phases.append((f"import {module_name}", self._last - start))
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the phases are recorded."""
+        return self.output_path is not None
+
+    def finish(self) -> None:
+        """Record time-to-ready, log the report and save it.
+
+        The report is appended as a JSON line so successive runs can be
+        compared.
+
+        """
+        if not self.output_path or self.ready:
+            return
+
+        self.mark("gateway connection")
+        self.ready = True
+        time_to_ready: float = perf_counter() - STARTED_AT
+        phases: dict[str, float] = {}
+
+        for phase, duration in self.phases:
+            phases[phase] = round(phases.get(phase, 0.0) + duration, 6)
+
+        report: str = "\n".join(
+            f"  {phase:<32} {duration * 1000:>10.1f} ms"
+            for phase, duration in phases.items()
+        )
+        programLogger.notice(
+            f"Startup profile (time-to-ready: {time_to_ready:.3f} s):\n"
+            f"{report}"
+        )
+
+        logfile: Path = Path(self.output_path)
+
+        try:
+            if not logfile.parent.exists():
+                logfile.parent.mkdir(parents=True)
+
+            with logfile.open(mode="a") as file_handle:
+                file_handle.write(
+                    dumps(
+                        {
+                            "timestamp": datetime.now().isoformat(),
+                            "version": __version__,
+                            "time_to_ready": round(time_to_ready, 6),
+                            "phases": phases,
+                        }
+                    )
+                    + "\n"
+                )
+
+        except (FileNotFoundError, OSError, PermissionError) as err:
+            programLogger.error(
+                f"Failed to write startup profile to '{logfile}': {err}"
+            )
@@ -0,0 +1,626 @@
+"""Storage interface of the resources catalog."""
+
+from abc import ABC, abstractmethod
+from typing import Iterator
+
+from .classes import (
+    AuditEvent,
+    CatalogEntry,
+    ExportRow,
+    Pin,
+    ResourceLink,
+    ResourceRequest,
+    UrlMetadata,
+    UsageCount,
+)
+from .search import index_resource, index_tag, index_title
+
+# Number of consecutive failed checks after which a link is dead.
+DEAD_LINK_FAILURES: int = 3
+
+
+class ResourceRepository(ABC):
+    """Class defining the interface of a resources catalog storage.
+
+    Methods
+    -------
+    start()
+        Start the background tasks of the storage.
+    close()
+        Flush pending writes and release the storage.
+    ping()
+        Check that the storage answers queries.
+    add_categories(values)
+        Add the categories missing from the storage.
+    create_resource(url, categories, tags)
+        Insert a new resource or add categories and tags to it.
+    create_resources(requests)
+        Insert resources, in a single transaction if supported.
+    fetch_resource(url)
+        Fetch resource by URL.
+    fetch_all_resources()
+        Fetch all resources by category.
+    fetch_resources(categories, tags, match_all)
+        Fetch resources matching any or all categories and tags.
+    fetch_catalog()
+        Fetch every resource with its categories, tags and checks.
+    iter_resources(categories, tags, match_all)
+        Iterate over the resources to export, one at a time.
+    fetch_new_resources(since, until, limit)
+        Fetch the resources created during a period.
+    fetch_all_url_metadata()
+        Fetch the metadata of every URL.
+    fetch_urls_to_enrich(fetched_before)
+        Fetch the URLs without metadata or with outdated metadata.
+    fetch_url_metadata(url)
+        Fetch the cached metadata of a URL.
+    save_url_metadata(metadata)
+        Insert or replace the metadata of a URL.
+    fetch_urls_to_check(checked_before, limit)
+        Fetch the URLs checked the longest time ago.
+    save_link_check(url, status, alive, checked_at)
+        Record the result of a link check.
+    save_pin(pin)
+        Insert or replace a pinned message.
+    delete_pin(channel_id, message_id)
+        Remove an unpinned message.
+    fetch_pins(channel_id)
+        Fetch the pinned messages of a channel or of every channel.
+    replace_pins(channel_id, pins)
+        Replace the pinned messages of a channel.
+    save_audit_events(events)
+        Append events to the audit log.
+    fetch_audit_events(since, user_id, action, limit)
+        Fetch the most recent audit events matching filters.
+    delete_audit_events(before, limit)
+        Delete a batch of audit events older than a date.
+    save_usage(counts)
+        Add command uses to the hourly rollup.
+    fetch_usage(since)
+        Fetch the hourly and daily command uses since a date.
+    roll_up_usage(before)
+        Merge the hourly uses older than a date into the daily rollup.
+
+    """
+
+    def start(self) -> None:
+        """Start the background tasks of the storage."""
+
+    async def close(self) -> None:
+        """Flush pending writes and release the storage."""
+
+    @abstractmethod
+    def ping(self) -> float | None:
+        """Check that the storage answers queries.
+
+        Returns
+        -------
+        float or None
+            The query duration in seconds if the storage answered.
+            Otherwise, None.
+
+        """
+
+    @abstractmethod
+    def add_categories(self, values: list[str]) -> None:
+        """Add the categories missing from the storage.
+
+        Parameters
+        ----------
+        values : list of str
+            The category values.
+
+        """
+
+    @abstractmethod
+    def create_resource(
+        self, url: str, categories: list[str], tags: list[str] | None = None
+    ) -> int | None:
+        """Insert a new resource or add categories and tags to it.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        categories : list of str
+            The category names.
+        tags : list of str or None, default=None
+            The tag names.
+
+        Returns
+        -------
+        int or None
+            The resource ID if object was created or updated. Otherwise,
+            None.
+
+        Raises
+        ------
+        ValueError
+            If resource already exists with these categories and tags.
+
+        """
+
+    def create_resources(
+        self, requests: list[ResourceRequest]
+    ) -> list[int | ValueError | None]:
+        """Insert resources, in a single transaction if supported.
+
+        Parameters
+        ----------
+        requests : list of ResourceRequest
+            The resources to create or update.
+
+        Returns
+        -------
+        list
+            For each request, the resource ID if object was created or
+            updated, a ValueError if it already exists with these
+            categories and tags, or None if it failed.
+
+        """
+        results: list[int | ValueError | None] = []
+
+        for request in requests:
+            try:
+                results.append(
+                    self.create_resource(
+                        request.url, request.categories, request.tags
+                    )
+                )
+
+            except ValueError as err:
+                results.append(err)
+
+        return results
+
+    @abstractmethod
+    def fetch_resource(self, url: str) -> int | None:
+        """Fetch resource by URL.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+
+        Returns
+        -------
+        int or None
+            The ID if object was found. Otherwise, None.
+
+        """
+
+    @abstractmethod
+    def fetch_all_resources(self) -> dict[str, list[ResourceLink]]:
+        """Fetch all resources by category.
+
+        Returns
+        -------
+        dict
+            The category names to the links.
+
+        """
+
+    @abstractmethod
+    def fetch_resources(
+        self,
+        categories: list[str],
+        tags: list[str] | None = None,
+        match_all: bool = False,
+    ) -> list[ResourceLink]:
+        """Fetch resources matching any or all categories and tags.
+
+        Parameters
+        ----------
+        categories : list of str
+            The category names.
+        tags : list of str or None, default=None
+            The tag names.
+        match_all : bool, default=False
+            If True, the resources must match every category and tag.
+            Otherwise, any of them.
+
+        Returns
+        -------
+        list of ResourceLink
+            The links.
+
+        """
+
+    @abstractmethod
+    def fetch_catalog(self) -> list[CatalogEntry]:
+        """Fetch every resource with its categories, tags and checks.
+
+        Returns
+        -------
+        list of CatalogEntry
+            The resources, by ID.
+
+        """
+
+    @abstractmethod
+    def iter_resources(
+        self,
+        categories: list[str] | None = None,
+        tags: list[str] | None = None,
+        match_all: bool = False,
+    ) -> Iterator[ExportRow]:
+        """Iterate over the resources to export, one at a time.
+
+        Parameters
+        ----------
+        categories : list of str or None, default=None
+            The category names.
+        tags : list of str or None, default=None
+            The tag names.
+        match_all : bool, default=False
+            If True, the resources must match every category and tag.
+            Otherwise, any of them.
+
+        Yields
+        ------
+        ExportRow
+            The resources matching the filters, every resource if there
+            are none, by ID.
+
+        """
+
+    @abstractmethod
+    def fetch_new_resources(
+        self, since: float, until: float, limit: int
+    ) -> list[ExportRow]:
+        """Fetch the resources created during a period.
+
+        Parameters
+        ----------
+        since : float
+            Timestamp after which the resources were created.
+        until : float
+            Timestamp until which the resources were created, included.
+        limit : int
+            Maximum number of resources.
+
+        Returns
+        -------
+        list of ExportRow
+            The oldest resources of the period first.
+
+        """
+
+    @abstractmethod
+    def fetch_all_url_metadata(self) -> list[UrlMetadata]:
+        """Fetch the metadata of every URL.
+
+        Returns
+        -------
+        list of UrlMetadata
+            The metadata.
+
+        """
+
+    @abstractmethod
+    def fetch_urls_to_enrich(self, fetched_before: float) -> list[str]:
+        """Fetch the URLs without metadata or with outdated metadata.
+
+        Parameters
+        ----------
+        fetched_before : float
+            Timestamp before which metadata is outdated.
+
+        Returns
+        -------
+        list of str
+            The URLs, never fetched first.
+
+        """
+
+    @abstractmethod
+    def fetch_url_metadata(self, url: str) -> UrlMetadata | None:
+        """Fetch the cached metadata of a URL.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+
+        Returns
+        -------
+        UrlMetadata or None
+            The metadata if the URL was already fetched.
+
+        """
+
+    @abstractmethod
+    def save_url_metadata(self, metadata: UrlMetadata) -> None:
+        """Insert or replace the metadata of a URL.
+
+        Parameters
+        ----------
+        metadata : UrlMetadata
+            The metadata.
+
+        """
+
+    @abstractmethod
+    def fetch_urls_to_check(
+        self, checked_before: float, limit: int
+    ) -> list[str]:
+        """Fetch the URLs checked the longest time ago.
+
+        Parameters
+        ----------
+        checked_before : float
+            Timestamp after which a check is recent enough.
+        limit : int
+            Maximum number of URLs.
+
+        Returns
+        -------
+        list of str
+            The URLs, never checked first.
+
+        """
+
+    @abstractmethod
+    def save_link_check(
+        self, url: str, status: int | None, alive: bool, checked_at: float
+    ) -> None:
+        """Record the result of a link check.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        status : int or None
+            The HTTP status, or None if the request failed.
+        alive : bool
+            Whether the link works.
+        checked_at : float
+            Timestamp of the check.
+
+        """
+
+    @abstractmethod
+    def save_pin(self, pin: Pin) -> None:
+        """Insert or replace a pinned message.
+
+        Parameters
+        ----------
+        pin : Pin
+            The pinned message.
+
+        """
+
+    @abstractmethod
+    def delete_pin(self, channel_id: int, message_id: int) -> None:
+        """Remove an unpinned message.
+
+        Parameters
+        ----------
+        channel_id : int
+            The channel ID.
+        message_id : int
+            The message ID.
+
+        """
+
+    @abstractmethod
+    def fetch_pins(self, channel_id: int | None = None) -> list[Pin]:
+        """Fetch the pinned messages of a channel or of every channel.
+
+        Parameters
+        ----------
+        channel_id : int or None, default=None
+            The channel ID. If None, the pins of every channel.
+
+        Returns
+        -------
+        list of Pin
+            The pinned messages, most recent first.
+
+        """
+
+    @abstractmethod
+    def replace_pins(self, channel_id: int, pins: list[Pin]) -> None:
+        """Replace the pinned messages of a channel.
+
+        Parameters
+        ----------
+        channel_id : int
+            The channel ID.
+        pins : list of Pin
+            The messages currently pinned in the channel.
+
+        """
+
+    @abstractmethod
+    def save_audit_events(self, events: list[AuditEvent]) -> None:
+        """Append events to the audit log.
+
+        Parameters
+        ----------
+        events : list of AuditEvent
+            The events, in order.
+
+        """
+
+    @abstractmethod
+    def fetch_audit_events(
+        self,
+        since: float,
+        user_id: int | None = None,
+        action: str | None = None,
+        limit: int = 100,
+    ) -> list[AuditEvent]:
+        """Fetch the most recent audit events matching filters.
+
+        Parameters
+        ----------
+        since : float
+            Timestamp from which events are fetched.
+        user_id : int or None, default=None
+            If not None, the ID of the user who acted.
+        action : str or None, default=None
+            If not None, the action name.
+        limit : int, default=100
+            Maximum number of events.
+
+        Returns
+        -------
+        list of AuditEvent
+            The events, most recent first.
+
+        """
+
+    @abstractmethod
+    def delete_audit_events(self, before: float, limit: int) -> int:
+        """Delete a batch of audit events older than a date.
+
+        Parameters
+        ----------
+        before : float
+            Timestamp before which events are deleted.
+        limit : int
+            Maximum number of events deleted.
+
+        Returns
+        -------
+        int
+            The number of events deleted.
+
+        """
+
+    @abstractmethod
+    def save_usage(self, counts: list[UsageCount]) -> None:
+        """Add command uses to the hourly rollup.
+
+        Parameters
+        ----------
+        counts : list of UsageCount
+            The uses by hour, command and category.
+
+        """
+
+    @abstractmethod
+    def fetch_usage(self, since: float) -> list[UsageCount]:
+        """Fetch the hourly and daily command uses since a date.
+
+        Parameters
+        ----------
+        since : float
+            Timestamp from which uses are fetched. Days are fetched
+            whole.
+
+        Returns
+        -------
+        list of UsageCount
+            The uses by hour or day, command and category.
+
+        """
+
+    @abstractmethod
+    def roll_up_usage(self, before: float) -> int:
+        """Merge the hourly uses older than a date into the daily rollup.
+
+        Parameters
+        ----------
+        before : float
+            Timestamp before which hourly uses are merged.
+
+        Returns
+        -------
+        int
+            The number of hourly rows merged.
+
+        """
+
+
+REPOSITORY: ResourceRepository | None = None
+
+
+def set_repository(repository: ResourceRepository) -> None:
+    """Set the storage used by the bot and index its catalog.
+
+    Parameters
+    ----------
+    repository : ResourceRepository
+        The storage.
+
+    """
+    global REPOSITORY
+    REPOSITORY = repository
+
+    for entry in repository.fetch_catalog():
+        index_resource(entry.url)
+
+        for tag in entry.tags:
+            index_tag(tag)
+
+    for metadata in repository.fetch_all_url_metadata():
+        if metadata.title:
+            index_title(metadata.url, metadata.title)
+
+
+def get_repository() -> ResourceRepository:
+    """Return the storage used by the bot.
+
+    Returns
+    -------
+    ResourceRepository
+        The storage.
+
+    Raises
+    ------
+    RuntimeError
+        If no storage was set.
+
+    """
+    if REPOSITORY is None:
+        raise RuntimeError("Storage is not initialized.")
+
+    return REPOSITORY
+
+
+def create_repository(backend: str, database_path: str) -> ResourceRepository:
+    """Create a storage backend.
+
+    Parameters
+    ----------
+    backend : {'sqlite', 'memory', 'tiered'}
+        The backend name. 'tiered' serves the catalog from memory and
+        persists writes to SQLite in the background, journaled in a file
+        next to the database.
+    database_path : str
+        Path to the SQLite database file.
+
+    Returns
+    -------
+    ResourceRepository
+        The storage.
+
+    Raises
+    ------
+    ValueError
+        If the backend is unknown.
+
+    """
+    # Imported here so that only the selected backend is loaded.
+    if backend == "sqlite":
+        from .database import SqliteRepository
+
+        return SqliteRepository(database_path)
+
+    if backend == "memory":
+        from .memory_repository import MemoryRepository
+
+        return MemoryRepository()
+
+    if backend == "tiered":
+        from .database import SqliteRepository
+        from .tiered_repository import JOURNAL_SUFFIX, TieredRepository
+
+        return TieredRepository(
+            SqliteRepository(database_path, raise_write_errors=True),
+            f"{database_path}{JOURNAL_SUFFIX}",
+        )
+
+    raise ValueError(f"Unknown storage backend '{backend}'.")
@@ -0,0 +1,267 @@
+"""In-memory prefix indexes for autocompletion."""
+
+from bisect import bisect_left, insort
+
+from .classes import CATEGORIES
+from .similarity import DUPLICATE_INDEX
+
+# Maximum number of choices Discord accepts for an autocompletion.
+MAX_CHOICES: int = 25
+# Maximum number of path segments indexed for each URL.
+MAX_URL_SEGMENTS: int = 4
+
+
+def normalize(text: str) -> str:
+    """Normalize text typed by a user or stored as key.
+
+    Parameters
+    ----------
+    text : str
+        The text.
+
+    Returns
+    -------
+    str
+        The lowercase text without URL scheme nor 'www.' prefix.
+
+    """
+    text = text.strip().lower()
+
+    for prefix in ("https://", "http://", "www."):
+        text = text.removeprefix(prefix)
+
+    return text
+
+
+def url_keys(url: str) -> list[str]:
+    """Return the keys a URL can be found with.
+
+    The URL is found from its host or from one of its first path segments
+    so that typing 'heap' finds 'https://example.com/pwn/heap'.
+
+    Parameters
+    ----------
+    url : str
+        The URL.
+
+    Returns
+    -------
+    list of str
+        The normalized keys.
+
+    """
+    key: str = normalize(url)
+    segments: list[str] = key.split("/")
+    keys: list[str] = [key]
+
+    for idx in range(1, min(len(segments), MAX_URL_SEGMENTS + 1)):
+        if segments[idx]:
+            keys.append("/".join(segments[idx:]))
+
+    return keys
+
+
+class PrefixIndex:
+    """Class defining a sorted array of keys searched by prefix.
+
+    Lookups are a binary search followed by a scan of the matching range,
+    so no autocompletion touches the database.
+
+    Methods
+    -------
+    clear()
+        Remove every key.
+    add(key, value)
+        Index a value under a key.
+    search(prefix, limit)
+        Return the values whose key starts with prefix.
+
+    """
+
+    def __init__(self) -> None:
+        """Create an empty index."""
+        self._entries: list[tuple[str, str]] = []
+
+    def __len__(self) -> int:
+        """Return the number of keys."""
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Remove every key."""
+        self._entries.clear()
+
+    def add(self, key: str, value: str) -> None:
+        """Index a value under a key.
+
+        Parameters
+        ----------
+        key : str
+            The normalized key.
+        value : str
+            The value returned by searches.
+
+        """
+        entry: tuple[str, str] = (key, value)
+        idx: int = bisect_left(self._entries, entry)
+
+        if idx < len(self._entries) and self._entries[idx] == entry:
+            return
+
+        insort(self._entries, entry)
+
+    def search(self, prefix: str, limit: int = MAX_CHOICES) -> list[str]:
+        """Return the values whose key starts with prefix.
+
+        Parameters
+        ----------
+        prefix : str
+            The text typed by the user.
+        limit : int, default=MAX_CHOICES
+            The maximum number of values.
+
+        Returns
+        -------
+        list of str
+            The unique values, sorted by key.
+
+        """
+        prefix = normalize(prefix)
+        values: dict[str, None] = {}
+        idx: int = bisect_left(self._entries, (prefix, ""))
+
+        while idx < len(self._entries) and len(values) < limit:
+            key, value = self._entries[idx]
+
+            if not key.startswith(prefix):
+                break
+
+            values[value] = None
+            idx += 1
+
+        return list(values)
+
+
+CATEGORY_INDEX = PrefixIndex()
+RESOURCE_INDEX = PrefixIndex()
+TAG_INDEX = PrefixIndex()
+# Index updates made since they were last taken, or None if they aren't
+# recorded. Workers record them so that the gateway relays them to the
+# other workers.
+INDEX_UPDATES: list[list[str]] | None = None
+
+
+def index_categories() -> None:
+    """Make the categories searchable by name and value."""
+    CATEGORY_INDEX.clear()
+
+    for category in CATEGORIES:
+        CATEGORY_INDEX.add(normalize(category.name), category.value)
+        CATEGORY_INDEX.add(normalize(category.value), category.value)
+
+
+def index_resource(url: str) -> None:
+    """Make a resource's URL searchable and comparable to new links.
+
+    Parameters
+    ----------
+    url : str
+        The URL.
+
+    """
+    for key in url_keys(url):
+        RESOURCE_INDEX.add(key, url)
+
+    DUPLICATE_INDEX.add(url)
+
+    if INDEX_UPDATES is not None:
+        INDEX_UPDATES.append(["resource", url])
+
+
+def index_title(url: str, title: str) -> None:
+    """Make a resource's URL searchable by its page title.
+
+    Parameters
+    ----------
+    url : str
+        The URL.
+    title : str
+        The page title.
+
+    """
+    RESOURCE_INDEX.add(normalize(title), url)
+    DUPLICATE_INDEX.add(url, title)
+
+    if INDEX_UPDATES is not None:
+        INDEX_UPDATES.append(["title", url, title])
+
+
+def index_tag(tag: str) -> None:
+    """Make a tag searchable.
+
+    Parameters
+    ----------
+    tag : str
+        The normalized tag name.
+
+    """
+    TAG_INDEX.add(tag, tag)
+
+    if INDEX_UPDATES is not None:
+        INDEX_UPDATES.append(["tag", tag])
+
+
+def record_updates() -> None:
+    """Start recording the index updates to relay them to other processes."""
+    global INDEX_UPDATES
+    INDEX_UPDATES = []
+
+
+def take_updates() -> list[list[str]]:
+    """Return and forget the index updates recorded.
+
+    Returns
+    -------
+    list of list of str
+        The updates in order: ['resource', url], ['title', url, title] or
+        ['tag', tag].
+
+    """
+    global INDEX_UPDATES
+    updates: list[list[str]] = INDEX_UPDATES or []
+
+    if INDEX_UPDATES is not None:
+        INDEX_UPDATES = []
+
+    return updates
+
+
+def apply_updates(updates: list[list[str]]) -> None:
+    """Apply the index updates recorded by another process.
+
+    They aren't recorded again, so that they are relayed only once.
+    Applying an update twice has no effect.
+
+    Parameters
+    ----------
+    updates : list of list of str
+        The updates, as returned by take_updates().
+
+    """
+    global INDEX_UPDATES
+    recorded: list[list[str]] | None = INDEX_UPDATES
+    INDEX_UPDATES = None
+
+    try:
+        for kind, *values in updates:
+            if kind == "resource":
+                index_resource(*values)
+            elif kind == "title":
+                index_title(*values)
+            elif kind == "tag":
+                index_tag(*values)
+
+    finally:
+        INDEX_UPDATES = recorded
+
+
+index_categories()
@@ -0,0 +1,84 @@
+"""Graceful shutdown of the bot."""
+
+from asyncio import Event, TimeoutError, wait_for
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+# Seconds given to the work in progress to finish, within the 10 seconds
+# Docker waits after SIGTERM before killing the container.
+SHUTDOWN_TIMEOUT: float = 8.0
+
+
+class WorkTracker:
+    """Class counting the work in progress to wait for it on shutdown.
+
+    Attributes
+    ----------
+    accepting : bool
+        Whether new work may start.
+
+    Methods
+    -------
+    track()
+        Count a piece of work while it runs.
+    stop_accepting()
+        Refuse new work.
+    wait_idle(timeout)
+        Wait for the work in progress to finish.
+
+    """
+
+    def __init__(self) -> None:
+        """Start with no work in progress."""
+        self.accepting: bool = True
+        self._count: int = 0
+        self._idle = Event()
+        self._idle.set()
+
+    def __len__(self) -> int:
+        """Return the number of pieces of work in progress."""
+        return self._count
+
+    @asynccontextmanager
+    async def track(self) -> AsyncIterator[None]:
+        """Count a piece of work while it runs."""
+        self._count += 1
+        self._idle.clear()
+
+        try:
+            yield
+
+        finally:
+            self._count -= 1
+
+            if not self._count:
+                self._idle.set()
+
+    def stop_accepting(self) -> None:
+        """Refuse new work."""
+        self.accepting = False
+
+    async def wait_idle(self, timeout: float) -> bool:
+        """Wait for the work in progress to finish.
+
+        Parameters
+        ----------
+        timeout : float
+            Maximum number of seconds to wait.
+
+        Returns
+        -------
+        bool
+            Whether all work finished in time.
+
+        """
+        try:
+            await wait_for(self._idle.wait(), timeout)
+
+        except TimeoutError:
+            return False
+
+        return True
+
+
+WORK = WorkTracker()
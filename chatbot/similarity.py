@@ -0,0 +1,349 @@
+"""In-memory near-duplicate index of resources' URLs."""
+
+from hashlib import blake2b
+from itertools import combinations
+from random import Random
+from re import compile
+from urllib.parse import urlsplit
+
+# Number of hash functions in a signature.
+NUM_HASHES: int = 64
+# Number of hashes per LSH band. With 16 bands of 4 hashes, two links
+# with a similarity of 0.5 share a band with a probability of about 2/3,
+# and links with a similarity of 0.8 almost always do.
+BAND_SIZE: int = 4
+# Jaccard similarity from which two links are near-duplicates.
+SIMILARITY_THRESHOLD: float = 0.5
+# Minimum number of shingles for a URL to be compared, so that bare hosts
+# aren't all similar to each other.
+MIN_SHINGLES: int = 2
+# Maximum number of similar links returned for a link.
+MAX_SIMILAR: int = 5
+# Mersenne prime modulus of the hash functions.
+PRIME: int = (1 << 61) - 1
+# Random but fixed coefficients so that signatures are stable.
+_random = Random(0x5EED)
+COEFFICIENTS: list[tuple[int, int]] = [
+    (_random.randrange(1, PRIME), _random.randrange(PRIME))
+    for _ in range(NUM_HASHES)
+]
+TOKEN_PATTERN = compile(r"[a-z0-9]+")
+# Tokens carrying no information about the linked page.
+IGNORED_TOKENS: frozenset[str] = frozenset(
+    {"www", "http", "https", "html", "htm", "php", "index", "amp"}
+)
+
+# Slices of the signatures hashed to the LSH buckets.
+BANDS: list[slice] = [
+    slice(idx, idx + BAND_SIZE) for idx in range(0, NUM_HASHES, BAND_SIZE)
+]
+
+Signature = tuple[int, ...]
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase alphanumeric tokens.
+
+    Parameters
+    ----------
+    text : str
+        The text.
+
+    Returns
+    -------
+    list of str
+        The tokens, without tokens shorter than 3 characters and ignored
+        tokens.
+
+    """
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(text.lower())
+        if len(token) > 2 and token not in IGNORED_TOKENS
+    ]
+
+
+def url_shingles(url: str, title: str | None = None) -> set[str]:
+    """Return the shingles a URL is compared with.
+
+    The host contributes its main label only, so that mirrors stay close,
+    and the fragment and query are ignored. The path tokens are used as
+    words and adjacent pairs, so that their order matters, and the last
+    path segment as a whole, so that articles of a same section differ.
+
+    Parameters
+    ----------
+    url : str
+        The URL.
+    title : str or None, default=None
+        If not None, the page title, adding its words.
+
+    Returns
+    -------
+    set of str
+        The shingles.
+
+    """
+    parts = urlsplit(url.strip())
+    labels: list[str] = [
+        label for label in tokenize(parts.hostname or "") if len(label) > 3
+    ]
+    path: list[str] = tokenize(parts.path)
+    shingles: set[str] = set(path)
+    shingles.update(
+        f"{first} {second}" for first, second in zip(path, path[1:])
+    )
+
+    slug: str = parts.path.rstrip("/").rsplit("/", 1)[-1].lower()
+
+    if labels:
+        shingles.add(f"host:{labels[-1]}")
+
+    if slug:
+        shingles.add(f"slug:{slug}")
+
+    if title:
+        shingles.update(f"title:{token}" for token in tokenize(title))
+
+    return shingles
+
+
+def signature(shingles: frozenset[str]) -> Signature:
+    """Compute the MinHash signature of shingles.
+
+    Parameters
+    ----------
+    shingles : frozenset of str
+        The shingles, not empty.
+
+    Returns
+    -------
+    tuple of int
+        The minimum of each hash function over the shingles.
+
+    """
+    hashes: list[int] = [
+        int.from_bytes(
+            blake2b(shingle.encode(), digest_size=8).digest(), "big"
+        )
+        for shingle in shingles
+    ]
+
+    return tuple(
+        min((a * value + b) % PRIME for value in hashes)
+        for a, b in COEFFICIENTS
+    )
+
+
+def similarity(first: frozenset[str], second: frozenset[str]) -> float:
+    """Compute the Jaccard similarity of two sets of shingles.
+
+    Parameters
+    ----------
+    first, second : frozenset of str
+        The shingles.
+
+    Returns
+    -------
+    float
+        The share of common shingles, between 0 and 1.
+
+    """
+    return len(first & second) / len(first | second)
+
+
+class NearDuplicateIndex:
+    """Class defining a MinHash LSH index of URLs.
+
+    Each URL's signature is split into bands hashed to buckets, so that
+    looking up similar URLs only compares the URLs sharing a bucket
+    instead of the whole catalog. The candidates are then compared with
+    their exact similarity, which the signatures only estimate.
+
+    Methods
+    -------
+    add(url, title)
+        Index a URL or update its title.
+    similar(url, title, threshold)
+        Return the indexed URLs similar to a URL.
+    clusters(threshold)
+        Group all indexed URLs that are near-duplicates.
+
+    """
+
+    def __init__(self) -> None:
+        """Create an empty index."""
+        self._signatures: dict[str, Signature] = {}
+        self._shingles: dict[str, frozenset[str]] = {}
+        self._titles: dict[str, str | None] = {}
+        self._buckets: list[dict[Signature, set[str]]] = [{} for _ in BANDS]
+
+    def __len__(self) -> int:
+        """Return the number of URLs compared."""
+        return len(self._signatures)
+
+    @staticmethod
+    def _bands(sig: Signature) -> list[Signature]:
+        """Split a signature into its bands."""
+        return [sig[band] for band in BANDS]
+
+    def add(self, url: str, title: str | None = None) -> None:
+        """Index a URL or update its title.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        title : str or None, default=None
+            If not None, the page title.
+
+        """
+        if url in self._titles:
+            if title is None or self._titles[url] == title:
+                return
+
+            self._remove(url)
+
+        self._titles[url] = title
+        shingles: frozenset[str] = frozenset(url_shingles(url, title))
+
+        if len(shingles) < MIN_SHINGLES:
+            return
+
+        sig: Signature = signature(shingles)
+        self._signatures[url] = sig
+        self._shingles[url] = shingles
+
+        for band, bucket in zip(self._bands(sig), self._buckets):
+            bucket.setdefault(band, set()).add(url)
+
+    def _remove(self, url: str) -> None:
+        """Remove a URL's signature from the buckets."""
+        sig: Signature | None = self._signatures.pop(url, None)
+        self._shingles.pop(url, None)
+
+        if sig is None:
+            return
+
+        for band, bucket in zip(self._bands(sig), self._buckets):
+            bucket[band].discard(url)
+
+            if not bucket[band]:
+                del bucket[band]
+
+    def _candidates(self, sig: Signature) -> set[str]:
+        """Return the URLs sharing a band with a signature."""
+        candidates: set[str] = set()
+
+        for band, bucket in zip(self._bands(sig), self._buckets):
+            candidates.update(bucket.get(band, ()))
+
+        return candidates
+
+    def similar(
+        self,
+        url: str,
+        title: str | None = None,
+        threshold: float = SIMILARITY_THRESHOLD,
+    ) -> list[tuple[str, float]]:
+        """Return the indexed URLs similar to a URL.
+
+        Parameters
+        ----------
+        url : str
+            The URL, indexed or not.
+        title : str or None, default=None
+            If not None, the page title.
+        threshold : float, default=SIMILARITY_THRESHOLD
+            The minimum similarity.
+
+        Returns
+        -------
+        list of tuple
+            At most MAX_SIMILAR other URLs with their similarity, the most
+            similar first.
+
+        """
+        shingles: frozenset[str] | None = self._shingles.get(url)
+
+        if shingles is None:
+            shingles = frozenset(url_shingles(url, title))
+
+            if len(shingles) < MIN_SHINGLES:
+                return []
+
+        sig: Signature = self._signatures.get(url) or signature(shingles)
+
+        matches: list[tuple[str, float]] = []
+
+        for candidate in self._candidates(sig):
+            if candidate == url:
+                continue
+
+            score: float = similarity(shingles, self._shingles[candidate])
+
+            if score >= threshold:
+                matches.append((candidate, score))
+
+        matches.sort(key=lambda match: (-match[1], match[0]))
+
+        return matches[:MAX_SIMILAR]
+
+    def clusters(
+        self, threshold: float = SIMILARITY_THRESHOLD
+    ) -> list[list[str]]:
+        """Group all indexed URLs that are near-duplicates.
+
+        URLs are grouped transitively: if A is similar to B and B to C,
+        they form one cluster.
+
+        Parameters
+        ----------
+        threshold : float, default=SIMILARITY_THRESHOLD
+            The minimum similarity.
+
+        Returns
+        -------
+        list of list of str
+            The sorted clusters of at least two URLs, the largest first.
+
+        """
+        parents: dict[str, str] = {}
+
+        def find(url: str) -> str:
+            root: str = parents.setdefault(url, url)
+
+            while parents[root] != root:
+                root = parents[root]
+
+            while parents[url] != root:
+                parents[url], url = root, parents[url]
+
+            return root
+
+        for bucket in self._buckets:
+            for urls in bucket.values():
+                for first, second in combinations(sorted(urls), 2):
+                    if find(first) == find(second):
+                        continue
+
+                    if (
+                        similarity(
+                            self._shingles[first], self._shingles[second]
+                        )
+                        >= threshold
+                    ):
+                        parents[find(second)] = find(first)
+
+        groups: dict[str, list[str]] = {}
+
+        for url in parents:
+            groups.setdefault(find(url), []).append(url)
+
+        return sorted(
+            (sorted(group) for group in groups.values() if len(group) > 1),
+            key=lambda group: (-len(group), group),
+        )
+
+
+DUPLICATE_INDEX = NearDuplicateIndex()
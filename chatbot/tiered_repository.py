@@ -0,0 +1,826 @@
+"""Storage of the resources catalog in memory backed by a database."""
+
+from asyncio import CancelledError, Task, create_task, sleep
+from collections import deque
+from dataclasses import astuple, is_dataclass
+from json import JSONDecodeError, dumps, loads
+from os import fsync, replace
+from pathlib import Path
+from sqlite3 import OperationalError
+from typing import Any, Iterator, TextIO
+
+from .classes import (
+    AuditEvent,
+    CatalogEntry,
+    ExportRow,
+    Pin,
+    ResourceLink,
+    UrlMetadata,
+    UsageCount,
+)
+from .health import register_queue
+from .logger import programLogger
+from .memory_repository import MemoryRepository
+from .repository import ResourceRepository
+
+# Seconds between two flushes of the pending writes.
+FLUSH_INTERVAL: float = 1.0
+# Maximum seconds between two retries of a failing write.
+MAX_RETRY_DELAY: float = 60.0
+# Number of tries of a write failing with a transient error, such as a
+# locked database or a full disk, before it is parked.
+MAX_WRITE_ATTEMPTS: int = 8
+# Maximum number of parked writes kept, the oldest are dropped.
+MAX_PARKED_WRITES: int = 1000
+# Suffix added to the database path for the journal of pending writes.
+JOURNAL_SUFFIX: str = "-writes.jsonl"
+
+# A write: the name of the storage method and its arguments.
+Write = tuple[str, tuple[Any, ...]]
+
+
+def encode_write(write: Write) -> str:
+    """Serialize a write to a journal line.
+
+    Parameters
+    ----------
+    write : tuple
+        The storage method name and its arguments.
+
+    Returns
+    -------
+    str
+        The JSON line.
+
+    """
+
+    def to_json(value: Any) -> Any:
+        if is_dataclass(value) and not isinstance(value, type):
+            return list(astuple(value))
+
+        if isinstance(value, (list, tuple)):
+            return [to_json(item) for item in value]
+
+        return value
+
+    name, args = write
+
+    return dumps([name, to_json(args)]) + "\n"
+
+
+def decode_write(line: str) -> Write:
+    """Deserialize a journal line to a write.
+
+    Parameters
+    ----------
+    line : str
+        The JSON line.
+
+    Returns
+    -------
+    tuple
+        The storage method name and its arguments.
+
+    Raises
+    ------
+    ValueError
+        If the line isn't a valid write, e.g. cut by a crash.
+
+    """
+    try:
+        name, args = loads(line)
+
+        if name == "save_url_metadata":
+            return name, (UrlMetadata(*args[0]),)
+
+        if name == "save_pin":
+            return name, (Pin(*args[0]),)
+
+        if name == "replace_pins":
+            return name, (args[0], [Pin(*pin) for pin in args[1]])
+
+        if name == "save_audit_events":
+            return name, ([AuditEvent(*event) for event in args[0]],)
+
+        if name == "save_usage":
+            return name, ([UsageCount(*count) for count in args[0]],)
+
+        return name, tuple(args)
+
+    except (JSONDecodeError, TypeError, IndexError) as err:
+        raise ValueError(f"Invalid journal line: {err}") from err
+
+
+class TieredRepository(ResourceRepository):
+    """Class serving the catalog from memory and persisting it behind.
+
+    The catalog is loaded in memory at startup: reads never touch the
+    disk. Writes are applied in memory and appended to a journal file
+    first, then replayed on the persistent storage in order by a
+    background task, at most FLUSH_INTERVAL seconds later. The journal
+    is emptied once its writes are stored, and the writes left in it by
+    a crash or a kill are applied again at startup: a write is lost only
+    if the machine stops before the system writes the journal to disk. A
+    write may be replayed twice after a crash during a flush. A write
+    failing with a transient error stays first and is retried with a
+    growing delay, so that later writes aren't applied before it. Writes
+    failing for good, or too many times, are logged and parked. The
+    audit log and the usage rollups aren't kept in memory: they are only
+    read by moderators, from the persistent storage.
+
+    Attributes
+    ----------
+    store : ResourceRepository
+        The persistent storage.
+    cache : MemoryRepository
+        The in-memory copy of the catalog.
+    parked : collections.deque
+        The writes the persistent storage refused, for inspection.
+
+    Methods
+    -------
+    flush(retry)
+        Replay the pending writes on the persistent storage.
+
+    """
+
+    def __init__(
+        self, store: ResourceRepository, journal_path: str | None = None
+    ) -> None:
+        """Load the catalog of the persistent storage in memory.
+
+        The writes left in the journal are applied again.
+
+        Parameters
+        ----------
+        store : ResourceRepository
+            The persistent storage.
+        journal_path : str or None, default=None
+            Path to the journal file of the pending writes. If None, they
+            are only kept in memory.
+
+        """
+        self.store: ResourceRepository = store
+        self.cache = MemoryRepository()
+        self.cache.load(
+            store.fetch_catalog(),
+            store.fetch_all_url_metadata(),
+            store.fetch_pins(),
+        )
+        self._pending: deque[Write] = deque()
+        self.parked: deque[Write] = deque(maxlen=MAX_PARKED_WRITES)
+        self._attempts: int = 0
+        self._task: Task[None] | None = None
+        self._journal_path: Path | None = (
+            Path(journal_path) if journal_path else None
+        )
+        self._journal: TextIO | None = None
+
+        if self._journal_path:
+            self._replay_journal(self._journal_path)
+
+    def _replay_journal(self, path: Path) -> None:
+        """Apply again the writes left in a journal file."""
+        writes: list[Write] = []
+
+        try:
+            lines: list[str] = path.read_text().splitlines()
+
+        except FileNotFoundError:
+            lines = []
+
+        for line in lines:
+            try:
+                writes.append(decode_write(line))
+
+            except ValueError as err:
+                programLogger.warning(f"Skipped journal write: {err}")
+
+        if writes:
+            programLogger.notice(f"Replaying {len(writes)} journal writes.")
+
+        for name, args in writes:
+            try:
+                getattr(self, name)(*args)
+
+            except ValueError:
+                # Already stored before the crash.
+                pass
+
+        # The journal is replaced once the writes are queued again, so
+        # that a crash while replaying them loses none.
+        self._write_journal()
+
+    def _write_journal(self) -> None:
+        """Replace the journal file with the pending writes."""
+        if self._journal_path is None:
+            return
+
+        if self._journal:
+            self._journal.close()
+
+        tmp_path: Path = self._journal_path.with_name(
+            f"{self._journal_path.name}.tmp"
+        )
+
+        with tmp_path.open("w") as file_handle:
+            file_handle.writelines(
+                encode_write(write) for write in self._pending
+            )
+            file_handle.flush()
+            fsync(file_handle.fileno())
+
+        replace(tmp_path, self._journal_path)
+        self._journal = self._journal_path.open("a")
+
+    def _queue(self, name: str, *args: Any) -> None:
+        """Queue a write of the persistent storage and journal it.
+
+        Parameters
+        ----------
+        name : str
+            The storage method name.
+        *args
+            The method arguments.
+
+        """
+        write: Write = (name, args)
+        self._pending.append(write)
+
+        if self._journal:
+            self._journal.write(encode_write(write))
+            self._journal.flush()
+
+    def start(self) -> None:
+        """Start flushing the pending writes in the background."""
+        self._task = create_task(self._run(), name="write-behind")
+        register_queue("write_behind", lambda: len(self._pending))
+        register_queue("write_behind_parked", lambda: len(self.parked))
+
+    async def close(self) -> None:
+        """Flush the pending writes and close the persistent storage.
+
+        Writes failing with a transient error are kept in the journal, if
+        any, to be applied again at the next start.
+
+        """
+        if self._task:
+            self._task.cancel()
+
+        self._task = None
+
+        try:
+            self.flush(retry=self._journal is not None)
+
+        except OperationalError as err:
+            programLogger.warning(
+                f"Kept {len(self._pending)} writes in the journal: {err}"
+            )
+
+        if self._journal:
+            self._journal.close()
+
+        self._journal = None
+        await self.store.close()
+
+    async def _run(self) -> None:
+        """Flush the pending writes periodically, backing off on errors."""
+        delay: float = FLUSH_INTERVAL
+
+        while True:
+            await sleep(delay)
+
+            try:
+                self.flush()
+                delay = FLUSH_INTERVAL
+
+            except CancelledError:
+                raise
+
+            except OperationalError as err:
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+                programLogger.warning(
+                    f"Failed flushing writes, retrying in {delay:.0f} s: "
+                    f"{err}"
+                )
+
+            except Exception as err:
+                programLogger.error(f"Failed flushing writes: {err}")
+
+    def _park(self, write: Write, err: Exception) -> None:
+        """Set aside a write the persistent storage refused."""
+        programLogger.error(f"Parked write {write[0]}: {err!r}")
+        self.parked.append(write)
+
+    def flush(self, retry: bool = True) -> int:
+        """Replay the pending writes on the persistent storage.
+
+        Parameters
+        ----------
+        retry : bool, default=True
+            Whether a write failing with a transient error is kept to be
+            retried. Otherwise, it is parked.
+
+        Returns
+        -------
+        int
+            The number of writes replayed or parked.
+
+        Raises
+        ------
+        sqlite3.OperationalError
+            If the first write failed with a transient error, it is kept.
+
+        """
+        count: int = 0
+
+        try:
+            while self._pending:
+                write: Write = self._pending[0]
+                name, args = write
+
+                try:
+                    getattr(self.store, name)(*args)
+
+                except ValueError:
+                    # Already stored, e.g. written before a restart.
+                    pass
+
+                except OperationalError as err:
+                    self._attempts += 1
+
+                    if retry and self._attempts < MAX_WRITE_ATTEMPTS:
+                        raise
+
+                    self._park(write, err)
+
+                except Exception as err:
+                    self._park(write, err)
+
+                self._attempts = 0
+                self._pending.popleft()
+                count += 1
+
+        finally:
+            if count:
+                self._trim_journal()
+
+        return count
+
+    def _trim_journal(self) -> None:
+        """Remove the stored writes from the journal."""
+        if self._journal is None:
+            return
+
+        if self._pending:
+            self._write_journal()
+        else:
+            self._journal.truncate(0)
+
+    def _flush_before_read(self) -> None:
+        """Flush the pending writes, or read without them if it fails."""
+        try:
+            self.flush()
+
+        except OperationalError as err:
+            programLogger.warning(f"Reading before pending writes: {err}")
+
+    def ping(self) -> float | None:
+        """Check that the persistent storage answers queries.
+
+        Returns
+        -------
+        float or None
+            The query duration in seconds if the storage answered.
+            Otherwise, None.
+
+        """
+        return self.store.ping()
+
+    def add_categories(self, values: list[str]) -> None:
+        """Add the categories missing from the storage.
+
+        Parameters
+        ----------
+        values : list of str
+            The category values.
+
+        """
+        self.cache.add_categories(values)
+        self._queue("add_categories", values)
+
+    def create_resource(
+        self, url: str, categories: list[str], tags: list[str] | None = None
+    ) -> int | None:
+        """Insert a new resource or add categories and tags to it.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        categories : list of str
+            The category names.
+        tags : list of str or None, default=None
+            The tag names.
+
+        Returns
+        -------
+        int or None
+            The resource ID if object was created or updated. Otherwise,
+            None.
+
+        Raises
+        ------
+        ValueError
+            If resource already exists with these categories and tags.
+
+        """
+        resource_id: int | None = self.cache.create_resource(
+            url, categories, tags
+        )
+
+        if resource_id is not None:
+            self._queue("create_resource", url, categories, tags)
+
+        return resource_id
+
+    def fetch_resource(self, url: str) -> int | None:
+        """Fetch resource by URL.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+
+        Returns
+        -------
+        int or None
+            The ID if object was found. Otherwise, None.
+
+        """
+        return self.cache.fetch_resource(url)
+
+    def fetch_all_resources(self) -> dict[str, list[ResourceLink]]:
+        """Fetch all resources by category.
+
+        Returns
+        -------
+        dict
+            The category names to the links.
+
+        """
+        return self.cache.fetch_all_resources()
+
+    def fetch_resources(
+        self,
+        categories: list[str],
+        tags: list[str] | None = None,
+        match_all: bool = False,
+    ) -> list[ResourceLink]:
+        """Fetch resources matching any or all categories and tags.
+
+        Parameters
+        ----------
+        categories : list of str
+            The category names.
+        tags : list of str or None, default=None
+            The tag names.
+        match_all : bool, default=False
+            If True, the resources must match every category and tag.
+            Otherwise, any of them.
+
+        Returns
+        -------
+        list of ResourceLink
+            The links.
+
+        """
+        return self.cache.fetch_resources(categories, tags, match_all)
+
+    def fetch_catalog(self) -> list[CatalogEntry]:
+        """Fetch every resource with its categories, tags and checks.
+
+        Returns
+        -------
+        list of CatalogEntry
+            The resources, by ID.
+
+        """
+        return self.cache.fetch_catalog()
+
+    def iter_resources(
+        self,
+        categories: list[str] | None = None,
+        tags: list[str] | None = None,
+        match_all: bool = False,
+    ) -> Iterator[ExportRow]:
+        """Iterate over the resources to export, one at a time.
+
+        Parameters
+        ----------
+        categories : list of str or None, default=None
+            The category names.
+        tags : list of str or None, default=None
+            The tag names.
+        match_all : bool, default=False
+            If True, the resources must match every category and tag.
+            Otherwise, any of them.
+
+        Returns
+        -------
+        iterator of ExportRow
+            The resources matching the filters, every resource if there
+            are none, by ID.
+
+        """
+        return self.cache.iter_resources(categories, tags, match_all)
+
+    def fetch_new_resources(
+        self, since: float, until: float, limit: int
+    ) -> list[ExportRow]:
+        """Fetch the resources created during a period.
+
+        Parameters
+        ----------
+        since : float
+            Timestamp after which the resources were created.
+        until : float
+            Timestamp until which the resources were created, included.
+        limit : int
+            Maximum number of resources.
+
+        Returns
+        -------
+        list of ExportRow
+            The oldest resources of the period first.
+
+        """
+        return self.cache.fetch_new_resources(since, until, limit)
+
+    def fetch_all_url_metadata(self) -> list[UrlMetadata]:
+        """Fetch the metadata of every URL.
+
+        Returns
+        -------
+        list of UrlMetadata
+            The metadata.
+
+        """
+        return self.cache.fetch_all_url_metadata()
+
+    def fetch_urls_to_enrich(self, fetched_before: float) -> list[str]:
+        """Fetch the URLs without metadata or with outdated metadata.
+
+        Parameters
+        ----------
+        fetched_before : float
+            Timestamp before which metadata is outdated.
+
+        Returns
+        -------
+        list of str
+            The URLs, never fetched first.
+
+        """
+        return self.cache.fetch_urls_to_enrich(fetched_before)
+
+    def fetch_url_metadata(self, url: str) -> UrlMetadata | None:
+        """Fetch the cached metadata of a URL.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+
+        Returns
+        -------
+        UrlMetadata or None
+            The metadata if the URL was already fetched.
+
+        """
+        return self.cache.fetch_url_metadata(url)
+
+    def save_url_metadata(self, metadata: UrlMetadata) -> None:
+        """Insert or replace the metadata of a URL.
+
+        Parameters
+        ----------
+        metadata : UrlMetadata
+            The metadata.
+
+        """
+        self.cache.save_url_metadata(metadata)
+        self._queue("save_url_metadata", metadata)
+
+    def fetch_urls_to_check(
+        self, checked_before: float, limit: int
+    ) -> list[str]:
+        """Fetch the URLs checked the longest time ago.
+
+        Parameters
+        ----------
+        checked_before : float
+            Timestamp after which a check is recent enough.
+        limit : int
+            Maximum number of URLs.
+
+        Returns
+        -------
+        list of str
+            The URLs, never checked first.
+
+        """
+        return self.cache.fetch_urls_to_check(checked_before, limit)
+
+    def save_link_check(
+        self, url: str, status: int | None, alive: bool, checked_at: float
+    ) -> None:
+        """Record the result of a link check.
+
+        Parameters
+        ----------
+        url : str
+            The URL.
+        status : int or None
+            The HTTP status, or None if the request failed.
+        alive : bool
+            Whether the link works.
+        checked_at : float
+            Timestamp of the check.
+
+        """
+        self.cache.save_link_check(url, status, alive, checked_at)
+        self._queue("save_link_check", url, status, alive, checked_at)
+
+    def save_pin(self, pin: Pin) -> None:
+        """Insert or replace a pinned message.
+
+        Parameters
+        ----------
+        pin : Pin
+            The pinned message.
+
+        """
+        self.cache.save_pin(pin)
+        self._queue("save_pin", pin)
+
+    def delete_pin(self, channel_id: int, message_id: int) -> None:
+        """Remove an unpinned message.
+
+        Parameters
+        ----------
+        channel_id : int
+            The channel ID.
+        message_id : int
+            The message ID.
+
+        """
+        self.cache.delete_pin(channel_id, message_id)
+        self._queue("delete_pin", channel_id, message_id)
+
+    def fetch_pins(self, channel_id: int | None = None) -> list[Pin]:
+        """Fetch the pinned messages of a channel or of every channel.
+
+        Parameters
+        ----------
+        channel_id : int or None, default=None
+            The channel ID. If None, the pins of every channel.
+
+        Returns
+        -------
+        list of Pin
+            The pinned messages, most recent first.
+
+        """
+        return self.cache.fetch_pins(channel_id)
+
+    def replace_pins(self, channel_id: int, pins: list[Pin]) -> None:
+        """Replace the pinned messages of a channel.
+
+        Parameters
+        ----------
+        channel_id : int
+            The channel ID.
+        pins : list of Pin
+            The messages currently pinned in the channel.
+
+        """
+        self.cache.replace_pins(channel_id, pins)
+        self._queue("replace_pins", channel_id, list(pins))
+
+    def save_audit_events(self, events: list[AuditEvent]) -> None:
+        """Append events to the audit log.
+
+        Parameters
+        ----------
+        events : list of AuditEvent
+            The events, in order.
+
+        """
+        self._queue("save_audit_events", events)
+
+    def fetch_audit_events(
+        self,
+        since: float,
+        user_id: int | None = None,
+        action: str | None = None,
+        limit: int = 100,
+    ) -> list[AuditEvent]:
+        """Fetch the most recent audit events matching filters.
+
+        Pending writes are flushed first.
+
+        Parameters
+        ----------
+        since : float
+            Timestamp from which events are fetched.
+        user_id : int or None, default=None
+            If not None, the ID of the user who acted.
+        action : str or None, default=None
+            If not None, the action name.
+        limit : int, default=100
+            Maximum number of events.
+
+        Returns
+        -------
+        list of AuditEvent
+            The events, most recent first.
+
+        """
+        self._flush_before_read()
+
+        return self.store.fetch_audit_events(since, user_id, action, limit)
+
+    def delete_audit_events(self, before: float, limit: int) -> int:
+        """Delete a batch of audit events older than a date.
+
+        Pending writes are flushed first.
+
+        Parameters
+        ----------
+        before : float
+            Timestamp before which events are deleted.
+        limit : int
+            Maximum number of events deleted.
+
+        Returns
+        -------
+        int
+            The number of events deleted.
+
+        """
+        self._flush_before_read()
+
+        return self.store.delete_audit_events(before, limit)
+
+    def save_usage(self, counts: list[UsageCount]) -> None:
+        """Add command uses to the hourly rollup.
+
+        Parameters
+        ----------
+        counts : list of UsageCount
+            The uses by hour, command and category.
+
+        """
+        self._queue("save_usage", counts)
+
+    def fetch_usage(self, since: float) -> list[UsageCount]:
+        """Fetch the hourly and daily command uses since a date.
+
+        Pending writes are flushed first.
+
+        Parameters
+        ----------
+        since : float
+            Timestamp from which uses are fetched. Days are fetched
+            whole.
+
+        Returns
+        -------
+        list of UsageCount
+            The uses by hour or day, command and category.
+
+        """
+        self._flush_before_read()
+
+        return self.store.fetch_usage(since)
+
+    def roll_up_usage(self, before: float) -> int:
+        """Merge the hourly uses older than a date into the daily rollup.
+
+        Pending writes are flushed first.
+
+        Parameters
+        ----------
+        before : float
+            Timestamp before which hourly uses are merged.
+
+        Returns
+        -------
+        int
+            The number of hourly rows merged.
+
+        """
+        self._flush_before_read()
+
+        return self.store.roll_up_usage(before)
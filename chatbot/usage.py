@@ -0,0 +1,180 @@
+"""Command usage counters and their rollups."""
+
+from asyncio import Task, create_task, sleep
+from collections import Counter
+from dataclasses import astuple
+from time import time
+
+from .classes import UsageCount
+from .health import register_queue
+from .ipc import WorkerError
+from .logger import programLogger
+from .repository import get_repository
+
+# Seconds between two writes of the counters.
+FLUSH_INTERVAL: float = 60.0
+# Days after which hourly uses are merged into days.
+HOURLY_RETENTION_DAYS: int = 7
+# Seconds between two rollups of the hourly uses.
+ROLLUP_INTERVAL: float = 24 * 3600.0
+
+
+class UsageCounters:
+    """Class counting command uses by hour, command and category.
+
+    Counting only increments an in-memory counter. The counters are
+    added to the hourly rollup every FLUSH_INTERVAL seconds, through the
+    command handlers so that they reach the workers' database when the
+    bot runs as a gateway.
+
+    Methods
+    -------
+    count(command, categories)
+        Count a use of a command.
+    start()
+        Start writing the counters periodically.
+    stop()
+        Stop the periodic writes and write the counters.
+    flush()
+        Write the counters.
+
+    """
+
+    def __init__(self) -> None:
+        """Create empty counters."""
+        self._counts: Counter[tuple[int, str, str]] = Counter()
+        self._task: Task[None] | None = None
+
+    def count(self, command: str, categories: list[str] | None = None) -> None:
+        """Count a use of a command.
+
+        Parameters
+        ----------
+        command : str
+            The command name.
+        categories : list of str or None, default=None
+            The category values the command was used with.
+
+        """
+        hour: int = int(time()) // 3600 * 3600
+        self._counts[(hour, command, "")] += 1
+
+        for category in categories or []:
+            self._counts[(hour, command, category)] += 1
+
+    def start(self) -> None:
+        """Start writing the counters periodically."""
+        self._task = create_task(self._run(), name="usage-counters")
+        register_queue("usage", lambda: len(self._counts))
+
+    async def stop(self) -> None:
+        """Stop the periodic writes and write the counters."""
+        if self._task:
+            self._task.cancel()
+
+        self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        """Write the counters periodically."""
+        while True:
+            await sleep(FLUSH_INTERVAL)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write the counters.
+
+        Returns
+        -------
+        int
+            The number of counters written.
+
+        """
+        # Imported here, the commands depend on the counters.
+        from .bot_commands.dispatch import run_handler
+
+        counts: Counter[tuple[int, str, str]] = self._counts
+        self._counts = Counter()
+
+        if not counts:
+            return 0
+
+        try:
+            await run_handler(
+                "save_usage",
+                counts=[
+                    astuple(UsageCount(*key, count))
+                    for key, count in counts.items()
+                ],
+            )
+
+        except (ConnectionError, TimeoutError, WorkerError) as err:
+            programLogger.warning(f"Failed writing usage: {err}")
+            self._counts.update(counts)
+            return 0
+
+        return len(counts)
+
+
+class UsageRollup:
+    """Class merging the old hourly uses into the daily rollup.
+
+    Methods
+    -------
+    start()
+        Start the periodic rollups.
+    stop()
+        Cancel the periodic rollups.
+    roll_up()
+        Merge the hourly uses older than the retention into days.
+
+    """
+
+    def __init__(self) -> None:
+        """Set the rollup task."""
+        self._task: Task[None] | None = None
+
+    def start(self) -> None:
+        """Start the periodic rollups."""
+        self._task = create_task(self._run(), name="usage-rollup")
+
+    def stop(self) -> None:
+        """Cancel the periodic rollups."""
+        if self._task:
+            self._task.cancel()
+
+        self._task = None
+
+    async def _run(self) -> None:
+        """Roll up the hourly uses periodically."""
+        while True:
+            try:
+                self.roll_up()
+
+            except Exception as err:
+                programLogger.error(f"Failed rolling up usage: {err}")
+
+            await sleep(ROLLUP_INTERVAL)
+
+    def roll_up(self) -> int:
+        """Merge the hourly uses older than the retention into days.
+
+        Only whole days are merged.
+
+        Returns
+        -------
+        int
+            The number of hourly rows merged.
+
+        """
+        before: int = int(time()) - HOURLY_RETENTION_DAYS * 86400
+        merged: int = get_repository().roll_up_usage(before - before % 86400)
+
+        if merged:
+            programLogger.info(f"Rolled up {merged} hourly usage rows.")
+
+        return merged
+
+
+USAGE = UsageCounters()
+USAGE_ROLLUP = UsageRollup()
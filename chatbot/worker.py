@@ -0,0 +1,204 @@
+"""Worker process running the commands and the database for a gateway."""
+
+from argparse import ArgumentParser, Namespace
+from asyncio import Event, get_running_loop, run
+from signal import SIGINT, SIGTERM
+from typing import Any
+
+from .backup import BackupScheduler
+from .logger import programLogger, set_logger
+from .main import (
+    add_config_argument,
+    add_storage_arguments,
+    create_backup_scheduler,
+)
+from .shutdown import SHUTDOWN_TIMEOUT, WORK
+
+
+def parse_args() -> Namespace:
+    """Parse the arguments of the worker.
+
+    Returns
+    -------
+    argparse.Namespace
+        Command line arguments of the worker.
+
+    """
+    parser: ArgumentParser = ArgumentParser(
+        description=(
+            "Run the commands and the database of a bot started with "
+            "'chatbot --workers'."
+        )
+    )
+
+    parser.add_argument(
+        "socket",
+        type=str,
+        help="socket file to listen on, given to the gateway",
+    )
+    parser.add_argument(
+        "-d", "--debug", action="store_true", help="display debug logs"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        action="store_true",
+        help=(
+            "run the background jobs: links enrichment and checks, and "
+            "database backups (enable on a single worker)"
+        ),
+    )
+    add_storage_arguments(parser)
+    add_config_argument(parser)
+    args: Namespace = parser.parse_args()
+
+    # Each worker would serve its own copy of a catalog kept in memory.
+    if args.storage != "sqlite":
+        parser.error(
+            f"storage '{args.storage}' can't be shared by the workers, "
+            "use 'sqlite'"
+        )
+
+    return args
+
+
+async def run_worker(args: Namespace) -> None:
+    """Answer the gateway's calls until SIGINT or SIGTERM.
+
+    On shutdown, the calls running are given SHUTDOWN_TIMEOUT seconds to
+    finish, then pending writes are flushed and the database closed.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        Command line arguments of the worker.
+
+    """
+    from .audit import AUDIT_RETENTION
+
+    # Importing the commands registers their handlers.
+    from .bot_commands import resources  # noqa: F401
+    from .bot_commands.dispatch import handler, serve_handler
+    from .coalescer import RESOURCE_WRITER
+    from .config import (
+        ConfigWatcher,
+        RuntimeConfig,
+        apply_categories,
+        default_categories,
+    )
+    from .enrichment import ENRICHER
+    from .http import close_session
+    from .ipc import serve
+    from .link_checker import LINK_CHECKER
+    from .repository import create_repository, get_repository, set_repository
+    from .search import apply_updates, record_updates, take_updates
+    from .usage import USAGE_ROLLUP
+
+    set_repository(create_repository(args.storage, args.database_file))
+    # The indexes loaded from the database are shared by every worker,
+    # only the later updates are relayed to the others.
+    record_updates()
+    get_repository().start()
+    config: ConfigWatcher | None = None
+
+    if args.config:
+        # Only the categories are used by the handlers.
+        config = ConfigWatcher(
+            args.config,
+            RuntimeConfig(categories=default_categories()),
+            [apply_categories],
+        )
+
+        try:
+            config.load()
+
+        except (OSError, ValueError) as err:
+            programLogger.error(f"Invalid configuration: {err}")
+            await get_repository().close()
+            return
+
+        config.start()
+
+    @handler("ping")
+    async def ping() -> float | None:
+        """Check that the database answers queries."""
+        return get_repository().ping()
+
+    @handler("take_index_updates")
+    async def take_index_updates() -> list[list[str]]:
+        """Return the search index updates to relay to the other workers."""
+        return take_updates()
+
+    @handler("apply_index_updates")
+    async def apply_index_updates(updates: list[list[str]]) -> None:
+        """Apply the search index updates of the other workers."""
+        apply_updates(updates)
+
+    backups: BackupScheduler | None = (
+        create_backup_scheduler(args) if args.jobs else None
+    )
+
+    if args.jobs:
+        if backups:
+            backups.start()
+
+        ENRICHER.start()
+        LINK_CHECKER.start()
+        AUDIT_RETENTION.start()
+        USAGE_ROLLUP.start()
+
+    stopping = Event()
+    loop = get_running_loop()
+
+    for signal in (SIGINT, SIGTERM):
+        loop.add_signal_handler(signal, stopping.set)
+
+    async def dispatch(name: str, **kwargs: Any) -> Any:
+        """Run a handler, tracked to be waited for on shutdown."""
+        async with WORK.track():
+            return await serve_handler(name, **kwargs)
+
+    server = await serve(args.socket, dispatch)
+    programLogger.notice(f"Worker listening on '{args.socket}'.")
+
+    async with server:
+        await stopping.wait()
+        programLogger.notice("Stopping worker ...")
+        # Stop accepting gateway connections and let the calls running
+        # finish, the gateway sends new calls to the other workers.
+        server.close()
+
+        if config:
+            config.stop()
+
+        if backups:
+            backups.stop()
+
+        ENRICHER.stop()
+        LINK_CHECKER.stop()
+        AUDIT_RETENTION.stop()
+        USAGE_ROLLUP.stop()
+        RESOURCE_WRITER.flush()
+
+        if not await WORK.wait_idle(SHUTDOWN_TIMEOUT):
+            programLogger.warning(f"Stopping with {len(WORK)} calls running.")
+
+    await get_repository().close()
+    await close_session()
+    programLogger.notice("Worker stopped.")
+
+
+def main() -> None:
+    """Worker's entrypoint."""
+    args: Namespace = parse_args()
+    set_logger(args.debug)
+
+    try:
+        run(run_worker(args))
+
+    except KeyboardInterrupt:
+        programLogger.notice("Worker stopped.")
+
+
+if __name__ == "__main__":
+    main()